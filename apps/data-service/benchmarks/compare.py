@@ -0,0 +1,72 @@
+"""
+Compare two benchmark result files (benchmarks/run.py output)
+
+Prints the median of every benchmark present in both runs and the relative
+change. Changes beyond the threshold are flagged; with --fail-on-regression
+the exit status is 1 if any benchmark got slower by more than the threshold.
+
+Usage (from apps/data-service):
+    python benchmarks/compare.py BASE.json HEAD.json [--threshold 0.10] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _label(meta: dict) -> str:
+    return f"{meta.get('commit') or '?'}{' (dirty)' if meta.get('dirty') else ''}"
+
+
+def compare(base: dict, head: dict) -> tuple[list[tuple[str, float, float, float]], list[str]]:
+    """
+    Pair benchmarks by name.
+
+    Returns:
+        (name, base median, head median, relative change) rows, and the names of
+        benchmarks that exist in only one of the runs
+    """
+    rows = []
+    base_benchmarks, head_benchmarks = base['benchmarks'], head['benchmarks']
+    for name, base_result in base_benchmarks.items():
+        head_result = head_benchmarks.get(name)
+        if head_result is None:
+            continue
+        base_median, head_median = base_result['median'], head_result['median']
+        rows.append((name, base_median, head_median, head_median / base_median - 1 if base_median else 0.0))
+    unmatched = sorted(set(base_benchmarks) ^ set(head_benchmarks))
+    return rows, unmatched
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('base', type=Path)
+    parser.add_argument('head', type=Path)
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative change worth flagging')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    rows, unmatched = compare(base, head)
+
+    print(f"base {_label(base['meta'])}  ->  head {_label(head['meta'])}\n")
+    regressions = 0
+    for name, base_median, head_median, change in rows:
+        flag = ''
+        if change > args.threshold:
+            flag = '  SLOWER'
+            regressions += 1
+        elif change < -args.threshold:
+            flag = '  faster'
+        print(f"{name:<40} {base_median * 1e3:>10.3f} ms  {head_median * 1e3:>10.3f} ms  {change:>+8.1%}{flag}")
+    if unmatched:
+        print(f"\nOnly in one run: {', '.join(unmatched)}")
+
+    if args.fail_on_regression and regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
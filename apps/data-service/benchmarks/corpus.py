@@ -0,0 +1,221 @@
+"""
+Synthetic grant-page corpus for benchmarks
+
+Deterministic (seeded) generators for the inputs the service sees in
+production:
+
+- grant_page(): Spanish public-administration grant pages padded to a target
+  size with what real portals carry around the announcement: navigation
+  menus, inline scripts and styles, cookie banners, breadcrumbs, tables of
+  beneficiaries/amounts, footers. Amounts and dates use Spanish formats
+  ("150.000,00 €", "1.250.000 euros", "15 de marzo de 2026", "15/03/2026")
+  next to the ISO dates and "50.000 EUR" forms the heuristics look for
+- search_results(): DuckDuckGo-style result dicts mixing official (.gob.es,
+  .europa.eu) and unofficial domains, tracking query strings and duplicates
+
+Usage:
+    html = grant_page(100_000, seed=1)
+    results = search_results(50, seed=1)
+"""
+
+import random
+
+# Target document sizes (bytes of UTF-8 HTML)
+PAGE_SIZES = {
+    '10kb': 10_000,
+    '100kb': 100_000,
+    '500kb': 500_000,
+    '1mb': 1_000_000,
+}
+
+MONTHS = (
+    'enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio',
+    'julio', 'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre',
+)
+REGIONS = (
+    'Andalucía', 'Aragón', 'Asturias', 'Castilla y León', 'Cataluña', 'Galicia',
+    'Comunidad de Madrid', 'Región de Murcia', 'Navarra', 'País Vasco', 'Comunitat Valenciana',
+)
+PROGRAMS = (
+    'Ayudas a la rehabilitación energética de edificios',
+    'Subvenciones para la digitalización de pymes',
+    'Convocatoria de ayudas a proyectos de I+D+i',
+    'Ayudas para la contratación de jóvenes investigadores',
+    'Subvenciones a entidades del tercer sector',
+    'Programa de incentivos a la movilidad eléctrica',
+    'Ayudas a la internacionalización de empresas',
+)
+SENTENCES = (
+    'Podrán ser beneficiarias las personas físicas y jurídicas que cumplan los requisitos establecidos en las bases reguladoras.',
+    'La solicitud se presentará exclusivamente por medios electrónicos a través de la sede electrónica.',
+    'Las ayudas se concederán en régimen de concurrencia competitiva hasta agotar el crédito disponible.',
+    'El plazo de ejecución de las actuaciones subvencionables finalizará el 31 de diciembre del año siguiente.',
+    'La resolución de concesión se publicará en el Boletín Oficial y en el Portal de Transparencia.',
+    'Son gastos subvencionables los directamente relacionados con la actividad objeto de la ayuda.',
+    'La cuantía máxima por beneficiario no podrá superar el límite establecido en el reglamento de minimis.',
+)
+OFFICIAL_DOMAINS = (
+    'sede.{region}.gob.es', 'www.{region}.gob.es', 'transparencia.{region}.gob.es',
+    'ec.europa.eu', 'cordis.europa.eu', 'www.infosubvenciones.es', 'www.pap.hacienda.gob.es',
+)
+UNOFFICIAL_DOMAINS = (
+    'www.subvenciones-facil.com', 'blog.ayudasempresas.net', 'www.consultoria{n}.com',
+    'noticias.example.org', 'www.fondos-europeos.info',
+)
+
+
+def spanish_amount(rng: random.Random) -> str:
+    """An amount in one of the formats found on Spanish portals."""
+    value = rng.choice((3_000, 15_000, 50_000, 150_000, 1_250_000, 6_000_000))
+    grouped = f"{value:,}".replace(',', '.')
+    return rng.choice((
+        f"{grouped},00 €",
+        f"{grouped} euros",
+        f"{grouped} EUR",
+        f"€{grouped}",
+        f"{grouped} € (IVA no incluido)",
+    ))
+
+
+def spanish_date(rng: random.Random) -> str:
+    """A date in one of the formats found on Spanish portals."""
+    year, month, day = rng.choice((2025, 2026, 2027)), rng.randint(1, 12), rng.randint(1, 28)
+    return rng.choice((
+        f"{day} de {MONTHS[month - 1]} de {year}",
+        f"{day:02d}/{month:02d}/{year}",
+        f"{year}-{month:02d}-{day:02d}",
+    ))
+
+
+def _nav(rng: random.Random) -> str:
+    items = ''.join(
+        f'<li><a href="/seccion/{i}">{label}</a></li>'
+        for i, label in enumerate(
+            ('Inicio', 'Ciudadanía', 'Empresas', 'Ayudas y subvenciones', 'Sede electrónica',
+             'Transparencia', 'Contacto', rng.choice(REGIONS))
+        )
+    )
+    return f'<nav class="main-menu"><ul>{items}</ul></nav>'
+
+
+def _script(rng: random.Random) -> str:
+    body = ';'.join(
+        f"window.dataLayer.push({{event:'view',section:{rng.randint(1, 999)},ts:{rng.randint(10**9, 10**10)}}})"
+        for _ in range(rng.randint(5, 20))
+    )
+    return f'<script type="text/javascript">window.dataLayer=window.dataLayer||[];{body}</script>'
+
+
+def _style(rng: random.Random) -> str:
+    rules = ''.join(
+        f'.c{rng.randint(1, 9999)}{{margin:{rng.randint(0, 20)}px;color:#{rng.randint(0, 0xFFFFFF):06x}}}'
+        for _ in range(rng.randint(10, 30))
+    )
+    return f'<style>{rules}</style>'
+
+
+def _table(rng: random.Random) -> str:
+    rows = ''.join(
+        f'<tr><td>{rng.choice(REGIONS)}</td><td>B{rng.randint(10**7, 10**8 - 1)}</td>'
+        f'<td>{spanish_amount(rng)}</td><td>{spanish_date(rng)}</td></tr>'
+        for _ in range(rng.randint(10, 40))
+    )
+    return (
+        '<table class="beneficiarios"><thead><tr><th>Comunidad</th><th>NIF</th>'
+        f'<th>Importe</th><th>Fecha</th></tr></thead><tbody>{rows}</tbody></table>'
+    )
+
+
+def _section(rng: random.Random) -> str:
+    paragraphs = ''.join(
+        f'<p>{" ".join(rng.sample(SENTENCES, 3))} Importe: {spanish_amount(rng)}. '
+        f'Fecha límite: {spanish_date(rng)}.</p>'
+        for _ in range(rng.randint(2, 5))
+    )
+    return f'<section><h3>{rng.choice(PROGRAMS)}</h3>{paragraphs}</section>'
+
+
+_FILLERS = (_nav, _script, _style, _table, _section, _section, _table)
+
+
+def grant_page(size: int, seed: int = 0) -> str:
+    """
+    Generate a grant announcement page of roughly the given size.
+
+    Args:
+        size: Target size in bytes of UTF-8 HTML (10KB to 1MB in the suite)
+        seed: Random seed (same seed and size, same page)
+
+    Returns:
+        HTML document whose main content (title, amount, deadline) comes after
+        navigation and scripts, like on real portals
+    """
+    rng = random.Random(seed * 1_000_003 + size)
+    program = rng.choice(PROGRAMS)
+    region = rng.choice(REGIONS)
+
+    head = (
+        f'<!DOCTYPE html><html lang="es"><head><meta charset="utf-8">'
+        f'<title>{program} - {region}</title>{_style(rng)}{_script(rng)}</head><body>'
+        '<div id="cookie-banner">Utilizamos cookies propias y de terceros. '
+        '<button>Aceptar</button><button>Configurar</button></div>'
+        f'<header>{_nav(rng)}</header>'
+        '<ol class="breadcrumb"><li>Inicio</li><li>Ayudas y subvenciones</li>'
+        f'<li>{program}</li></ol>'
+    )
+    main = (
+        f'<main><article><h1>{program} {rng.choice((2025, 2026))}</h1>'
+        f'<p>{" ".join(rng.sample(SENTENCES, 4))} La dotación total asciende a '
+        f'{spanish_amount(rng)} y el plazo de solicitud finaliza el {spanish_date(rng)}.</p>'
+        f'<ul><li>Cuantía máxima: {spanish_amount(rng)}</li>'
+        f'<li>Plazo: hasta {spanish_date(rng)}</li><li>Ámbito: {region}</li></ul>'
+    )
+    tail = (
+        '</article></main><footer><p>© Administración pública. Aviso legal. Accesibilidad.</p>'
+        f'{_nav(rng)}{_script(rng)}</footer></body></html>'
+    )
+
+    parts = [head, main]
+    length = len(head.encode()) + len(main.encode()) + len(tail.encode())
+    while length < size:
+        filler = rng.choice(_FILLERS)(rng)
+        parts.append(filler)
+        length += len(filler.encode())
+    parts.append(tail)
+    return ''.join(parts)
+
+
+def search_results(count: int, seed: int = 0) -> list[dict[str, str]]:
+    """
+    Generate DuckDuckGo-style text search results.
+
+    Roughly two thirds point to official domains; URLs carry tracking query
+    strings, fragments and trailing slashes, and about one in ten repeats an
+    earlier URL, so normalization and de-duplication have work to do.
+
+    Args:
+        count: Number of results
+        seed: Random seed
+
+    Returns:
+        Dicts with title, href and body keys
+    """
+    rng = random.Random(seed)
+    results: list[dict[str, str]] = []
+    for index in range(count):
+        if results and rng.random() < 0.1:
+            results.append(dict(rng.choice(results)))
+            continue
+
+        region = rng.choice(REGIONS).lower().split()[-1].replace('í', 'i').replace('ó', 'o')
+        pattern = rng.choice(OFFICIAL_DOMAINS if rng.random() < 0.66 else UNOFFICIAL_DOMAINS)
+        domain = pattern.format(region=region, n=rng.randint(1, 99))
+        path = '/'.join(rng.choice(('ayudas', 'subvenciones', 'convocatorias', 'tramites', str(index)))
+                        for _ in range(rng.randint(1, 4)))
+        suffix = rng.choice(('', '/', '?utm_source=ddg&utm_medium=search', '#plazos', '/?id=' + str(index)))
+        results.append({
+            'title': f"{rng.choice(PROGRAMS)} - {rng.choice(REGIONS)}",
+            'href': f"https://{domain}/{path}{suffix}",
+            'body': ' '.join(rng.sample(SENTENCES, 2)),
+        })
+    return results
@@ -0,0 +1,272 @@
+"""
+Open-loop load generator for /api/ia/extract and /discover
+
+Sends requests at a fixed target rate regardless of how fast the service
+answers (a slow service does not slow the generator down, so queueing shows
+up in the latencies instead of being hidden). Latency is measured from the
+moment a request was scheduled, so a request that waits for a free
+connection is charged for the wait (no coordinated omission). Requests due
+while --max-in-flight are outstanding are dropped and counted.
+
+The request mix is weighted between extraction (synthetic grant pages from
+benchmarks/corpus.py, 10KB-500KB) and discovery. Reports throughput, p50/p95/
+p99/max latency and error rates per endpoint, optionally as JSON.
+
+Run the service against the local fakes so no quota is used, e.g.:
+    GEMINI_PROVIDER=fake SEARCH_PROVIDER=fake RATE_LIMIT_GEMINI_PER_SECOND=0 \\
+        RATE_LIMIT_DDGS_PER_SECOND=0 uvicorn main:app --port 8000
+
+Usage (from apps/data-service):
+    python benchmarks/loadgen.py --rps 50 --duration 60 [--base-url URL | --in-process]
+        [--extract-weight 9 --discover-weight 1] [--max-in-flight 500] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVICE_ROOT / 'benchmarks'))
+
+from corpus import PAGE_SIZES, grant_page  # noqa: E402
+
+# Page size mix for extraction requests (label, weight)
+PAGE_MIX = (('10kb', 6), ('100kb', 3), ('500kb', 1))
+CORPUS_PAGES_PER_SIZE = 8
+
+
+class Recorder:
+    """Latencies and outcomes per endpoint."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.outcomes: dict[str, Counter] = defaultdict(Counter)
+        self.dropped = 0
+
+    def record(self, endpoint: str, latency: float, outcome: str) -> None:
+        self.latencies[endpoint].append(latency)
+        self.outcomes[endpoint][outcome] += 1
+
+    def report(self, send_window: float, elapsed: float, target_rps: float) -> dict[str, Any]:
+        endpoints = {}
+        total = 0
+        for endpoint, latencies in sorted(self.latencies.items()):
+            outcomes = self.outcomes[endpoint]
+            count = len(latencies)
+            total += count
+            errors = count - outcomes.get('200', 0)
+            endpoints[endpoint] = {
+                'requests': count,
+                'rps': round(count / send_window, 2),
+                'error_rate': round(errors / count, 4),
+                'outcomes': dict(outcomes),
+                'latency_ms': _percentiles(latencies),
+            }
+        return {
+            'target_rps': target_rps,
+            'achieved_rps': round(total / send_window, 2),
+            'send_seconds': round(send_window, 2),
+            'duration_seconds': round(elapsed, 2),
+            'requests': total,
+            'dropped': self.dropped,
+            'endpoints': endpoints,
+        }
+
+
+def _percentiles(latencies: list[float]) -> dict[str, float]:
+    ordered = sorted(latencies)
+
+    def at(quantile: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * quantile))] * 1000, 2)
+
+    return {'p50': at(0.50), 'p95': at(0.95), 'p99': at(0.99), 'max': round(ordered[-1] * 1000, 2)}
+
+
+def build_corpus(seed: int) -> list[tuple[str, dict[str, str]]]:
+    """Extraction bodies weighted by PAGE_MIX."""
+    bodies = []
+    for label, weight in PAGE_MIX:
+        for index in range(CORPUS_PAGES_PER_SIZE):
+            body = {
+                'html': grant_page(PAGE_SIZES[label], seed=seed + index),
+                'url': f'https://sede.example.gob.es/ayudas/{label}/{index}',
+                'source': 'Loadgen',
+            }
+            bodies.extend([(label, body)] * weight)
+    return bodies
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    endpoint: str,
+    request: dict[str, Any],
+    scheduled_at: float,
+    recorder: Recorder,
+    slots: asyncio.Semaphore,
+) -> None:
+    try:
+        try:
+            response = await client.request(**request)
+            outcome = str(response.status_code)
+        except httpx.TimeoutException:
+            outcome = 'timeout'
+        except httpx.HTTPError as e:
+            outcome = type(e).__name__
+        recorder.record(endpoint, time.perf_counter() - scheduled_at, outcome)
+    finally:
+        slots.release()
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    rps: float,
+    duration: float,
+    extract_weight: int,
+    discover_weight: int,
+    max_in_flight: int,
+    seed: int = 1,
+    unique_urls: bool = True,
+) -> dict[str, Any]:
+    """
+    Drive the service at a fixed arrival rate.
+
+    Args:
+        client: Client pointed at the service
+        rps: Target requests per second (all endpoints together)
+        duration: Seconds to send for (in-flight requests are then awaited)
+        extract_weight: Relative share of /api/ia/extract requests
+        discover_weight: Relative share of /discover requests
+        max_in_flight: Requests beyond this many outstanding are dropped and counted
+        seed: Seed for the corpus and the request mix
+        unique_urls: Vary the URL of every extraction (defeats the result cache)
+
+    Returns:
+        Report with throughput, latency percentiles and outcomes per endpoint
+    """
+    rng = random.Random(seed)
+    corpus = build_corpus(seed)
+    recorder = Recorder()
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks: set[asyncio.Task] = set()
+    interval = 1 / rps
+
+    started = time.perf_counter()
+    sequence = 0
+    while True:
+        scheduled_at = started + sequence * interval
+        if scheduled_at - started >= duration:
+            break
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if slots.locked():
+            recorder.dropped += 1
+            sequence += 1
+            continue
+        await slots.acquire()
+
+        if rng.random() * (extract_weight + discover_weight) < extract_weight:
+            label, body = rng.choice(corpus)
+            if unique_urls:
+                body = {**body, 'url': f"{body['url']}?r={sequence}"}
+            endpoint = f'POST /api/ia/extract[{label}]'
+            request = {'method': 'POST', 'url': '/api/ia/extract', 'json': body}
+        else:
+            endpoint = 'POST /discover'
+            request = {
+                'method': 'POST',
+                'url': '/discover',
+                'params': {'scope': rng.choice(('espana', 'europa')), 'max_results': 10},
+            }
+
+        task = asyncio.create_task(_send(client, endpoint, request, scheduled_at, recorder, slots))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        sequence += 1
+
+    send_window = time.perf_counter() - started
+    # Let the last requests finish: their latencies belong to the run
+    if tasks:
+        await asyncio.gather(*tasks)
+    return recorder.report(send_window, time.perf_counter() - started, rps)
+
+
+def _client(base_url: Optional[str], timeout: float, max_in_flight: int) -> httpx.AsyncClient:
+    if base_url:
+        limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+        return httpx.AsyncClient(base_url=base_url, timeout=timeout, limits=limits)
+
+    sys.path.insert(0, str(SERVICE_ROOT))
+    from main import app
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://loadgen', timeout=timeout)
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(
+        f"target {report['target_rps']} rps, sent {report['achieved_rps']} rps for {report['send_seconds']}s "
+        f"({report['requests']} requests, {report['dropped']} dropped, "
+        f"{report['duration_seconds']}s until the last answer)\n"
+    )
+    print(f"{'endpoint':<34} {'reqs':>6} {'err%':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for endpoint, result in report['endpoints'].items():
+        latency = result['latency_ms']
+        print(
+            f"{endpoint:<34} {result['requests']:>6} {result['error_rate'] * 100:>5.1f}% "
+            f"{latency['p50']:>9.1f} {latency['p95']:>9.1f} {latency['p99']:>9.1f} {latency['max']:>9.1f}"
+        )
+        failures = {outcome: count for outcome, count in result['outcomes'].items() if outcome != '200'}
+        if failures:
+            print(f"{'':<34} failures: {failures}")
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    async with _client(args.base_url, args.timeout, args.max_in_flight) as client:
+        return await run_load(
+            client,
+            rps=args.rps,
+            duration=args.duration,
+            extract_weight=args.extract_weight,
+            discover_weight=args.discover_weight,
+            max_in_flight=args.max_in_flight,
+            seed=args.seed,
+            unique_urls=not args.repeat_urls,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument('--base-url', default='http://localhost:8000')
+    target.add_argument('--in-process', action='store_true', help='drive main:app through ASGITransport')
+    parser.add_argument('--rps', type=float, default=20)
+    parser.add_argument('--duration', type=float, default=30, help='seconds')
+    parser.add_argument('--extract-weight', type=int, default=9)
+    parser.add_argument('--discover-weight', type=int, default=1)
+    parser.add_argument('--max-in-flight', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=60, help='client timeout per request')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat-urls', action='store_true', help='reuse URLs so the result cache can hit')
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    args = parser.parse_args()
+    if args.in_process:
+        args.base_url = None
+
+    report = asyncio.run(_main(args))
+    if args.json:
+        print(json.dumps(report))
+    else:
+        _print_report(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""
+Benchmark suite: hot functions and endpoints on a synthetic grant corpus
+
+Groups:
+- micro: _heuristic_extract per page size (10KB-1MB), normalize_url,
+  is_official_domain and heuristic_confidence over generated search results
+- endpoint: in-process requests through the full ASGI stack (middleware,
+  validation, serialization) with httpx.ASGITransport: /api/ia/extract,
+  /api/ia/extract/html, /api/ia/extract/batch, /discover (canned search
+  results, heuristic validation) and /health as the framework baseline
+- serialization: benchmarks/bench_serialization.py (default vs fast path)
+
+Gemini is disabled (no GEMINI_API_KEY) and the extraction and discovery search
+caches are off, so every request does the full heuristic work and no network
+is used.
+
+Results are written as JSON (one entry per benchmark with median, mean, p95,
+min and ops/s, plus commit and machine metadata) to
+benchmarks/results/<commit>.json; compare two runs with benchmarks/compare.py.
+
+Usage (from apps/data-service, or `make bench` from the repository root):
+    python benchmarks/run.py [--quick] [--filter SUBSTRING] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = SERVICE_ROOT / 'benchmarks' / 'results'
+
+# Before any service import: module singletons read these at import time
+os.environ.pop('GEMINI_API_KEY', None)
+os.environ.setdefault('EXTRACTION_CACHE_ENABLED', 'false')
+os.environ.setdefault('DISCOVERY_SEARCH_CACHE_ENABLED', 'false')
+# Canned searches: the DuckDuckGo rate limit would only measure its own waits
+os.environ.setdefault('RATE_LIMIT_DDGS_PER_SECOND', '0')
+
+sys.path.insert(0, str(SERVICE_ROOT))
+sys.path.insert(0, str(SERVICE_ROOT / 'src'))
+sys.path.insert(0, str(SERVICE_ROOT / 'benchmarks'))
+
+import httpx  # noqa: E402
+
+import bench_serialization  # noqa: E402
+from corpus import PAGE_SIZES, grant_page, search_results  # noqa: E402
+from services import discovery_service  # noqa: E402
+from services.discovery_service import (  # noqa: E402
+    build_candidate,
+    heuristic_confidence,
+    is_official_domain,
+    normalize_url,
+)
+from services.ia_service import IAService  # noqa: E402
+
+QUICK_SIZES = ('10kb', '100kb')
+# Environment settings that change what the endpoints do; recorded with the results
+RECORDED_ENV = (
+    'FAST_JSON_RESPONSES', 'HEURISTIC_PARSER', 'HEURISTIC_EXECUTION_MODE', 'HEDGE_LATENCY_BUDGET_MS',
+    'EXTRACTION_CACHE_ENABLED', 'DISCOVERY_SEARCH_CACHE_ENABLED', 'RATE_LIMIT_DDGS_PER_SECOND',
+)
+
+
+def _summary(per_op: list[float], iterations: int) -> dict[str, Any]:
+    ordered = sorted(per_op)
+    median = statistics.median(ordered)
+    return {
+        'unit': 'seconds',
+        'rounds': len(ordered),
+        'iterations': iterations,
+        'median': median,
+        'mean': statistics.fmean(ordered),
+        'p95': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'min': ordered[0],
+        'stdev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        'ops_per_sec': 1 / median if median else None,
+    }
+
+
+def measure(fn: Callable[[], Any], min_time: float, min_rounds: int = 5) -> dict[str, Any]:
+    """
+    Time a synchronous callable.
+
+    The call count per round is calibrated so one round takes >= ~2ms (timer
+    resolution stops mattering); rounds are repeated until min_time elapses.
+    """
+    fn()  # warm-up
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= 0.002 or number >= 1_000_000:
+            break
+        number *= 10
+
+    per_op: list[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(per_op) < min_rounds or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        per_op.append((time.perf_counter() - started) / number)
+    return _summary(per_op, number * len(per_op))
+
+
+async def measure_async(
+    fn: Callable[[], Awaitable[Any]],
+    min_time: float,
+    min_rounds: int = 5,
+) -> dict[str, Any]:
+    """Time a coroutine function, one call per round."""
+    await fn()  # warm-up
+    per_op: list[float] = []
+    deadline = time.perf_counter() + min_time
+    while len(per_op) < min_rounds or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await fn()
+        per_op.append(time.perf_counter() - started)
+    return _summary(per_op, len(per_op))
+
+
+def micro_benchmarks(sizes: tuple[str, ...]) -> dict[str, Callable[[], Any]]:
+    service = IAService()
+    benchmarks: dict[str, Callable[[], Any]] = {}
+    for label in sizes:
+        html = grant_page(PAGE_SIZES[label], seed=1)
+        benchmarks[f'heuristic_extract[{label}]'] = (
+            lambda html=html: service._heuristic_extract(html, 'https://example.gob.es/ayuda', 'Bench')
+        )
+
+    results = search_results(200, seed=1)
+    urls = [result['href'] for result in results]
+    normalized = [normalize_url(url) for url in urls]
+    candidates = [build_candidate(result) for result in results]
+
+    def run_normalize_url():
+        for url in urls:
+            normalize_url(url)
+
+    def run_is_official_domain():
+        for url in normalized:
+            is_official_domain(url)
+
+    def run_heuristic_confidence():
+        for candidate in candidates:
+            heuristic_confidence(candidate, 'espana')
+
+    # Per 200 URLs/candidates, the size of a full discovery search round
+    benchmarks['normalize_url[x200]'] = run_normalize_url
+    benchmarks['is_official_domain[x200]'] = run_is_official_domain
+    benchmarks['heuristic_confidence[x200]'] = run_heuristic_confidence
+    return benchmarks
+
+
+def endpoint_benchmarks(client: httpx.AsyncClient, sizes: tuple[str, ...]) -> dict[str, Callable]:
+    benchmarks: dict[str, Callable] = {}
+
+    async def post_ok(*args, **kwargs):
+        response = await client.post(*args, **kwargs)
+        response.raise_for_status()
+
+    for label in sizes:
+        body = {'html': grant_page(PAGE_SIZES[label], seed=2), 'url': 'https://example.gob.es/a', 'source': 'Bench'}
+        benchmarks[f'POST /api/ia/extract[{label}]'] = lambda body=body: post_ok('/api/ia/extract', json=body)
+
+    raw = grant_page(PAGE_SIZES['100kb'], seed=3).encode()
+    benchmarks['POST /api/ia/extract/html[100kb]'] = lambda: post_ok(
+        '/api/ia/extract/html',
+        content=raw,
+        params={'url': 'https://example.gob.es/b', 'source': 'Bench'},
+        headers={'Content-Type': 'text/html; charset=utf-8'},
+    )
+
+    batch = {'items': [
+        {'html': grant_page(PAGE_SIZES['10kb'], seed=10 + i), 'url': f'https://example.gob.es/{i}', 'source': 'Bench'}
+        for i in range(10)
+    ]}
+    benchmarks['POST /api/ia/extract/batch[10x10kb]'] = lambda: post_ok('/api/ia/extract/batch', json=batch)
+
+    benchmarks['POST /discover[20]'] = lambda: post_ok(
+        '/discover', params={'scope': 'espana', 'max_results': 20, 'validate_with_ia': 'false'}
+    )
+
+    async def health():
+        (await client.get('/health')).raise_for_status()
+
+    benchmarks['GET /health'] = health
+    return benchmarks
+
+
+def _canned_search(query: str, max_results: int) -> list:
+    # Deterministic per query, no network
+    seed = sum(map(ord, query))
+    candidates = (build_candidate(result) for result in search_results(max_results, seed=seed))
+    return [candidate for candidate in candidates if candidate]
+
+
+async def run_endpoints(sizes: tuple[str, ...], min_time: float, selected: Callable[[str], bool]) -> dict:
+    from main import app
+
+    discovery_service.search_web = _canned_search
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        for name, fn in endpoint_benchmarks(client, sizes).items():
+            if selected(name):
+                results[name] = {'group': 'endpoint', **await measure_async(fn, min_time)}
+                _report(name, results[name])
+    return results
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', *args], cwd=SERVICE_ROOT, capture_output=True, text=True, check=True, timeout=30,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata(quick: bool) -> dict[str, Any]:
+    status = _git('status', '--porcelain', '--', '.')
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'dirty': bool(status),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'quick': quick,
+        'env': {name: os.environ[name] for name in RECORDED_ENV if name in os.environ},
+    }
+
+
+def _format_seconds(value: float) -> str:
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if value >= scale:
+            return f"{value / scale:8.2f} {unit}"
+    return f"{value / 1e-9:8.2f} ns"
+
+
+def _report(name: str, result: dict[str, Any]) -> None:
+    print(
+        f"{result['group']:<13} {name:<40} median {_format_seconds(result['median'])}   "
+        f"p95 {_format_seconds(result['p95'])}   rounds {result['rounds']}",
+        flush=True,
+    )
+
+
+def run(quick: bool = False, name_filter: str = '') -> dict[str, Any]:
+    sizes = QUICK_SIZES if quick else tuple(PAGE_SIZES)
+    min_time = 0.2 if quick else 1.0
+
+    def selected(name: str) -> bool:
+        return name_filter.lower() in name.lower()
+
+    benchmarks: dict[str, Any] = {}
+    for name, fn in micro_benchmarks(sizes).items():
+        if selected(name):
+            benchmarks[name] = {'group': 'micro', **measure(fn, min_time)}
+            _report(name, benchmarks[name])
+
+    benchmarks.update(asyncio.run(run_endpoints(sizes, min_time, selected)))
+
+    if selected('serialize'):
+        iterations = 1000 if quick else 5000
+        for name, result in asyncio.run(bench_serialization.run(iterations)).items():
+            for path in ('default', 'fast'):
+                seconds = result[f'{path}_us'] / 1e6
+                key = f'serialize_{name}[{path}]'
+                # Only the mean per request is measured here
+                benchmarks[key] = {
+                    'group': 'serialization', 'unit': 'seconds', 'rounds': 1, 'iterations': iterations,
+                    'median': seconds, 'mean': seconds, 'p95': seconds, 'min': seconds, 'stdev': 0.0,
+                    'ops_per_sec': 1 / seconds,
+                }
+                _report(key, benchmarks[key])
+
+    return {'meta': metadata(quick), 'benchmarks': benchmarks}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--quick', action='store_true', help='small pages only, shorter timing (CI smoke run)')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<commit>.json)')
+    args = parser.parse_args()
+
+    # Per-request INFO logs would dominate the cheap endpoints
+    logging.disable(logging.INFO)
+
+    results = run(quick=args.quick, name_filter=args.filter)
+    meta = results['meta']
+    if args.output:
+        output = Path(args.output)
+    else:
+        suffix = '-dirty' if meta['dirty'] else ''
+        output = RESULTS_DIR / f"{meta['commit'] or 'unknown'}{suffix}{'-quick' if args.quick else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + '\n')
+    print(f"\nResults written to {output}")
+
+
+if __name__ == '__main__':
+    main()
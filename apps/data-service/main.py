@@ -1,5 +1,15 @@
+import asyncio
+import os
+import time
+
+# Cold start: measured from the first line of the app module
+_IMPORT_STARTED = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES
 import logging
 from pathlib import Path
 import sys
@@ -8,9 +18,21 @@ import sys
 SERVICE_ROOT = Path(__file__).resolve().parent
 sys.path.insert(0, str(SERVICE_ROOT / 'src'))
 
+from middleware.decompression import RequestDecompressionMiddleware
+from middleware.metrics import MetricsMiddleware
+from middleware.profiling import ProfilingMiddleware
+
 # Import routers
 from routers.ia_router import router as ia_router
 from routers.discovery_router import router as discovery_router
+from routers.metrics_router import router as metrics_router
+from routers.profiling_router import router as profiling_router
+from services.backend_client import backend
+from services.discovery_service import seed_known_urls
+from services.gemini_client import gemini_models
+from services.gemini_executor import gemini_executor
+from services.ia_service import ia_service
+from services.metrics import STARTUP_SECONDS
 
 # Configure logging
 logging.basicConfig(
@@ -18,7 +40,43 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-app = FastAPI(title="Granter Data Service")
+
+logger = logging.getLogger(__name__)
+IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up_started = time.perf_counter()
+    await backend.start()
+    # Build the shared Gemini model (SDK import) and spawn the heuristic process
+    # pool (no-op unless HEURISTIC_EXECUTION_MODE=process) before traffic arrives
+    await asyncio.gather(gemini_models.warm_up(), ia_service.heuristic_runner.start())
+    warm_up_seconds = time.perf_counter() - warm_up_started
+
+    # The backend's sources feed the known-URL filter; discovery works without it meanwhile
+    seeding = None
+    if os.getenv('DISCOVERY_KNOWN_URLS_SEED', 'true').lower() not in ('0', 'false', 'no'):
+        seeding = asyncio.create_task(seed_known_urls())
+
+    STARTUP_SECONDS.labels('imports').set(IMPORT_SECONDS)
+    STARTUP_SECONDS.labels('warm_up').set(warm_up_seconds)
+    logger.info(
+        f"⚡ Service ready in {IMPORT_SECONDS + warm_up_seconds:.2f}s "
+        f"(imports {IMPORT_SECONDS:.2f}s, warm-up {warm_up_seconds:.2f}s)"
+    )
+    yield
+    if seeding is not None:
+        seeding.cancel()
+    await backend.close()
+    ia_service.heuristic_runner.shutdown()
+    gemini_executor.shutdown()
+
+
+app = FastAPI(title="Granter Data Service", lifespan=lifespan)
+
+# Innermost middleware: sees the matched route template
+app.add_middleware(MetricsMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -31,12 +89,36 @@ app.add_middleware(
     ],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
-    allow_headers=["Content-Type", "Authorization", "x-service-token"],
+    allow_headers=[
+        "Content-Type",
+        "Content-Encoding",
+        "Authorization",
+        "x-service-token",
+        "X-Source-Url",
+        "X-Source-Name",
+        "X-Profile-Token",
+    ],
+    expose_headers=["X-Profile-Id"],
 )
 
+# Compressed transport: gzip/deflate (br/zstd if installed) request bodies,
+# gzip responses. Streams are left uncompressed so records are not held back.
+app.add_middleware(RequestDecompressionMiddleware)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=1024,
+    compresslevel=6,
+    exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson",),
+)
+
+# Outermost: profiles the whole request when triggered (PROFILING_TOKEN)
+app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(ia_router)
 app.include_router(discovery_router)
+app.include_router(metrics_router)
+app.include_router(profiling_router)
 
 
 @app.get("/health")
@@ -0,0 +1,44 @@
+"""
+HTTP request metrics
+
+Counts requests by route template (not raw path, so ids in URLs cannot blow up
+label cardinality), tracks requests in flight and observes latency per route.
+Must be the innermost middleware so it sees the route FastAPI matched.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+
+
+class MetricsMiddleware:
+    """Record request count, in-flight gauge and latency for every HTTP request."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started_at = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or 'unmatched'
+            HTTP_LATENCY.labels(path).observe(time.perf_counter() - started_at)
+            HTTP_REQUESTS.labels(path, scope['method'], str(status)).inc()
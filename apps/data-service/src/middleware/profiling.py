@@ -0,0 +1,47 @@
+"""
+Request profiling trigger
+
+Profiles requests selected by the profiler (X-Profile-Token header or the
+sampled fraction of traffic) and tells the client where to download the
+result: the response carries X-Profile-Id, and the profile is served by
+GET /debug/profiles/{id}.
+"""
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from services.profiling import profiler
+
+PROFILE_TOKEN_HEADER = 'x-profile-token'
+# Downloading a profile must not capture (and store) another one
+EXCLUDED_PREFIX = '/debug/profiles'
+
+
+class ProfilingMiddleware:
+    """Run selected requests under the sampling profiler."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or not profiler.enabled or scope['path'].startswith(EXCLUDED_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        reason = profiler.trigger(Headers(scope=scope).get(PROFILE_TOKEN_HEADER))
+        handle = profiler.start(f"{scope['method']} {scope['path']}", reason) if reason else None
+        if handle is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = handle[0].id
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message).append('X-Profile-Id', profile_id)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop(handle)
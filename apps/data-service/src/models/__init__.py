@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional
+from typing import Literal, Optional
 from enum import Enum
 
 
@@ -14,6 +14,12 @@ class ExtractionMethod(str, Enum):
     HEURISTIC = "heuristic"
 
 
+class ExtractionMode(str, Enum):
+    SEQUENTIAL = "sequential"
+    HEDGED = "hedged"
+    PACKED = "packed"
+
+
 class GrantData(BaseModel):
     """Extracted grant data from HTML"""
     model_config = ConfigDict(use_enum_values=True)
@@ -32,6 +38,12 @@ class ExtractionRequest(BaseModel):
     html: str = Field(..., min_length=100, max_length=1000000)
     url: str
     source: str
+    # sequential: heuristic only after Gemini fails
+    # hedged: heuristic runs alongside Gemini; returned if Gemini misses the budget
+    # packed: Gemini call shared with concurrent requests (one prompt, several pages)
+    mode: ExtractionMode = ExtractionMode.SEQUENTIAL
+    latency_budget_ms: Optional[int] = Field(None, ge=0, le=10000)
+    cache_late_result: bool = True
 
 
 class ExtractionResponse(BaseModel):
@@ -40,6 +52,38 @@ class ExtractionResponse(BaseModel):
     data: Optional[GrantData] = None
     method_used: ExtractionMethod
     error: Optional[str] = None
+    cached: bool = False
+
+
+class BatchExtractionRequest(BaseModel):
+    """Request to extract grant data from several HTML documents"""
+    items: list[ExtractionRequest] = Field(..., min_length=1, max_length=100)
+    concurrency: Optional[int] = Field(None, ge=1, le=32)
+
+
+class BatchExtractionResponse(BaseModel):
+    """Per-item extraction results, in the same order as the request items"""
+    results: list[ExtractionResponse]
+    succeeded: int
+    failed: int
+
+
+class StreamExtractionRequest(BatchExtractionRequest):
+    """Request for streamed extraction (results sent as each document completes)"""
+    items: list[ExtractionRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class StreamedExtractionResult(ExtractionResponse):
+    """One streamed result; index is the item's position in the request"""
+    index: int
+
+
+class StreamSummary(BaseModel):
+    """Final record of an extraction stream"""
+    total: int
+    succeeded: int
+    failed: int
+    elapsed_ms: int
 
 
 class SourceType(str, Enum):
@@ -57,9 +101,18 @@ class DiscoveredSource(BaseModel):
     metadata: dict[str, object] = Field(default_factory=dict)
 
 
+class SourceSaveResult(BaseModel):
+    """Outcome of saving one discovered source to the backend"""
+    baseUrl: str
+    status: Literal["created", "exists", "failed", "skipped"]
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
 class DiscoveryResponse(BaseModel):
     message: str
     found: int
     saved_as_inactive: int
     auto_saved: bool
     sources: list[DiscoveredSource]
+    save_results: list[SourceSaveResult] = Field(default_factory=list)
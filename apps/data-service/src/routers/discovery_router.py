@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Query
 
-from models import DiscoveryResponse, DiscoveredSource
-from services.backend_client import create_source
-from services.discovery_service import discover_sources
+from models import DiscoveryResponse
+from services.backend_client import backend
+from services.discovery_service import discover_sources, remember_sources
+from services.serialization import FastJSONResponse, fast_json_enabled
 
 router = APIRouter(prefix="", tags=["discovery"])
 
@@ -15,25 +16,38 @@ async def discover(
     validate_with_ia: bool = Query(default=True),
     auto_save: bool = Query(default=False),
     skip_domain_filter: bool = Query(default=True),
-) -> DiscoveryResponse:
+    refresh_search_cache: bool = Query(default=False),
+    include_known: bool = Query(default=False),
+) -> DiscoveryResponse | FastJSONResponse:
     sources = await discover_sources(
         scope=scope,
         provincias=provincias,
         max_results=max_results,
         validate_with_ia=validate_with_ia,
         skip_domain_filter=skip_domain_filter,
+        refresh_searches=refresh_search_cache,
+        include_known=include_known,
     )
 
-    saved_count = 0
+    save_results = []
     if auto_save:
-        for source in sources:
-            if create_source(source):
-                saved_count += 1
+        # Concurrent POSTs over the pooled backend connections, one outcome per source
+        save_results = await backend.upsert_sources(sources)
+        remember_sources([
+            source for source, result in zip(sources, save_results) if result.status in ("created", "exists")
+        ])
+    saved_count = sum(result.status == "created" for result in save_results)
 
-    return DiscoveryResponse(
+    # Sources are DiscoveredSource instances built by discover_sources: passing
+    # them through skips re-validation (model_validate per source cost ~25us/request)
+    response = DiscoveryResponse(
         message="Discovery completed",
         found=len(sources),
         saved_as_inactive=saved_count if auto_save else 0,
         auto_saved=auto_save,
-        sources=[DiscoveredSource.model_validate(s) for s in sources],
+        sources=sources,
+        save_results=save_results,
     )
+    if fast_json_enabled():
+        return FastJSONResponse(response)
+    return response
@@ -1,8 +1,30 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 import logging
+import time
+from typing import AsyncIterator, Literal, Optional
+from pydantic import ValidationError
 
-from models import ExtractionRequest, ExtractionResponse
+from models import (
+    BatchExtractionRequest,
+    BatchExtractionResponse,
+    ExtractionMode,
+    ExtractionRequest,
+    ExtractionResponse,
+    StreamedExtractionResult,
+    StreamExtractionRequest,
+    StreamSummary,
+)
+from services import discovery_service
+from services.backend_client import backend
+from services.circuit_breaker import circuit_breakers
+from services.fake_providers import gemini_provider, shared_fake_model
+from services.gemini_client import gemini_models
+from services.gemini_executor import gemini_executor
 from services.ia_service import ia_service
+from services.rate_limiter import rate_limiters
+from services.serialization import FastJSONResponse, fast_json_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -10,7 +32,7 @@ router = APIRouter(prefix="/api/ia", tags=["Intelligence & Analytics"])
 
 
 @router.post("/extract", response_model=ExtractionResponse)
-async def extract_grant(request: ExtractionRequest) -> ExtractionResponse:
+async def extract_grant(request: ExtractionRequest) -> ExtractionResponse | FastJSONResponse:
     """
     Extract grant data from HTML.
 
@@ -25,24 +47,85 @@ async def extract_grant(request: ExtractionRequest) -> ExtractionResponse:
     - method_used: "gemini" or "heuristic"
     - error: Error message (if failed)
     """
+    return await _extract_or_raise(request)
+
+
+@router.post("/extract/html", response_model=ExtractionResponse)
+async def extract_grant_from_html(
+    http_request: Request,
+    url: Optional[str] = Query(None),
+    source: Optional[str] = Query(None),
+    mode: ExtractionMode = Query(ExtractionMode.SEQUENTIAL),
+    latency_budget_ms: Optional[int] = Query(None, ge=0, le=10000),
+) -> ExtractionResponse | FastJSONResponse:
+    """
+    Extract grant data from a raw HTML body (no JSON wrapping).
+
+    Body: the page itself (Content-Type: text/html; charset from the header,
+    default utf-8), optionally compressed with Content-Encoding.
+
+    Parameters (query string, or headers X-Source-Url / X-Source-Name):
+    - url: Source URL
+    - source: Source name
+    - mode, latency_budget_ms: as in /extract
+
+    Returns: same as /extract
+    """
+    url = url or http_request.headers.get("x-source-url")
+    source = source or http_request.headers.get("x-source-name")
+    if not url or not source:
+        raise HTTPException(
+            status_code=422,
+            detail="url and source are required (query parameters or X-Source-Url / X-Source-Name headers)",
+        )
+
+    body = await http_request.body()
+    charset = _charset(http_request.headers.get("content-type", "")) or "utf-8"
     try:
-        success, data, method, error = await ia_service.extract_grant(
-            html=request.html,
-            url=request.url,
-            source=request.source,
+        html = body.decode(charset, errors="replace")
+    except LookupError:
+        raise HTTPException(status_code=415, detail=f"Unknown charset '{charset}'")
+
+    try:
+        request = ExtractionRequest(
+            html=html,
+            url=url,
+            source=source,
+            mode=mode,
+            latency_budget_ms=latency_budget_ms,
         )
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=jsonable_encoder(e.errors(include_url=False)))
+
+    return await _extract_or_raise(request)
+
 
-        if not success:
+def _charset(content_type: str) -> Optional[str]:
+    for parameter in content_type.split(";")[1:]:
+        name, _, value = parameter.partition("=")
+        if name.strip().lower() == "charset":
+            return value.strip().strip('"') or None
+    return None
+
+
+def _respond(response):
+    """Return the response as is, or pre-serialized when FAST_JSON_RESPONSES is on."""
+    if fast_json_enabled():
+        return FastJSONResponse(response)
+    return response
+
+
+async def _extract_or_raise(request: ExtractionRequest) -> ExtractionResponse | FastJSONResponse:
+    try:
+        response = await ia_service.extract(request)
+
+        if not response.success:
             raise HTTPException(
                 status_code=500,
-                detail=error or "Failed to extract grant data",
+                detail=response.error or "Failed to extract grant data",
             )
 
-        return ExtractionResponse(
-            success=True,
-            data=data,
-            method_used=method,
-        )
+        return _respond(response)
 
     except HTTPException:
         raise
@@ -53,3 +136,158 @@ async def extract_grant(request: ExtractionRequest) -> ExtractionResponse:
             status_code=500,
             detail="Internal server error during extraction",
         )
+
+
+@router.post("/extract/batch", response_model=BatchExtractionResponse)
+async def extract_grants_batch(
+    request: BatchExtractionRequest,
+) -> BatchExtractionResponse | FastJSONResponse:
+    """
+    Extract grant data from several HTML documents in one call.
+
+    Request body:
+    - items: List of extraction requests (html, url, source), max 100
+    - concurrency: Max concurrent extractions (optional, default IA_BATCH_CONCURRENCY)
+
+    Items with mode="packed" that run concurrently share Gemini calls
+    (up to GEMINI_PACK_MAX_DOCS pages per prompt).
+
+    Returns:
+    - results: One extraction response per item, in request order.
+      Failed items have success=false and an error message.
+    - succeeded: Number of successful items
+    - failed: Number of failed items
+    """
+    results = await ia_service.extract_batch(
+        request.items,
+        concurrency=request.concurrency,
+    )
+    succeeded = sum(1 for result in results if result.success)
+
+    return _respond(BatchExtractionResponse(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+    ))
+
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _stream_record(kind: str, payload: str, stream_format: str) -> str:
+    if stream_format == "sse":
+        return f"event: {kind}\ndata: {payload}\n\n"
+    return payload + "\n"
+
+
+@router.post("/extract/stream")
+async def extract_grants_stream(
+    request: StreamExtractionRequest,
+    http_request: Request,
+    stream_format: Optional[Literal["ndjson", "sse"]] = Query(None, alias="format"),
+) -> StreamingResponse:
+    """
+    Extract grant data from many HTML documents, streaming each result as it completes.
+
+    Request body: same as /extract/batch (items, concurrency), up to 1000 items.
+
+    Query parameters:
+    - format: "ndjson" (default) or "sse"; an Accept: text/event-stream header
+      also selects server-sent events
+
+    Stream:
+    - One record per document in completion order: an extraction response
+      plus "index", the item's position in the request
+      (SSE: "event: result")
+    - A final summary record: {"summary": {total, succeeded, failed, elapsed_ms}}
+      (SSE: "event: summary")
+
+    Results are produced only as fast as the client reads them: a slow
+    consumer pauses the extraction workers instead of buffering results.
+    """
+    if stream_format is None:
+        accept = http_request.headers.get("accept", "")
+        stream_format = "sse" if "text/event-stream" in accept else "ndjson"
+
+    async def records() -> AsyncIterator[str]:
+        started_at = time.perf_counter()
+        succeeded = 0
+        async for index, response in ia_service.extract_stream(
+            request.items,
+            concurrency=request.concurrency,
+        ):
+            succeeded += int(response.success)
+            # dict(response) keeps data as a GrantData instance (no dump/re-parse)
+            result = StreamedExtractionResult(index=index, **dict(response))
+            yield _stream_record("result", result.model_dump_json(), stream_format)
+
+        summary = StreamSummary(
+            total=len(request.items),
+            succeeded=succeeded,
+            failed=len(request.items) - succeeded,
+            elapsed_ms=int((time.perf_counter() - started_at) * 1000),
+        )
+        yield _stream_record(
+            "summary",
+            f'{{"summary": {summary.model_dump_json()}}}',
+            stream_format,
+        )
+
+    return StreamingResponse(records(), media_type=STREAM_MEDIA_TYPES[stream_format])
+
+
+@router.get("/stats")
+async def extraction_stats() -> dict[str, object]:
+    """
+    Runtime statistics of the extraction pipeline.
+
+    Returns:
+    - cache: Extraction cache counters (hits, misses, hit_ratio, ...) or null when disabled
+    - heuristic_executor: Heuristic execution mode, pool size and task counters
+    - rate_limits: Per-bucket throttling counters (Gemini, DuckDuckGo)
+    - gemini_packing: Packed prompts sent, documents per pack and per-document fallbacks
+    - gemini_executor: Running, queued and abandoned Gemini calls, saturation and rejections
+    - gemini_client: Provider, models built so far and their initialization time
+    - discovery_search_cache: Fresh/stale hits and background refreshes of the
+      discovery search cache, or null when disabled
+    - discovery_verdicts: Stored validation verdict hits, misses and outdated
+      versions, or null when disabled
+    - discovery_known_urls: Size of the known-URL filter, URLs seeded from the
+      backend and candidates skipped, or null when disabled
+    - backend_client: Backend connection pool settings and per-source save outcomes
+    - fake_gemini: Injected outcomes of the fake provider (only with GEMINI_PROVIDER=fake)
+    """
+    search_cache = discovery_service.search_cache
+    verdict_store = discovery_service.verdict_store
+    known_urls = discovery_service.known_urls
+    stats = {
+        "cache": ia_service.cache.stats() if ia_service.cache else None,
+        "heuristic_executor": ia_service.heuristic_runner.stats(),
+        "rate_limits": rate_limiters.stats(),
+        "gemini_packing": ia_service.packer.stats(),
+        "gemini_executor": gemini_executor.stats(),
+        "gemini_client": gemini_models.stats(),
+        "discovery_search_cache": search_cache.stats() if search_cache else None,
+        "discovery_verdicts": verdict_store.stats() if verdict_store else None,
+        "discovery_known_urls": known_urls.stats() if known_urls is not None else None,
+        "backend_client": backend.stats(),
+    }
+    if gemini_provider() == "fake":
+        stats["fake_gemini"] = shared_fake_model().stats()
+    return stats
+
+
+@router.get("/circuit-breakers")
+async def circuit_breaker_states() -> dict[str, object]:
+    """
+    State of the circuit breakers around external providers.
+
+    Returns:
+    - breakers: Per-breaker state ("closed", "open" or "half_open"), window
+      failure rate and time until the next probe
+    """
+    circuit_breakers.get('gemini')  # always report the Gemini breaker
+    return {"breakers": circuit_breakers.stats()}
@@ -0,0 +1,72 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from services import discovery_service
+from services.circuit_breaker import CircuitState, circuit_breakers
+from services.gemini_executor import gemini_executor
+from services.ia_service import ia_service
+from services.metrics import metrics
+from services.rate_limiter import rate_limiters
+
+router = APIRouter(prefix="", tags=["metrics"])
+
+CIRCUIT_STATE_VALUES = {CircuitState.CLOSED.value: 0, CircuitState.HALF_OPEN.value: 1, CircuitState.OPEN.value: 2}
+
+
+def _component_metrics():
+    """Scrape-time values owned by the cache, executors, breakers and rate limiters."""
+    caches = []
+    if ia_service.cache is not None:
+        caches.append(ia_service.cache.stats())
+    if discovery_service.search_cache is not None:
+        caches.append(discovery_service.search_cache.stats()["store"])
+    if discovery_service.verdict_store is not None:
+        caches.append(discovery_service.verdict_store.stats()["store"])
+    if caches:
+        rows = [({"cache": cache["namespace"]}, cache) for cache in caches]
+        yield "granter_cache_hits_total", "counter", "Cache hits", [
+            (labels, cache["hits"]) for labels, cache in rows
+        ]
+        yield "granter_cache_misses_total", "counter", "Cache misses", [
+            (labels, cache["misses"]) for labels, cache in rows
+        ]
+        yield "granter_cache_hit_ratio", "gauge", "Cache hits / lookups since start", [
+            (labels, cache["hit_ratio"]) for labels, cache in rows
+        ]
+        yield "granter_cache_entries", "gauge", "Entries in the in-memory cache tier", [
+            (labels, cache["entries"]) for labels, cache in rows
+        ]
+
+    executor = gemini_executor.stats()
+    yield "granter_gemini_executor_running", "gauge", "Gemini calls running (incl. abandoned)", [
+        ({}, executor["running"]),
+    ]
+    yield "granter_gemini_executor_queue_depth", "gauge", "Gemini calls waiting for a worker", [
+        ({}, executor["queue_depth"]),
+    ]
+    yield "granter_gemini_executor_abandoned", "gauge", "Timed-out Gemini calls still holding a thread", [
+        ({}, executor["abandoned"]),
+    ]
+    yield "granter_gemini_executor_rejected_total", "counter", "Gemini calls rejected by a saturated executor", [
+        ({}, executor["rejected"]),
+    ]
+
+    heuristic = ia_service.heuristic_runner.stats()
+    yield "granter_heuristic_in_flight", "gauge", "Heuristic extractions running", [({}, heuristic["in_flight"])]
+
+    yield "granter_circuit_breaker_state", "gauge", "Circuit state (0 closed, 1 half-open, 2 open)", [
+        ({"breaker": name}, CIRCUIT_STATE_VALUES[stats["state"]])
+        for name, stats in circuit_breakers.stats().items()
+    ]
+    yield "granter_rate_limit_throttled_seconds_total", "counter", "Time spent waiting for rate limit tokens", [
+        ({"bucket": name}, stats["throttled_seconds"]) for name, stats in rate_limiters.stats().items()
+    ]
+
+
+metrics.add_collector(_component_metrics)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics() -> PlainTextResponse:
+    """Prometheus metrics in the text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
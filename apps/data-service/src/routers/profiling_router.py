@@ -0,0 +1,62 @@
+import json
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse, Response
+
+from services.profiling import PROFILE_FORMATS, profiler
+
+router = APIRouter(prefix="/debug/profiles", tags=["profiling"])
+
+
+def _require_token(token: Optional[str]) -> None:
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (PROFILING_TOKEN not set)")
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid or missing X-Profile-Token")
+
+
+@router.get("")
+async def list_profiles(x_profile_token: Optional[str] = Header(default=None)) -> dict[str, object]:
+    """
+    Recently captured request profiles, newest first.
+
+    Returns:
+    - profiles: Id, request, trigger reason, duration, sample count and spans
+    - stats: Profiler settings and counters
+    """
+    _require_token(x_profile_token)
+    return {"profiles": profiler.list(), "stats": profiler.stats()}
+
+
+@router.get("/{profile_id}")
+async def download_profile(
+    profile_id: str,
+    format: str = Query(default="speedscope"),
+    x_profile_token: Optional[str] = Header(default=None),
+) -> Response:
+    """
+    Download a captured profile.
+
+    Query Parameters:
+    - format: "speedscope" (JSON for https://www.speedscope.app) or "collapsed"
+      (one "frame;frame;frame count" line per stack, for flamegraph tools)
+    """
+    _require_token(x_profile_token)
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(PROFILE_FORMATS)}")
+
+    profile = profiler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+    if format == "collapsed":
+        return PlainTextResponse(
+            profile.to_collapsed(),
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.txt"'},
+        )
+    return Response(
+        json.dumps(profile.to_speedscope()),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'},
+    )
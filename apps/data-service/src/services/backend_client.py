@@ -1,38 +1,245 @@
+"""
+Backend API client (sources)
+
+One pooled httpx.AsyncClient, opened in the FastAPI lifespan and shared by
+every request: connections to the backend are kept alive between calls (and
+multiplexed over HTTP/2 when the h2 package is installed) instead of opening
+one per source.
+
+The backend creates sources one at a time (POST /sources/service), so
+upsert_sources posts them concurrently, at most BACKEND_UPSERT_CONCURRENCY
+at a time, and reports an outcome per source:
+
+- created: saved (HTTP 200/201)
+- exists: the backend already has the URL (HTTP 409)
+- failed: any other status, timeout or connection error
+- skipped: backend not configured (no BACKEND_URL or SERVICE_TOKEN)
+
+Configuration:
+- BACKEND_URL: Backend base URL (default: http://localhost:3001)
+- SERVICE_TOKEN: Sent as x-service-token on writes
+- BACKEND_MAX_CONNECTIONS: Connection pool size (default: 10)
+- BACKEND_UPSERT_CONCURRENCY: Sources posted at once (default: 8)
+- BACKEND_TIMEOUT_SECONDS: Timeout per call (default: 10)
+- BACKEND_HTTP2: Use HTTP/2 when h2 is installed (default: true)
+"""
+
+import asyncio
+import importlib.util
+import logging
 import os
-from typing import Optional
+from typing import Any, Optional
 
 import httpx
 
-from models import DiscoveredSource
+from models import DiscoveredSource, SourceSaveResult
+from services.metrics import DISCOVERY_LATENCY, DISCOVERY_TIMEOUTS
+
+logger = logging.getLogger(__name__)
+
 
-BACKEND_URL = os.getenv('BACKEND_URL', 'http://localhost:3001')
-SERVICE_TOKEN = os.getenv('SERVICE_TOKEN', '')
+class BackendClient:
+    """Pooled async client for the backend sources API."""
 
+    DEFAULT_URL = 'http://localhost:3001'
+    DEFAULT_MAX_CONNECTIONS = 10
+    DEFAULT_UPSERT_CONCURRENCY = 8
+    DEFAULT_TIMEOUT_SECONDS = 10.0
 
-def is_configured() -> bool:
-    return bool(BACKEND_URL and SERVICE_TOKEN)
+    def __init__(
+        self,
+        base_url: str = DEFAULT_URL,
+        service_token: str = '',
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        upsert_concurrency: int = DEFAULT_UPSERT_CONCURRENCY,
+        timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS,
+        http2: bool = True,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        """
+        Initialize the client (the connection pool is opened by start()).
 
+        Args:
+            base_url: Backend base URL
+            service_token: Value of the x-service-token header
+            max_connections: Connection pool size
+            upsert_concurrency: Most sources posted at once by upsert_sources
+            timeout_seconds: Timeout per call
+            http2: Negotiate HTTP/2 (only if the h2 package is installed)
+            transport: Custom transport (tests)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.service_token = service_token
+        self.max_connections = max(1, max_connections)
+        self.upsert_concurrency = max(1, upsert_concurrency)
+        self.timeout_seconds = timeout_seconds
+        self.http2 = http2 and importlib.util.find_spec('h2') is not None
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
 
-def create_source(source: DiscoveredSource) -> bool:
-    if not is_configured():
-        return False
+        self.created = 0
+        self.existing = 0
+        self.failed = 0
 
-    payload = {
-        'name': source.name,
-        'baseUrl': source.baseUrl,
-        'type': source.type,
-        'isActive': source.isActive,
-        'metadata': source.metadata,
-    }
+    @classmethod
+    def from_env(cls) -> 'BackendClient':
+        return cls(
+            base_url=os.getenv('BACKEND_URL', cls.DEFAULT_URL),
+            service_token=os.getenv('SERVICE_TOKEN', ''),
+            max_connections=int(os.getenv('BACKEND_MAX_CONNECTIONS', str(cls.DEFAULT_MAX_CONNECTIONS))),
+            upsert_concurrency=int(
+                os.getenv('BACKEND_UPSERT_CONCURRENCY', str(cls.DEFAULT_UPSERT_CONCURRENCY))
+            ),
+            timeout_seconds=float(os.getenv('BACKEND_TIMEOUT_SECONDS', str(cls.DEFAULT_TIMEOUT_SECONDS))),
+            http2=os.getenv('BACKEND_HTTP2', 'true').lower() not in ('0', 'false', 'no'),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.base_url and self.service_token)
+
+    async def start(self) -> None:
+        """Open the connection pool (FastAPI lifespan)."""
+        if self._client is None:
+            self._client = self._build_client()
+            protocol = 'HTTP/2' if self.http2 else 'HTTP/1.1'
+            logger.info(f"Backend client pool ready ({self.base_url}, {protocol}, {self.max_connections} connections)")
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
 
-    headers = {'x-service-token': SERVICE_TOKEN}
-    try:
-        response = httpx.post(
-            f"{BACKEND_URL}/sources/service",
-            json=payload,
-            headers=headers,
-            timeout=10,
+    def _build_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
         )
-        return response.status_code in (200, 201)
-    except httpx.HTTPError:
-        return False
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout_seconds,
+            limits=limits,
+            http2=self.http2,
+            transport=self._transport,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The pooled client (opened on first use when the lifespan did not run)."""
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    async def create_source(self, source: DiscoveredSource) -> SourceSaveResult:
+        """
+        Create one source (POST /sources/service).
+
+        Args:
+            source: Discovered source
+
+        Returns:
+            Outcome for the source
+        """
+        if not self.configured:
+            return SourceSaveResult(baseUrl=source.baseUrl, status='skipped', error='backend not configured')
+
+        payload = {
+            'name': source.name,
+            'baseUrl': source.baseUrl,
+            'type': source.type,
+            'isActive': source.isActive,
+            'metadata': source.metadata,
+        }
+        try:
+            with DISCOVERY_LATENCY.labels('backend_post').time():
+                response = await self.client.post(
+                    '/sources/service',
+                    json=payload,
+                    headers={'x-service-token': self.service_token},
+                )
+        except httpx.TimeoutException:
+            DISCOVERY_TIMEOUTS.labels('backend_post').inc()
+            self.failed += 1
+            return SourceSaveResult(baseUrl=source.baseUrl, status='failed', error='timeout')
+        except httpx.HTTPError as e:
+            self.failed += 1
+            return SourceSaveResult(baseUrl=source.baseUrl, status='failed', error=type(e).__name__)
+
+        code = response.status_code
+        if code in (200, 201):
+            self.created += 1
+            return SourceSaveResult(baseUrl=source.baseUrl, status='created', status_code=code)
+        if code == 409:
+            self.existing += 1
+            return SourceSaveResult(baseUrl=source.baseUrl, status='exists', status_code=code)
+        self.failed += 1
+        return SourceSaveResult(baseUrl=source.baseUrl, status='failed', status_code=code, error=response.text[:200])
+
+    async def upsert_sources(
+        self,
+        sources: list[DiscoveredSource],
+        concurrency: Optional[int] = None,
+    ) -> list[SourceSaveResult]:
+        """
+        Create many sources over the pooled connections.
+
+        Args:
+            sources: Discovered sources
+            concurrency: Most sources posted at once (default: BACKEND_UPSERT_CONCURRENCY)
+
+        Returns:
+            One outcome per source, in order
+        """
+        if not sources:
+            return []
+        slots = asyncio.Semaphore(max(1, concurrency or self.upsert_concurrency))
+
+        async def create(source: DiscoveredSource) -> SourceSaveResult:
+            async with slots:
+                return await self.create_source(source)
+
+        results = await asyncio.gather(*(create(source) for source in sources))
+        created = sum(result.status == 'created' for result in results)
+        existing = sum(result.status == 'exists' for result in results)
+        failed = sum(result.status == 'failed' for result in results)
+        if failed:
+            logger.warning(f"✗ Saved {created}/{len(results)} sources ({existing} already existed, {failed} failed)")
+        elif self.configured:
+            logger.info(f"✓ Saved {created}/{len(results)} sources ({existing} already existed)")
+        return list(results)
+
+    async def fetch_source_urls(self) -> Optional[list[str]]:
+        """URLs of every source the backend has (GET /sources), or None on failure."""
+        if not self.base_url:
+            return None
+
+        try:
+            response = await self.client.get('/sources')
+            response.raise_for_status()
+            records = response.json()
+        except (httpx.HTTPError, ValueError):
+            return None
+        if not isinstance(records, list):
+            return None
+        return [
+            record.get('url') or record.get('baseUrl')
+            for record in records
+            if isinstance(record, dict) and (record.get('url') or record.get('baseUrl'))
+        ]
+
+    def stats(self) -> dict[str, Any]:
+        """Return pool settings and outcome counters."""
+        return {
+            'configured': self.configured,
+            'http2': self.http2,
+            'max_connections': self.max_connections,
+            'upsert_concurrency': self.upsert_concurrency,
+            'created': self.created,
+            'existing': self.existing,
+            'failed': self.failed,
+        }
+
+
+# Singleton client
+backend = BackendClient.from_env()
@@ -0,0 +1,289 @@
+"""
+Circuit Breaker for external providers
+
+Stops calling a provider that is timing out or failing, instead of paying the
+full timeout on every request. States:
+
+- closed: calls flow normally; outcomes are recorded in a sliding time window
+- open: calls are rejected immediately (callers use their fallback path)
+- half_open: after a cool-down, a few probe calls are let through; a successful
+  probe closes the circuit, a failed one opens it again
+
+allow_request hands out a CallPermit that the caller passes back with the
+outcome. Only the outcome of a probe of the current half-open period changes
+the half-open state: late results of calls let through while the circuit was
+closed are recorded in the window but neither close it nor free probe slots.
+
+Configuration per breaker (upper-case name, e.g. GEMINI):
+- CIRCUIT_BREAKER_<NAME>_FAILURE_RATE: Failure/timeout ratio that trips the breaker
+- CIRCUIT_BREAKER_<NAME>_MIN_CALLS: Calls needed in the window before tripping
+- CIRCUIT_BREAKER_<NAME>_WINDOW_SECONDS: Sliding window length
+- CIRCUIT_BREAKER_<NAME>_OPEN_SECONDS: Cool-down before probing
+- CIRCUIT_BREAKER_<NAME>_HALF_OPEN_PROBES: Concurrent probe calls allowed
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class CallPermit:
+    """An allowed call; passed back to record_success, record_failure or release."""
+
+    probe: bool = False
+    # Half-open period the probe was let through in
+    generation: int = 0
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding time window."""
+
+    SUCCESS = 'success'
+    FAILURE = 'failure'
+    TIMEOUT = 'timeout'
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        min_calls: int = 5,
+        window_seconds: float = 60,
+        open_seconds: float = 30,
+        half_open_probes: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the breaker (closed).
+
+        Args:
+            name: Breaker name (e.g. 'gemini')
+            failure_rate_threshold: Ratio of failures+timeouts that opens the circuit
+            min_calls: Minimum calls in the window before the ratio is evaluated
+            window_seconds: Sliding window length
+            open_seconds: Time the circuit stays open before probing
+            half_open_probes: Max concurrent probe calls while half-open
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = max(1, min_calls)
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = max(1, half_open_probes)
+        self._clock = clock
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._generation = 0
+        self._window: deque[tuple[float, str]] = deque()
+        self._lock = threading.Lock()
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def allow_request(self) -> Optional[CallPermit]:
+        """
+        Check whether a call may proceed.
+
+        Every allowed call must be followed by record_success, record_failure
+        or release, with the permit returned here.
+
+        Returns:
+            A permit if the caller should call the provider, None to use the fallback
+        """
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == CircuitState.CLOSED:
+                return CallPermit()
+            if state == CircuitState.HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                logger.info(f"Circuit '{self.name}' half-open - sending probe request")
+                return CallPermit(probe=True, generation=self._generation)
+            self.rejected += 1
+            return None
+
+    def record_success(self, permit: Optional[CallPermit] = None) -> None:
+        """
+        Record a successful call.
+
+        Args:
+            permit: Permit the call was allowed with (None: not a probe)
+        """
+        with self._lock:
+            now = self._clock()
+            if self._is_probe(self._current_state(now), permit):
+                self._close()
+                return
+            self._record(now, self.SUCCESS)
+
+    def record_failure(self, timeout: bool = False, permit: Optional[CallPermit] = None) -> None:
+        """
+        Record a failed call.
+
+        Args:
+            timeout: Whether the failure was a timeout
+            permit: Permit the call was allowed with (None: not a probe)
+        """
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if self._is_probe(state, permit):
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._open(now, 'probe failed')
+                return
+            self._record(now, self.TIMEOUT if timeout else self.FAILURE)
+            # Late results of calls started before the circuit opened do not re-open it
+            if state == CircuitState.CLOSED:
+                self._evaluate(now)
+
+    def release(self, permit: Optional[CallPermit] = None) -> None:
+        """
+        Give back an allowed call that never reached the provider.
+
+        Args:
+            permit: Permit the call was allowed with (None: not a probe)
+        """
+        with self._lock:
+            if self._is_probe(self._current_state(self._clock()), permit):
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def reset(self) -> None:
+        """Force the circuit closed and clear the window."""
+        with self._lock:
+            self._close()
+
+    def stats(self) -> dict[str, Any]:
+        """Return state and window counters."""
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            self._prune(now)
+            outcomes = [outcome for _, outcome in self._window]
+            calls = len(outcomes)
+            failures = outcomes.count(self.FAILURE)
+            timeouts = outcomes.count(self.TIMEOUT)
+            return {
+                'state': state.value,
+                'window_calls': calls,
+                'window_failures': failures,
+                'window_timeouts': timeouts,
+                'failure_rate': round((failures + timeouts) / calls, 4) if calls else 0.0,
+                'failure_rate_threshold': self.failure_rate_threshold,
+                'open_seconds': self.open_seconds,
+                'retry_in_seconds': (
+                    round(max(0.0, self._opened_at + self.open_seconds - now), 2)
+                    if state == CircuitState.OPEN else 0.0
+                ),
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+            }
+
+    def _current_state(self, now: float) -> CircuitState:
+        if self._state == CircuitState.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._probes_in_flight = 0
+            self._generation += 1
+        return self._state
+
+    def _is_probe(self, state: CircuitState, permit: Optional[CallPermit]) -> bool:
+        """Whether the permit is a probe of the current half-open period."""
+        return (
+            state == CircuitState.HALF_OPEN
+            and permit is not None
+            and permit.probe
+            and permit.generation == self._generation
+        )
+
+    def _record(self, now: float, outcome: str) -> None:
+        self._window.append((now, outcome))
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            self._window.popleft()
+
+    def _evaluate(self, now: float) -> None:
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for _, outcome in self._window if outcome != self.SUCCESS)
+        rate = failures / calls
+        if rate >= self.failure_rate_threshold:
+            self._open(now, f"failure rate {rate:.0%} over {calls} calls")
+
+    def _open(self, now: float, reason: str) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+        self.times_opened += 1
+        logger.warning(f"Circuit '{self.name}' opened ({reason}) - retrying in {self.open_seconds}s")
+
+    def _close(self) -> None:
+        if self._state != CircuitState.CLOSED:
+            logger.info(f"Circuit '{self.name}' closed")
+        self._state = CircuitState.CLOSED
+        self._window.clear()
+        self._probes_in_flight = 0
+
+
+class CircuitBreakerRegistry:
+    """Process-wide registry of named circuit breakers."""
+
+    def __init__(self):
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        """Get (or create from environment settings) the breaker with this name."""
+        breaker = self._breakers.get(name)
+        if breaker is not None:
+            return breaker
+
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                prefix = f"CIRCUIT_BREAKER_{name.upper()}"
+                breaker = CircuitBreaker(
+                    name=name,
+                    failure_rate_threshold=float(os.getenv(f"{prefix}_FAILURE_RATE", '0.5')),
+                    min_calls=int(os.getenv(f"{prefix}_MIN_CALLS", '5')),
+                    window_seconds=float(os.getenv(f"{prefix}_WINDOW_SECONDS", '60')),
+                    open_seconds=float(os.getenv(f"{prefix}_OPEN_SECONDS", '30')),
+                    half_open_probes=int(os.getenv(f"{prefix}_HALF_OPEN_PROBES", '1')),
+                )
+                self._breakers[name] = breaker
+            return breaker
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the state of every breaker, keyed by name."""
+        return {name: breaker.stats() for name, breaker in self._breakers.items()}
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Close one breaker (or all of them)."""
+        for breaker_name, breaker in list(self._breakers.items()):
+            if name is None or breaker_name == name:
+                breaker.reset()
+
+
+# Singleton registry
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,379 @@
+"""
+Main-content distillation for Gemini prompts
+
+Turns a full HTML page into the compact text that actually describes the grant:
+
+1. Boilerplate is dropped: scripts, styles, <head>, navigation,
+   headers/footers, forms, and blocks whose id/class/role marks them as menus,
+   cookie banners, breadcrumbs, sidebars or share widgets
+2. The main content block is isolated: <main>, <article> or role="main" when
+   present, otherwise the container holding most of the paragraph text
+3. The remaining blocks are rendered as compact markdown (headings, list items,
+   table rows, paragraphs) and cut to a token budget
+
+The page is parsed once, with the html_scanner backends: lxml when installed
+(the C parser builds the tree and prunes skipped and boilerplate elements, so
+Python only walks what is left), else the streaming html.parser collector.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Optional
+
+from services.html_scanner import lxml_available, lxml_etree, parse_document
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+SKIPPED_TAGS = frozenset((
+    'script', 'style', 'noscript', 'template', 'svg', 'iframe', 'head',
+    'nav', 'header', 'footer', 'aside', 'form', 'button', 'select', 'dialog',
+))
+BACKENDS = ('auto', 'lxml', 'stdlib')
+BOILERPLATE_ROLES = frozenset(('navigation', 'banner', 'contentinfo', 'complementary', 'search', 'dialog'))
+BOILERPLATE_MARKERS = re.compile(
+    r'cookie|consent|gdpr|breadcrumb|navbar|menu|sidebar|social|share|newsletter|popup|modal|skip-link',
+    re.IGNORECASE,
+)
+MAIN_TAGS = frozenset(('main', 'article'))
+CONTAINER_TAGS = frozenset(('div', 'section', 'main', 'article', 'td', 'body'))
+BLOCK_TAGS = frozenset((
+    'p', 'li', 'dt', 'dd', 'blockquote', 'pre', 'tr', 'caption', 'figcaption',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+))
+CELL_TAGS = frozenset(('td', 'th'))
+LINE_BREAK_TAGS = frozenset(('br', 'hr'))
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+))
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+@dataclass
+class DistilledContent:
+    """Main content of a page, ready for prompting."""
+
+    title: Optional[str]
+    text: str
+    truncated: bool
+    source_chars: int
+    blocks: list[str] = field(default_factory=list)
+
+    @property
+    def estimated_tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+@dataclass
+class _Block:
+    kind: str
+    text: str
+    containers: tuple[int, ...]
+    in_main: bool
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token for European languages)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+class _BlockCollector(HTMLParser):
+    """Streaming parser that splits visible, non-boilerplate content into blocks."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: list[tuple[str, bool, bool, Optional[int]]] = []
+        self.skip_depth = 0
+        self.main_depth = 0
+        self.container_ids: list[int] = []
+        self.next_container = 0
+
+        self.blocks: list[_Block] = []
+        self.current: list[str] = []
+        self.current_kind = 'text'
+        self.cells: list[str] = []
+
+        self.title: Optional[str] = None
+        self.in_title = False
+        self.title_parts: list[str] = []
+        self.h1: Optional[str] = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            if tag in LINE_BREAK_TAGS and not self.skip_depth:
+                self.current.append(' ')
+            return
+
+        if tag == 'title' and self.title is None:
+            self.in_title = True
+
+        skipped = tag in SKIPPED_TAGS or self._is_boilerplate(attrs)
+        is_main = tag in MAIN_TAGS or ('role', 'main') in attrs
+        container = None
+        if not self.skip_depth and not skipped:
+            if tag in BLOCK_TAGS:
+                self._flush()
+                self.current_kind = tag
+            elif tag in CELL_TAGS and not self.cells:
+                # Text before the first cell of a row is a block of its own
+                self._flush()
+            if tag in CONTAINER_TAGS:
+                container = self.next_container
+                self.next_container += 1
+                self.container_ids.append(container)
+
+        self.stack.append((tag, skipped, is_main, container))
+        if skipped:
+            self.skip_depth += 1
+        if is_main:
+            self.main_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self.in_title = False
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth][0] == tag:
+                for closed in reversed(self.stack[depth:]):
+                    self._close(closed)
+                del self.stack[depth:]
+                return
+
+    def handle_data(self, data):
+        if self.in_title:
+            self.title_parts.append(data)
+            return
+        if not self.skip_depth:
+            self.current.append(data)
+
+    def close(self):
+        super().close()
+        for closed in reversed(self.stack):
+            self._close(closed)
+        self.stack.clear()
+        self._flush()
+        if self.title_parts and self.title is None:
+            self.title = _clean(''.join(self.title_parts)) or None
+
+    def walk(self, element) -> None:
+        """Collect an lxml element whose skipped and boilerplate descendants are already pruned."""
+        tag = element.tag
+        is_main = tag in MAIN_TAGS or element.get('role') == 'main'
+        container = None
+        if tag in BLOCK_TAGS:
+            self._flush()
+            self.current_kind = tag
+        elif tag in CELL_TAGS and not self.cells:
+            self._flush()
+        if tag in CONTAINER_TAGS:
+            container = self.next_container
+            self.next_container += 1
+            self.container_ids.append(container)
+        if is_main:
+            self.main_depth += 1
+
+        if element.text:
+            self.current.append(element.text)
+        for child in element:
+            if child.tag in VOID_ELEMENTS:
+                if child.tag in LINE_BREAK_TAGS:
+                    self.current.append(' ')
+            else:
+                self.walk(child)
+            if child.tail:
+                self.current.append(child.tail)
+
+        self._close((tag, False, is_main, container))
+
+    def _close(self, entry: tuple[str, bool, bool, Optional[int]]) -> None:
+        tag, skipped, is_main, container = entry
+        if skipped:
+            self.skip_depth -= 1
+        elif not self.skip_depth:
+            if tag in CELL_TAGS:
+                self.cells.append(_clean(''.join(self.current)))
+                self.current = []
+            elif tag in BLOCK_TAGS or tag in CONTAINER_TAGS:
+                self._flush()
+            if container is not None and self.container_ids and self.container_ids[-1] == container:
+                self.container_ids.pop()
+        if is_main:
+            self.main_depth -= 1
+
+    def _flush(self) -> None:
+        if self.cells:
+            trailing = _clean(''.join(self.current))
+            cells = [cell for cell in self.cells + [trailing] if cell]
+            text = ' | '.join(cells)
+            kind = 'tr'
+            self.cells = []
+        else:
+            text = _clean(''.join(self.current))
+            kind = self.current_kind
+        self.current = []
+        self.current_kind = 'text'
+        if not text:
+            return
+        if kind == 'h1' and self.h1 is None:
+            self.h1 = text
+        self.blocks.append(_Block(kind, text, tuple(self.container_ids), self.main_depth > 0))
+
+    @staticmethod
+    def _is_boilerplate(attrs) -> bool:
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == 'role' and value.lower() in BOILERPLATE_ROLES:
+                return True
+            if name in ('id', 'class') and BOILERPLATE_MARKERS.search(value):
+                return True
+            if name == 'aria-hidden' and value == 'true':
+                return True
+        return False
+
+
+def _clean(text: str) -> str:
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def _select_main_blocks(blocks: list[_Block]) -> list[_Block]:
+    """Keep the main content: explicit main/article, else the densest container."""
+    main = [block for block in blocks if block.in_main]
+    if main:
+        return main
+
+    # Credit paragraph-like text to its container and (half) to the parent container
+    scores: dict[int, float] = {}
+    total = 0
+    for block in blocks:
+        if block.kind not in ('p', 'li', 'tr', 'dd', 'blockquote', 'pre', 'text'):
+            continue
+        length = len(block.text)
+        total += length
+        if block.containers:
+            scores[block.containers[-1]] = scores.get(block.containers[-1], 0) + length
+        if len(block.containers) > 1:
+            scores[block.containers[-2]] = scores.get(block.containers[-2], 0) + length / 2
+
+    if not scores or total == 0:
+        return blocks
+    best = max(scores, key=scores.get)
+    selected = [block for block in blocks if best in block.containers]
+    # Only narrow down when the container really holds most of the content
+    if sum(len(block.text) for block in selected) < total * 0.4:
+        return blocks
+    return selected
+
+
+def _render(block: _Block, markdown: bool) -> str:
+    if not markdown:
+        return block.text
+    if block.kind in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6'):
+        return '#' * int(block.kind[1]) + ' ' + block.text
+    if block.kind == 'li':
+        return '- ' + block.text
+    if block.kind == 'blockquote':
+        return '> ' + block.text
+    return block.text
+
+
+def _collect_with_lxml(html: str) -> _BlockCollector:
+    """Collect blocks from the lxml tree, pruned in C before Python walks it."""
+    root = parse_document(html)
+    collector = _BlockCollector()
+    title = root.find('.//title')
+    if title is not None:
+        collector.title = _clean(title.text_content()) or None
+
+    # The title was read above; with_tail=False keeps the text that follows a removed element
+    lxml_etree.strip_elements(
+        root, lxml_etree.Comment, lxml_etree.ProcessingInstruction, 'title', *SKIPPED_TAGS, with_tail=False,
+    )
+    for element in root.xpath('//*[@role or @id or @class or @aria-hidden]'):
+        if element.getparent() is not None and _BlockCollector._is_boilerplate(element.items()):
+            element.drop_tree()
+
+    if not _BlockCollector._is_boilerplate(root.items()):
+        collector.walk(root)
+    collector.close()
+    return collector
+
+
+def _collect_with_stdlib(html: str) -> _BlockCollector:
+    collector = _BlockCollector()
+    collector.feed(html)
+    collector.close()
+    return collector
+
+
+def _collect(html: str, backend: str) -> _BlockCollector:
+    if backend == 'auto':
+        if not lxml_available():
+            return _collect_with_stdlib(html)
+        try:
+            return _collect_with_lxml(html)
+        except (ValueError, lxml_etree.LxmlError) as e:
+            logger.warning(f"Distilling with lxml failed: {str(e)} - using html.parser")
+            return _collect_with_stdlib(html)
+
+    if backend == 'lxml':
+        if not lxml_available():
+            raise ValueError('lxml backend requested but lxml is not installed')
+        return _collect_with_lxml(html)
+    if backend == 'stdlib':
+        return _collect_with_stdlib(html)
+
+    raise ValueError(f"Unknown distiller backend: {backend}")
+
+
+def distill(html: str, max_tokens: int = 1500, markdown: bool = True, backend: str = 'auto') -> DistilledContent:
+    """
+    Extract the main content of a page as compact text within a token budget.
+
+    Args:
+        html: HTML content
+        max_tokens: Token budget for the returned text
+        markdown: Render headings/lists as markdown (False: plain text blocks)
+        backend: 'auto' (lxml if installed, else stdlib), 'lxml' or 'stdlib'
+
+    Returns:
+        DistilledContent with title, text and whether it was truncated
+
+    Raises:
+        ValueError: If the backend is unknown or unavailable
+    """
+    collector = _collect(html, backend)
+
+    blocks = _select_main_blocks(collector.blocks)
+
+    budget = max_tokens * CHARS_PER_TOKEN
+    lines: list[str] = []
+    used = 0
+    truncated = False
+    previous = None
+    for block in blocks:
+        line = _render(block, markdown)
+        if line == previous:
+            continue
+        previous = line
+        if used + len(line) > budget:
+            remaining = budget - used
+            if remaining > 40:
+                cut = line[:remaining].rsplit(' ', 1)[0]
+                lines.append(cut + ' …')
+            truncated = True
+            break
+        lines.append(line)
+        used += len(line) + 1
+
+    return DistilledContent(
+        title=collector.h1 or collector.title,
+        text='\n'.join(lines),
+        truncated=truncated,
+        source_chars=len(html),
+        blocks=lines,
+    )
@@ -1,13 +1,46 @@
 import asyncio
 import json
+import logging
 import os
-from dataclasses import dataclass
-from typing import Optional
+from contextlib import aclosing
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Optional
 from urllib.parse import urlparse
 
-from duckduckgo_search import DDGS
-
 from models import DiscoveredSource, SourceType
+from services import backend_client
+from services.circuit_breaker import circuit_breakers
+from services.fake_providers import gemini_provider, search_provider, shared_fake_search
+from services.gemini_client import DEFAULT_MODEL_NAME, gemini_models
+from services.gemini_executor import ExecutorSaturated, gemini_executor
+from services.known_urls import KnownUrlSet
+from services.metrics import (
+    DISCOVERY_BATCH_RETRIES,
+    DISCOVERY_BATCH_SIZE,
+    DISCOVERY_KNOWN_SKIPPED,
+    DISCOVERY_LATENCY,
+    DISCOVERY_TIMEOUTS,
+    DISCOVERY_VALIDATION_PROMPTS,
+)
+from services.rate_limiter import RateLimitExceeded, rate_limiters
+from services.search_cache import SearchCache
+from services.url_canonicalizer import canonicalize_url, url_key
+from services.verdict_store import VerdictStore
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_TIMEOUT_SECONDS = 10
+BATCH_VALIDATION_TIMEOUT_SECONDS = 30
+# Bump when build_validation_prompt changes: stored verdicts of older prompts are ignored
+VALIDATION_PROMPT_VERSION = 1
+DEFAULT_SEARCH_CONCURRENCY = 4
+DEFAULT_VALIDATION_CONCURRENCY = 4
+# Batch validation: most candidates per prompt, and their size budget (characters)
+DEFAULT_VALIDATION_BATCH_SIZE = 25
+DEFAULT_VALIDATION_BATCH_CHARS = 12000
+
+# duckduckgo_search.DDGS, imported on the first real search
+DDGS = None
 
 _ALLOWED_DOMAIN_MARKERS = [
     '.gob.',
@@ -27,6 +60,14 @@ class CandidateSource:
     snippet: str
 
 
+class SearchFailed(Exception):
+    """A search was throttled or failed part-way; `results` holds what it found before."""
+
+    def __init__(self, message: str, results: Optional[list[CandidateSource]] = None):
+        super().__init__(message)
+        self.results = results or []
+
+
 def build_queries(scope: str, provincias: list[str]) -> list[str]:
     base = [
         'subvenciones site:gov',
@@ -47,13 +88,7 @@ def build_queries(scope: str, provincias: list[str]) -> list[str]:
 
 
 def normalize_url(raw_url: str) -> Optional[str]:
-    try:
-        parsed = urlparse(raw_url)
-        if not parsed.scheme or not parsed.netloc:
-            return None
-        return f"{parsed.scheme}://{parsed.netloc}{parsed.path or ''}".rstrip('/')
-    except Exception:
-        return None
+    return canonicalize_url(raw_url)
 
 
 def is_official_domain(url: str) -> bool:
@@ -78,15 +113,7 @@ def heuristic_confidence(candidate: CandidateSource, scope: str) -> float:
 
 
 def ensure_gemini_model():
-    api_key = os.getenv('GEMINI_API_KEY')
-    if not api_key:
-        return None
-    try:
-        import google.generativeai as genai
-    except Exception:
-        return None
-    genai.configure(api_key=api_key)
-    return genai.GenerativeModel('gemini-pro')
+    return gemini_models.get()
 
 
 def build_validation_prompt(candidate: CandidateSource, scope: str) -> str:
@@ -108,6 +135,59 @@ def parse_validation_response(text: str) -> Optional[dict]:
         return None
 
 
+def candidate_prompt_chars(candidate: CandidateSource) -> int:
+    """Characters a candidate adds to a batch validation prompt (section header included)."""
+    return len(candidate.title) + len(candidate.url) + len(candidate.snippet) + 50
+
+
+def build_batch_validation_prompt(candidates: list[CandidateSource], scope: str) -> str:
+    sections = '\n\n'.join(
+        f'=== Candidate c{index} ===\n'
+        f'Title: {candidate.title}\n'
+        f'URL: {candidate.url}\n'
+        f'Snippet: {candidate.snippet}'
+        for index, candidate in enumerate(candidates)
+    )
+    return (
+        f'Classify whether each of the following {len(candidates)} URLs is an official grant/subsidy portal. '
+        'Return a JSON array with exactly one object per candidate, with keys: '
+        'id (exactly as given, e.g. "c0"), confidence (0-1), description, organization, region.\n\n'
+        f'Scope: {scope}\n\n'
+        f'{sections}\n\n'
+        'JSON array only.'
+    )
+
+
+def parse_batch_validation_response(text: str) -> dict[str, dict]:
+    """
+    Split a batch validation answer into per-candidate verdicts.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        Verdicts keyed by candidate id (entries without an id are dropped)
+
+    Raises:
+        ValueError: If the response is not a JSON array of objects
+    """
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON from Gemini: {str(e)}")
+
+    if isinstance(parsed, dict) and isinstance(parsed.get('candidates'), list):
+        parsed = parsed['candidates']
+    if not isinstance(parsed, list):
+        raise ValueError(f"Batch validation response is a {type(parsed).__name__}, expected an array")
+
+    verdicts: dict[str, dict] = {}
+    for item in parsed:
+        if isinstance(item, dict) and item.get('id') is not None:
+            verdicts.setdefault(str(item['id']), item)
+    return verdicts
+
+
 def format_source(candidate: CandidateSource, confidence: float, meta: dict) -> DiscoveredSource:
     name = candidate.title.strip()[:200]
     base_url = normalize_url(candidate.url) or candidate.url
@@ -127,65 +207,437 @@ def format_source(candidate: CandidateSource, confidence: float, meta: dict) ->
     )
 
 
-async def validate_candidate(candidate: CandidateSource, scope: str) -> tuple[float, dict]:
+# Gemini verdicts per normalized URL, reused across discovery runs
+verdict_store = VerdictStore.from_env(
+    version=f'{gemini_provider()}/{DEFAULT_MODEL_NAME}/prompt-v{VALIDATION_PROMPT_VERSION}'
+)
+
+
+async def ask_gemini(prompt: str, timeout: float, kind: str = 'single') -> Optional[str]:
+    """
+    Send a validation prompt through the shared breaker, rate limit and executor.
+
+    Returns:
+        The response text, or None if the caller should fall back to
+        heuristics (no model, circuit open, throttled, timed out or failed)
+    """
     model = ensure_gemini_model()
     if not model:
-        return heuristic_confidence(candidate, scope), {}
+        return None
+
+    breaker = circuit_breakers.get('gemini')
+    permit = breaker.allow_request()
+    if permit is None:
+        return None
 
-    prompt = build_validation_prompt(candidate, scope)
     try:
-        response = await asyncio.to_thread(model.generate_content, prompt)
+        await rate_limiters.bucket('gemini', gemini_models.api_key).acquire()
+        DISCOVERY_VALIDATION_PROMPTS.labels(kind).inc()
+        with DISCOVERY_LATENCY.labels('validate').time():
+            response = await gemini_executor.generate(model, prompt, timeout=timeout)
+    except (RateLimitExceeded, ExecutorSaturated):
+        breaker.release(permit)
+        return None
+    except asyncio.TimeoutError:
+        breaker.record_failure(timeout=True, permit=permit)
+        DISCOVERY_TIMEOUTS.labels('validate').inc()
+        return None
     except Exception:
+        breaker.record_failure(permit=permit)
+        return None
+
+    breaker.record_success(permit)
+    return response.text or ''
+
+
+def stored_verdict(candidate: CandidateSource) -> Optional[tuple[float, dict]]:
+    if verdict_store is None:
+        return None
+    return verdict_store.get(normalize_url(candidate.url) or candidate.url)
+
+
+def accept_verdict(candidate: CandidateSource, parsed: dict) -> tuple[float, dict]:
+    """Clamp the confidence of a Gemini verdict and store it."""
+    confidence = max(min(float(parsed.get('confidence', 0.6)), 0.99), 0.1)
+    if verdict_store is not None:
+        verdict_store.set(normalize_url(candidate.url) or candidate.url, confidence, parsed)
+    return confidence, parsed
+
+
+async def validate_candidate(candidate: CandidateSource, scope: str) -> tuple[float, dict]:
+    verdict = stored_verdict(candidate)
+    if verdict is not None:
+        return verdict
+
+    text = await ask_gemini(build_validation_prompt(candidate, scope), VALIDATION_TIMEOUT_SECONDS)
+    if text is None:
         return heuristic_confidence(candidate, scope), {}
 
-    parsed = parse_validation_response(response.text or '')
+    parsed = parse_validation_response(text)
     if not parsed:
         return heuristic_confidence(candidate, scope), {}
 
-    confidence = float(parsed.get('confidence', 0.6))
-    return max(min(confidence, 0.99), 0.1), parsed
+    return accept_verdict(candidate, parsed)
+
+
+async def validate_candidates(candidates: list[CandidateSource], scope: str) -> list[tuple[float, dict]]:
+    """
+    Validate several candidates, classifying those without a stored verdict in one prompt.
+
+    Args:
+        candidates: Candidates to validate
+        scope: Discovery scope
+
+    Returns:
+        (confidence, metadata) per candidate, in order
+    """
+    if len(candidates) == 1:
+        return [await validate_candidate(candidates[0], scope)]
+
+    verdicts: list[Optional[tuple[float, dict]]] = [stored_verdict(candidate) for candidate in candidates]
+    unknown = [index for index, verdict in enumerate(verdicts) if verdict is None]
+    if unknown:
+        classified = await classify_batch([candidates[index] for index in unknown], scope)
+        for index, verdict in zip(unknown, classified):
+            verdicts[index] = verdict
+    return verdicts
+
+
+async def classify_batch(candidates: list[CandidateSource], scope: str) -> list[tuple[float, dict]]:
+    """
+    Classify candidates with one batch prompt, retrying only what failed.
+
+    A malformed answer (or one without a single usable verdict) is split in
+    halves that are classified again; candidates missing from an otherwise
+    usable answer are re-classified on their own batch. Single candidates use
+    the regular one-candidate prompt. Provider failures (circuit open,
+    throttled, timed out) fall back to heuristics for the whole batch, like
+    validate_candidate does for one.
+    """
+    if len(candidates) == 1:
+        return [await validate_candidate(candidates[0], scope)]
+
+    prompt = build_batch_validation_prompt(candidates, scope)
+    text = await ask_gemini(prompt, BATCH_VALIDATION_TIMEOUT_SECONDS, kind='batch')
+    if text is None:
+        return [(heuristic_confidence(candidate, scope), {}) for candidate in candidates]
+    DISCOVERY_BATCH_SIZE.observe(len(candidates))
+
+    try:
+        answers = parse_batch_validation_response(text)
+    except ValueError:
+        answers = {}
+
+    verdicts: list[Optional[tuple[float, dict]]] = []
+    for index, candidate in enumerate(candidates):
+        try:
+            verdicts.append(accept_verdict(candidate, answers[f'c{index}']))
+        except (KeyError, TypeError, ValueError):
+            verdicts.append(None)
+
+    failed = [index for index, verdict in enumerate(verdicts) if verdict is None]
+    if not failed:
+        return verdicts
+
+    DISCOVERY_BATCH_RETRIES.inc(len(failed))
+    if len(failed) == len(candidates):
+        middle = len(candidates) // 2
+        first, second = await asyncio.gather(
+            classify_batch(candidates[:middle], scope),
+            classify_batch(candidates[middle:], scope),
+        )
+        return first + second
+
+    retried = await classify_batch([candidates[index] for index in failed], scope)
+    for index, verdict in zip(failed, retried):
+        verdicts[index] = verdict
+    return verdicts
+
+
+def search_client():
+    """DuckDuckGo client, or the canned-results fake when SEARCH_PROVIDER=fake."""
+    global DDGS
+    if search_provider() == 'fake':
+        return shared_fake_search()
+    if DDGS is None:
+        from duckduckgo_search import DDGS
+    return DDGS()
+
+
+# Results per (query, max_results), shared by every discovery run
+search_cache = SearchCache.from_env()
 
 
 def search_web(query: str, max_results: int) -> list[CandidateSource]:
+    """
+    Run one search (blocking).
+
+    Raises:
+        SearchFailed: If the search client failed, with the results found before
+    """
     results = []
     try:
-        with DDGS() as ddgs:
+        with DISCOVERY_LATENCY.labels('search').time(), search_client() as ddgs:
             for result in ddgs.text(query, max_results=max_results):
                 candidate = build_candidate(result)
                 if candidate:
                     results.append(candidate)
-    except Exception:
-        return results
+    except Exception as e:
+        raise SearchFailed(str(e) or type(e).__name__, results) from e
     return results
 
 
+async def throttled_search(query: str, max_results: int) -> list[CandidateSource]:
+    """
+    Wait for the DuckDuckGo rate limit, then search in a worker thread.
+
+    Raises:
+        SearchFailed: If the search was throttled or failed
+    """
+    # The rate limit wait is awaited on the loop: it must not hold a worker thread
+    try:
+        await rate_limiters.bucket('ddgs').acquire()
+    except RateLimitExceeded as e:
+        raise SearchFailed(str(e)) from e
+    # search_web blocks on the DDGS client: keep it off the loop
+    return await asyncio.to_thread(search_web, query, max_results)
+
+
+async def search_live(query: str, max_results: int) -> list[CandidateSource]:
+    """
+    Search (rate limited, in a worker thread) and store complete results in the search cache.
+
+    A throttled or failed search returns what it found but is not cached.
+    """
+    try:
+        candidates = await throttled_search(query, max_results)
+    except SearchFailed as e:
+        logger.warning(f"✗ Search for '{query}' incomplete ({str(e)}) - {len(e.results)} results, not cached")
+        return e.results
+    if search_cache is not None:
+        search_cache.set(query, max_results, [asdict(candidate) for candidate in candidates])
+    return candidates
+
+
+def cached_search(query: str, max_results: int) -> Optional[list[CandidateSource]]:
+    """
+    Serve a query from the search cache.
+
+    A stale entry is returned as well, and a background refresh is started;
+    a refresh that fails leaves the stale entry in place.
+
+    Returns:
+        The cached candidates, or None on miss (or with the cache disabled)
+    """
+    if search_cache is None:
+        return None
+    results, stale = search_cache.get(query, max_results)
+    if results is None:
+        return None
+    if stale:
+        async def refresh() -> list[dict]:
+            return [asdict(candidate) for candidate in await throttled_search(query, max_results)]
+
+        search_cache.revalidate(query, max_results, refresh)
+    return [CandidateSource(**result) for result in results]
+
+
+async def search_concurrently(
+    queries: list[str],
+    max_results: int,
+    concurrency: int,
+    refresh: bool = False,
+) -> AsyncIterator[tuple[int, list[CandidateSource]]]:
+    """
+    Run searches off the event loop, at most `concurrency` at a time.
+
+    Queries found in the search cache are answered from it without taking a
+    slot, unless `refresh` forces a live search (whose results replace the
+    cached ones).
+
+    Results are yielded as the searches finish, as (query index, candidates),
+    so one slow query does not hold back the others; callers sort by the
+    query index for a deterministic order. Closing the generator cancels the
+    searches that have not started; a search already running in its thread
+    finishes in the background and its results are dropped.
+    """
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(query: str) -> list[CandidateSource]:
+        if not refresh:
+            cached = cached_search(query, max_results)
+            if cached is not None:
+                return cached
+        async with slots:
+            return await search_live(query, max_results)
+
+    tasks = [asyncio.create_task(run(query)) for query in queries]
+    indexes = {task: index for index, task in enumerate(tasks)}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=indexes.get):
+                yield indexes[task], task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Collect the cancelled searches so none is left pending (or with an unretrieved error)
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# URLs of the sources the backend already has, shared by every discovery run
+known_urls = KnownUrlSet.from_env()
+
+
+async def seed_known_urls() -> int:
+    """
+    Add the backend's sources to known_urls (GET /sources).
+
+    Returns:
+        Number of URLs that were not known yet
+    """
+    if known_urls is None:
+        return 0
+    urls = await backend_client.backend.fetch_source_urls()
+    if urls is None:
+        logger.warning("✗ Could not load known sources from the backend - known-URL filter not seeded")
+        return 0
+
+    added = known_urls.update(urls)
+    known_urls.seeded += len(urls)
+    known_urls.save()
+    logger.info(f"✓ Seeded known-URL filter with {len(urls)} backend sources ({added} new)")
+    return added
+
+
+def remember_sources(sources: list[DiscoveredSource]) -> None:
+    """Mark sources saved to the backend as known."""
+    if known_urls is None or not sources:
+        return
+    if known_urls.update(source.baseUrl for source in sources):
+        known_urls.save()
+
+
 async def discover_sources(
     scope: str,
     provincias: list[str],
     max_results: int,
     validate_with_ia: bool,
     skip_domain_filter: bool,
+    refresh_searches: bool = False,
+    include_known: bool = False,
 ) -> list[DiscoveredSource]:
+    """
+    Find candidate grant portals and validate them, as a pipeline.
+
+    Stages, connected by a bounded queue:
+
+    1. Searches run concurrently and are released as they finish
+       (search_concurrently); cached queries are not searched again unless
+       refresh_searches is set
+    2. One task canonicalizes, de-duplicates (url_key: scheme and www.
+       variants are one URL) and filters the candidates, drops the ones the
+       backend already has (known_urls, unless include_known is set) and
+       keys the rest by (query index, position). Every admitted candidate
+       becomes exactly one source, so it stops after max_results admissions;
+       that also cancels the searches still outstanding.
+    3. DISCOVERY_VALIDATION_CONCURRENCY workers validate candidates (Gemini
+       or heuristic) concurrently. With IA validation each worker takes the
+       candidates already waiting, up to DISCOVERY_VALIDATION_BATCH_SIZE of
+       them and DISCOVERY_VALIDATION_BATCH_CHARS of prompt, and classifies
+       them in one Gemini call (validate_candidates)
+
+    Sources are returned in query order, then result order, whichever search
+    or validation finishes first. Which candidates make the max_results cut
+    depends on the order in which searches finish.
+    """
     queries = build_queries(scope, provincias)
-    discovered: list[DiscoveredSource] = []
-    seen = set()
-
-    for query in queries:
-        for candidate in search_web(query, max_results=max_results):
-            base_url = normalize_url(candidate.url)
-            if not base_url or base_url in seen:
-                continue
-            if not skip_domain_filter and not is_official_domain(base_url):
-                continue
-
-            seen.add(base_url)
+    search_concurrency = int(os.getenv('DISCOVERY_SEARCH_CONCURRENCY', str(DEFAULT_SEARCH_CONCURRENCY)))
+    workers = max(1, int(os.getenv('DISCOVERY_VALIDATION_CONCURRENCY', str(DEFAULT_VALIDATION_CONCURRENCY))))
+    batch_size = 1
+    if validate_with_ia:
+        batch_size = max(1, int(os.getenv('DISCOVERY_VALIDATION_BATCH_SIZE', str(DEFAULT_VALIDATION_BATCH_SIZE))))
+    batch_chars = int(os.getenv('DISCOVERY_VALIDATION_BATCH_CHARS', str(DEFAULT_VALIDATION_BATCH_CHARS)))
+    # Keeps the filter stage just ahead of the validators (about two batches per worker)
+    admitted: asyncio.Queue = asyncio.Queue(maxsize=workers * max(2, 2 * batch_size))
+    sources: dict[tuple[int, int], DiscoveredSource] = {}
+
+    async def admit_candidates() -> None:
+        seen = set()
+        count = 0
+        searches = search_concurrently(queries, max_results, search_concurrency, refresh_searches)
+        async with aclosing(searches):
+            async for query_index, candidates in searches:
+                for position, candidate in enumerate(candidates):
+                    base_url = normalize_url(candidate.url)
+                    if not base_url:
+                        continue
+                    key = url_key(base_url)
+                    if key in seen:
+                        continue
+                    if not skip_domain_filter and not is_official_domain(base_url):
+                        continue
+
+                    seen.add(key)
+                    if known_urls is not None and not include_known and base_url in known_urls:
+                        known_urls.skipped += 1
+                        DISCOVERY_KNOWN_SKIPPED.inc()
+                        continue
+
+                    await admitted.put(((query_index, position), candidate))
+                    count += 1
+                    if count >= max_results:
+                        # Leaving the block cancels the searches still outstanding
+                        return
+
+    async def filter_stage() -> None:
+        await admit_candidates()
+        for _ in range(workers):
+            await admitted.put(None)
+
+    async def validation_stage() -> None:
+        carried = None
+        finished = False
+        while not finished:
+            item = carried or await admitted.get()
+            carried = None
+            if item is None:
+                return
+
+            # Batch the candidates already waiting; the prompt size bounds the batch
+            batch = [item]
+            chars = candidate_prompt_chars(item[1])
+            while len(batch) < batch_size:
+                try:
+                    item = admitted.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if item is None:
+                    finished = True
+                    break
+                chars += candidate_prompt_chars(item[1])
+                if chars > batch_chars:
+                    carried = item
+                    break
+                batch.append(item)
+
+            candidates = [candidate for _, candidate in batch]
             if validate_with_ia:
-                confidence, meta = await validate_candidate(candidate, scope)
+                verdicts = await validate_candidates(candidates, scope)
             else:
-                confidence, meta = heuristic_confidence(candidate, scope), {}
+                verdicts = [(heuristic_confidence(candidate, scope), {}) for candidate in candidates]
+            for (key, candidate), (confidence, meta) in zip(batch, verdicts):
+                sources[key] = format_source(candidate, confidence, meta)
 
-            discovered.append(format_source(candidate, confidence, meta))
-            if len(discovered) >= max_results:
-                return discovered
-
-    return discovered
+    tasks = [asyncio.create_task(filter_stage())]
+    tasks.extend(asyncio.create_task(validation_stage()) for _ in range(workers))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        # Only does something if a stage failed
+        for task in tasks:
+            task.cancel()
+
+    # Reorder buffer: query and result order, not completion order
+    return [sources[key] for key in sorted(sources)]
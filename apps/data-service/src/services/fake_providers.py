@@ -0,0 +1,306 @@
+"""
+Local stand-ins for Gemini and DuckDuckGo (load and soak testing)
+
+Load tests against the real providers burn Gemini quota and get throttled by
+DuckDuckGo. With GEMINI_PROVIDER=fake and/or SEARCH_PROVIDER=fake the service
+talks to these in-process fakes instead; everything around them (rate
+limiters, executor, circuit breaker, fallbacks, caches) runs unchanged.
+
+FakeGeminiModel answers extraction, packed-extraction, validation and batch
+validation prompts with plausible JSON after a simulated latency, and injects failures:
+
+- FAKE_GEMINI_LATENCY_MS: Median latency (default: 800)
+- FAKE_GEMINI_LATENCY_SIGMA: Log-normal spread; 0 = fixed latency (default: 0.5)
+- FAKE_GEMINI_ERROR_RATE: Fraction of calls raising a provider error
+- FAKE_GEMINI_MALFORMED_RATE: Fraction of answers that are not valid JSON
+- FAKE_GEMINI_TIMEOUT_RATE: Fraction of calls that hang for
+  FAKE_GEMINI_TIMEOUT_SECONDS (default: 60), past the service timeouts
+- FAKE_GEMINI_SEED: Random seed for reproducible runs
+
+FakeSearch replaces DDGS and serves canned results:
+
+- FAKE_SEARCH_RESULTS_PATH: JSON file with a list of result dicts (served for
+  every query) or an object mapping queries to lists; without it, results
+  are generated deterministically per query
+- FAKE_SEARCH_LATENCY_MS: Latency per search (default: 300)
+
+Remember to lift the client-side rate limits for load tests
+(RATE_LIMIT_GEMINI_PER_SECOND=0, RATE_LIMIT_DDGS_PER_SECOND=0).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ('google', 'fake')
+SEARCH_PROVIDERS = ('ddgs', 'fake')
+
+_PAGE_TITLE = re.compile(r'Page title: (.*)')
+_DOCUMENT = re.compile(r'=== Document (\S+) ===\nPage title: (.*)')
+_AMOUNT = re.compile(r'(\d{1,3}(?:[.,]\d{3})+)')
+_VALIDATION_TITLE = re.compile(r'^Title: (.*)$', re.MULTILINE)
+_VALIDATION_URL = re.compile(r'^URL: (.*)$', re.MULTILINE)
+_CANDIDATE = re.compile(r'=== Candidate (\S+) ===\nTitle: (.*)\nURL: (.*)')
+
+
+class FakeProviderError(Exception):
+    """Injected provider failure (stands in for a 5xx/quota error)."""
+
+    pass
+
+
+def gemini_provider() -> str:
+    """Configured Gemini provider: 'google' (default) or 'fake' (GEMINI_PROVIDER)."""
+    provider = os.getenv('GEMINI_PROVIDER', 'google').lower()
+    if provider not in PROVIDERS:
+        logger.warning(f"Unknown GEMINI_PROVIDER '{provider}' - using 'google'")
+        return 'google'
+    return provider
+
+
+def search_provider() -> str:
+    """Configured search provider: 'ddgs' (default) or 'fake' (SEARCH_PROVIDER)."""
+    provider = os.getenv('SEARCH_PROVIDER', 'ddgs').lower()
+    if provider not in SEARCH_PROVIDERS:
+        logger.warning(f"Unknown SEARCH_PROVIDER '{provider}' - using 'ddgs'")
+        return 'ddgs'
+    return provider
+
+
+@dataclass
+class FakeGeminiConfig:
+    """Latency and failure injection settings of the fake model."""
+
+    latency_ms: float = 800.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 60.0
+    seed: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> 'FakeGeminiConfig':
+        seed = os.getenv('FAKE_GEMINI_SEED')
+        return cls(
+            latency_ms=float(os.getenv('FAKE_GEMINI_LATENCY_MS', str(cls.latency_ms))),
+            latency_sigma=float(os.getenv('FAKE_GEMINI_LATENCY_SIGMA', str(cls.latency_sigma))),
+            error_rate=float(os.getenv('FAKE_GEMINI_ERROR_RATE', '0')),
+            malformed_rate=float(os.getenv('FAKE_GEMINI_MALFORMED_RATE', '0')),
+            timeout_rate=float(os.getenv('FAKE_GEMINI_TIMEOUT_RATE', '0')),
+            timeout_seconds=float(os.getenv('FAKE_GEMINI_TIMEOUT_SECONDS', str(cls.timeout_seconds))),
+            seed=int(seed) if seed else None,
+        )
+
+
+class FakeResponse:
+    """Mimics the .text attribute of a Gemini response."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGeminiModel:
+    """Drop-in for GenerativeModel: generate_content and generate_content_async."""
+
+    def __init__(self, config: Optional[FakeGeminiConfig] = None):
+        self.config = config or FakeGeminiConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.malformed = 0
+        self.timeouts = 0
+
+    @classmethod
+    def from_env(cls) -> 'FakeGeminiModel':
+        return cls(FakeGeminiConfig.from_env())
+
+    def _plan(self) -> tuple[str, float]:
+        """Pick the outcome ('ok', 'error', 'malformed', 'timeout') and latency of one call."""
+        config = self.config
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            latency = config.latency_ms / 1000
+            if config.latency_sigma > 0:
+                latency *= self._random.lognormvariate(0, config.latency_sigma)
+
+            if roll < config.timeout_rate:
+                self.timeouts += 1
+                return 'timeout', config.timeout_seconds
+            roll -= config.timeout_rate
+            if roll < config.error_rate:
+                self.errors += 1
+                return 'error', latency
+            roll -= config.error_rate
+            if roll < config.malformed_rate:
+                self.malformed += 1
+                return 'malformed', latency
+            return 'ok', latency
+
+    def _answer(self, outcome: str, prompt: str) -> FakeResponse:
+        if outcome == 'error':
+            raise FakeProviderError("503 The model is overloaded. Please try again later.")
+        text = answer_prompt(prompt)
+        if outcome == 'malformed':
+            # Cut mid-object, like a truncated or chatty answer
+            text = f"Sure! Here is the JSON:\n```json\n{text[: max(1, len(text) // 2)]}"
+        return FakeResponse(text)
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        outcome, latency = self._plan()
+        time.sleep(latency)
+        return self._answer(outcome, prompt)
+
+    async def generate_content_async(self, prompt: str) -> FakeResponse:
+        outcome, latency = self._plan()
+        await asyncio.sleep(latency)
+        return self._answer(outcome, prompt)
+
+    def stats(self) -> dict[str, Any]:
+        """Return injected-outcome counters."""
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'malformed': self.malformed,
+            'timeouts': self.timeouts,
+        }
+
+
+def _grant_answer(title: str, content: str) -> dict[str, Any]:
+    amount = _AMOUNT.search(content)
+    return {
+        'title': title if title and title != 'unknown' else 'Convocatoria de ayudas',
+        'description': ' '.join(content.split())[:300] or 'Ayudas y subvenciones públicas.',
+        'amount': int(re.sub(r'[.,]', '', amount.group(1))) if amount else None,
+        'deadline': '2026-12-31',
+    }
+
+
+def _validation_answer(title: Optional[str], url: Optional[str]) -> dict[str, Any]:
+    official = bool(url and re.search(r'\.(gob|gov|europa)\.', url))
+    return {
+        'confidence': 0.85 if official else 0.35,
+        'description': f"Portal de ayudas: {title or 'desconocido'}",
+        'organization': 'Administración pública' if official else 'Desconocida',
+        'region': 'España',
+    }
+
+
+def answer_prompt(prompt: str) -> str:
+    """Build the JSON answer the real model would give to one of the service's prompts."""
+    candidates = _CANDIDATE.findall(prompt)
+    if candidates:
+        return json.dumps([
+            {'id': candidate_id, **_validation_answer(title, url)} for candidate_id, title, url in candidates
+        ], ensure_ascii=False)
+
+    if 'Classify if this URL' in prompt:
+        title = _VALIDATION_TITLE.search(prompt)
+        url = _VALIDATION_URL.search(prompt)
+        return json.dumps(
+            _validation_answer(title.group(1) if title else None, url.group(1) if url else None),
+            ensure_ascii=False,
+        )
+
+    documents = _DOCUMENT.findall(prompt)
+    if documents:
+        sections = re.split(r'=== Document \S+ ===', prompt)[1:]
+        return json.dumps([
+            {'id': doc_id, **_grant_answer(title, section)}
+            for (doc_id, title), section in zip(documents, sections)
+        ], ensure_ascii=False)
+
+    title = _PAGE_TITLE.search(prompt)
+    content = prompt.split('Content:', 1)[-1] if 'Content:' in prompt else prompt.split('HTML:', 1)[-1]
+    return json.dumps(_grant_answer(title.group(1).strip() if title else '', content), ensure_ascii=False)
+
+
+_shared_model: Optional[FakeGeminiModel] = None
+
+
+def shared_fake_model() -> FakeGeminiModel:
+    """Process-wide fake model (extraction and discovery share its counters and seed)."""
+    global _shared_model
+    if _shared_model is None:
+        _shared_model = FakeGeminiModel.from_env()
+        logger.info("Using fake Gemini provider (GEMINI_PROVIDER=fake)")
+    return _shared_model
+
+
+class FakeSearch:
+    """Drop-in for DDGS: context manager with text(query, max_results)."""
+
+    def __init__(self, results: Optional[Any] = None, latency_ms: Optional[float] = None):
+        """
+        Args:
+            results: List of result dicts for every query, or {query: [results]}
+                (default: loaded from FAKE_SEARCH_RESULTS_PATH, else generated)
+            latency_ms: Simulated latency per search (default: FAKE_SEARCH_LATENCY_MS)
+        """
+        if results is None:
+            path = os.getenv('FAKE_SEARCH_RESULTS_PATH')
+            if path:
+                with open(path, encoding='utf-8') as handle:
+                    results = json.load(handle)
+        self.results = results
+        self.latency_ms = (
+            latency_ms if latency_ms is not None else float(os.getenv('FAKE_SEARCH_LATENCY_MS', '300'))
+        )
+
+    def __enter__(self) -> 'FakeSearch':
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def text(self, query: str, max_results: int = 10) -> Iterator[dict[str, str]]:
+        time.sleep(self.latency_ms / 1000)
+        if isinstance(self.results, dict):
+            results = self.results.get(query, [])
+        elif self.results is not None:
+            results = self.results
+        else:
+            results = generated_results(query, max_results)
+        yield from results[:max_results]
+
+
+_shared_search: Optional[FakeSearch] = None
+
+
+def shared_fake_search() -> FakeSearch:
+    """Process-wide fake search backend (canned results are loaded once)."""
+    global _shared_search
+    if _shared_search is None:
+        _shared_search = FakeSearch()
+        logger.info("Using fake search provider (SEARCH_PROVIDER=fake)")
+    return _shared_search
+
+
+def generated_results(query: str, count: int) -> list[dict[str, str]]:
+    """Deterministic DuckDuckGo-style results for a query (official and other domains)."""
+    rng = random.Random(query)
+    topic = query.split(' site:')[0]
+    results = []
+    for index in range(count):
+        if rng.random() < 0.7:
+            region = rng.choice(('madrid', 'galicia', 'aragon', 'murcia'))
+            domain = f"{rng.choice(('sede', 'www', 'transparencia'))}.{region}.gob.es"
+        else:
+            domain = f'www.ayudas-{rng.randint(1, 50)}.com'
+        results.append({
+            'title': f"{topic.capitalize()} - convocatoria {index + 1}",
+            'href': f"https://{domain}/ayudas/{rng.randint(1, 500)}?utm_source=ddg",
+            'body': f"Información sobre {topic}: requisitos, plazos y cuantías de las ayudas.",
+        })
+    return results
@@ -0,0 +1,116 @@
+"""
+Process-wide, lazily initialized Gemini models
+
+Importing google.generativeai takes about a second (protobuf and gRPC
+stacks). It used to happen when services.ia_service was imported, and
+discovery re-ran genai.configure and built a new GenerativeModel for every
+candidate it validated.
+
+GeminiModelRegistry owns the client instead:
+
+- google.generativeai is imported and configured once, on first use
+- One model per model name, shared by extraction and discovery
+- Importing the service (tests, tooling) never touches the SDK; the FastAPI
+  lifespan warms the registry in a worker thread before traffic arrives
+- With GEMINI_PROVIDER=fake the fake model is returned instead
+
+Usage:
+    model = gemini_models.get()   # None when Gemini is not configured
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+from services.fake_providers import gemini_provider, shared_fake_model
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = 'gemini-pro'
+
+# Cached "cannot build this model" marker (missing key or SDK)
+_UNAVAILABLE = object()
+
+
+class GeminiModelRegistry:
+    """Lazily built Gemini models, shared by every caller in the process."""
+
+    def __init__(self):
+        self._models: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._configured = False
+        self.init_seconds: Optional[float] = None
+
+    @property
+    def api_key(self) -> Optional[str]:
+        """Key the models use (also names the shared rate limit bucket)."""
+        key = os.getenv('GEMINI_API_KEY')
+        if gemini_provider() == 'fake':
+            return key or 'fake'
+        return key
+
+    def get(self, name: str = DEFAULT_MODEL_NAME) -> Optional[Any]:
+        """
+        Return the shared model, building it on first use.
+
+        Args:
+            name: Gemini model name
+
+        Returns:
+            The model, or None if Gemini is not configured (no API key, SDK
+            missing or failing to initialize)
+        """
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._models[name] = self._build(name)
+        return None if model is _UNAVAILABLE else model
+
+    def _build(self, name: str) -> Any:
+        if gemini_provider() == 'fake':
+            return shared_fake_model()
+
+        api_key = os.getenv('GEMINI_API_KEY')
+        if not api_key:
+            logger.warning("GEMINI_API_KEY not set - will use fallback heuristic extraction only")
+            return _UNAVAILABLE
+
+        started_at = time.perf_counter()
+        try:
+            import google.generativeai as genai
+
+            if not self._configured:
+                genai.configure(api_key=api_key)
+                self._configured = True
+            model = genai.GenerativeModel(name)
+        except ImportError:
+            logger.warning("google-generativeai not installed - will use fallback heuristic extraction only")
+            return _UNAVAILABLE
+        except Exception as e:
+            logger.warning(f"Failed to initialize Gemini: {str(e)} - will use fallback heuristic extraction only")
+            return _UNAVAILABLE
+
+        self.init_seconds = time.perf_counter() - started_at
+        logger.info(f"Gemini AI model {name} initialized in {self.init_seconds:.2f}s")
+        return model
+
+    async def warm_up(self, name: str = DEFAULT_MODEL_NAME) -> Optional[Any]:
+        """Build the model in a worker thread (the SDK import blocks)."""
+        return await asyncio.to_thread(self.get, name)
+
+    def stats(self) -> dict[str, Any]:
+        """Return initialization state."""
+        return {
+            'provider': gemini_provider(),
+            'models': sorted(name for name, model in self._models.items() if model is not _UNAVAILABLE),
+            'init_seconds': round(self.init_seconds, 3) if self.init_seconds is not None else None,
+        }
+
+
+# Singleton registry
+gemini_models = GeminiModelRegistry()
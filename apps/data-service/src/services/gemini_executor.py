@@ -0,0 +1,266 @@
+"""
+Dedicated, bounded executor for Gemini model calls
+
+generate_content is a blocking call. Running it through asyncio.to_thread puts
+it on the default executor, and asyncio.wait_for cannot stop the thread when
+the call times out: after a burst of timeouts the default pool fills with
+abandoned calls and unrelated to_thread work queues behind them.
+
+GeminiExecutor keeps model calls apart:
+
+- Blocking calls run in their own thread pool (GEMINI_EXECUTOR_MAX_WORKERS)
+- When the model offers generate_content_async (and GEMINI_NATIVE_ASYNC is on),
+  the native coroutine is used instead; timeouts then really cancel the call
+- At most max_workers + max_queue calls are admitted (abandoned calls still
+  hold their thread and count); beyond that ExecutorSaturated is raised so
+  callers use their fallback instead of waiting
+- Running, queued and abandoned calls are counted for the stats endpoint
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(Exception):
+    """Raised when the executor has no capacity left for another call."""
+
+    pass
+
+
+class _Call:
+    """Lifecycle of one submitted call (guarded by the executor lock)."""
+
+    __slots__ = ('state', 'abandoned')
+
+    def __init__(self):
+        self.state = 'queued'
+        self.abandoned = False
+
+
+class GeminiExecutor:
+    """Bounded executor for blocking (or native async) Gemini calls."""
+
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_MAX_QUEUE = 16
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        native_async: bool = True,
+    ):
+        """
+        Initialize the executor (threads are created on first use).
+
+        Args:
+            max_workers: Threads (or concurrent native calls) for model calls
+            max_queue: Calls allowed to wait for a worker before rejecting
+            native_async: Use generate_content_async when the model provides it
+        """
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.native_async = native_async
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # asyncio.Semaphore binds to one event loop: one per loop (tests and
+        # benchmarks run several loops against this module singleton)
+        self._native_slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+        self.running = 0
+        self.queued = 0
+        self.abandoned = 0
+        self.peak_queue_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.abandoned_total = 0
+
+    @classmethod
+    def from_env(cls) -> 'GeminiExecutor':
+        """Build an executor from GEMINI_EXECUTOR_* and GEMINI_NATIVE_ASYNC settings."""
+        return cls(
+            max_workers=int(os.getenv('GEMINI_EXECUTOR_MAX_WORKERS', str(cls.DEFAULT_MAX_WORKERS))),
+            max_queue=int(os.getenv('GEMINI_EXECUTOR_MAX_QUEUE', str(cls.DEFAULT_MAX_QUEUE))),
+            native_async=os.getenv('GEMINI_NATIVE_ASYNC', 'true').lower() not in ('0', 'false', 'no'),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def generate(self, model: Any, prompt: str, timeout: float) -> Any:
+        """
+        Run model.generate_content(prompt) with a timeout.
+
+        Args:
+            model: Gemini GenerativeModel (or any object with generate_content)
+            prompt: Prompt text
+            timeout: Seconds to wait for the answer
+
+        Returns:
+            The model response
+
+        Raises:
+            ExecutorSaturated: If running + queued calls already fill the executor
+            asyncio.TimeoutError: If the call exceeds the timeout
+        """
+        native = getattr(model, 'generate_content_async', None) if self.native_async else None
+        if native is not None:
+            return await self._run_native(native, prompt, timeout)
+        return await self.run(model.generate_content, prompt, timeout=timeout)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: float) -> Any:
+        """
+        Run a blocking callable in the dedicated pool with a timeout.
+
+        On timeout the call is dequeued if it has not started; a call that is
+        already running keeps its thread until it returns and is counted as
+        abandoned meanwhile.
+
+        Raises:
+            ExecutorSaturated: If running + queued calls already fill the executor
+            asyncio.TimeoutError: If the call exceeds the timeout
+        """
+        call = self._admit()
+        try:
+            future = self._ensure_pool().submit(self._invoke, call, fn, args)
+        except Exception:
+            with self._lock:
+                self.queued -= 1
+            raise
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            self._abandon(call, future)
+            raise
+        except asyncio.CancelledError:
+            self._abandon(call, future)
+            raise
+
+    def _admit(self) -> _Call:
+        with self._lock:
+            if self.running + self.queued >= self.capacity:
+                self.rejected += 1
+                raise ExecutorSaturated(
+                    f"Gemini executor saturated ({self.running} running, {self.queued} queued, "
+                    f"{self.abandoned} abandoned)"
+                )
+            self.queued += 1
+            # Queued calls are waiting for a worker thread (or a native call slot)
+            self.peak_queue_depth = max(self.peak_queue_depth, self.queued)
+            return _Call()
+
+    def _invoke(self, call: _Call, fn: Callable[..., Any], args: tuple) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            call.state = 'running'
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                call.state = 'done'
+                if call.abandoned:
+                    self.abandoned -= 1
+                    logger.info("Abandoned Gemini call finished - worker thread released")
+
+    def _abandon(self, call: _Call, future: Future) -> None:
+        future.cancel()
+        with self._lock:
+            if future.cancelled():
+                if call.state == 'queued':
+                    # Never started: it leaves the queue without occupying a thread
+                    call.state = 'cancelled'
+                    self.queued -= 1
+            elif call.state != 'done' and not call.abandoned:
+                call.abandoned = True
+                self.abandoned += 1
+                self.abandoned_total += 1
+
+    async def _run_native(self, native: Callable[..., Any], prompt: str, timeout: float) -> Any:
+        self._admit()
+        slots = self._native_slots_for(asyncio.get_running_loop())
+
+        started = False
+        try:
+            async with asyncio.timeout(timeout):
+                async with slots:
+                    with self._lock:
+                        self.queued -= 1
+                        self.running += 1
+                    started = True
+                    return await native(prompt)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise
+        finally:
+            with self._lock:
+                if started:
+                    self.running -= 1
+                    self.completed += 1
+                else:
+                    self.queued -= 1
+
+    def _native_slots_for(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        with self._lock:
+            slots = self._native_slots.get(loop)
+            if slots is None:
+                slots = self._native_slots[loop] = asyncio.Semaphore(self.max_workers)
+            return slots
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix='gemini',
+                    )
+        return self._pool
+
+    def shutdown(self) -> None:
+        """Stop the thread pool without waiting for abandoned calls."""
+        if self._pool is None:
+            return
+        logger.info("Shutting down Gemini executor")
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return saturation counters."""
+        with self._lock:
+            in_flight = self.running + self.queued
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'native_async': self.native_async,
+                'running': self.running,
+                'queue_depth': self.queued,
+                'peak_queue_depth': self.peak_queue_depth,
+                'abandoned': self.abandoned,
+                'abandoned_total': self.abandoned_total,
+                'saturation': round(in_flight / self.capacity, 4),
+                'completed': self.completed,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+            }
+
+
+# Shared by extraction and discovery validation
+gemini_executor = GeminiExecutor.from_env()
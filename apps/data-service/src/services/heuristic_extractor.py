@@ -0,0 +1,119 @@
+"""
+Heuristic grant extraction (single-pass scan + Regex)
+
+Module-level functions with no service state, so they can run inline, in a
+thread or inside a worker process of the heuristic process pool.
+"""
+
+import logging
+import re
+from typing import Optional
+
+from models import GrantData, ExtractionMethod
+from services.html_scanner import PageScan, scan_html
+from services.profiling import span
+
+logger = logging.getLogger(__name__)
+
+# Pattern: €50,000 or €50000 or 50,000 EUR or 50000 EUR
+# More specific patterns that require either currency symbol or EUR keyword
+AMOUNT_PATTERNS = [
+    re.compile(r'[€$]\s*(\d{1,3}(?:[,\.]\d{3})+)', re.IGNORECASE),  # €50,000 or $50,000
+    re.compile(r'(\d{1,3}(?:[,\.]\d{3})+)\s*EUR', re.IGNORECASE),    # 50,000 EUR
+    re.compile(r'amount[:\s]+[€$]?\s*(\d+(?:[,\.]\d{3})+)', re.IGNORECASE),  # amount: 50,000
+]
+
+# ISO 8601 date pattern
+DEADLINE_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})')
+
+
+def scan_page(html: str, parser: str = 'auto') -> PageScan:
+    """
+    Scan HTML with the given parser backend.
+
+    Falls back to the BeautifulSoup traversal if the fast backend fails
+    (e.g. lxml rejecting a document).
+    """
+    if parser != 'bs4':
+        try:
+            return scan_html(html, backend=parser)
+        except Exception as e:
+            logger.warning(f"HTML scan with '{parser}' backend failed: {str(e)} - using BeautifulSoup")
+    return scan_html(html, backend='bs4')
+
+
+def find_amount(text: str) -> Optional[int]:
+    """Return the first EUR/€ amount found in the text, or None."""
+    for pattern in AMOUNT_PATTERNS:
+        amount_match = pattern.search(text)
+        if amount_match:
+            try:
+                amount_str = amount_match.group(1).replace(',', '').replace('.', '')
+                return int(amount_str)
+            except (ValueError, IndexError):
+                continue
+    return None
+
+
+def find_deadline(text: str) -> Optional[str]:
+    """Return the first ISO 8601 date found in the text, or None."""
+    date_match = DEADLINE_PATTERN.search(text)
+    return date_match.group(1) if date_match else None
+
+
+def heuristic_extract(
+    html: str,
+    url: str,
+    source: str,
+    parser: str = 'auto',
+) -> Optional[GrantData]:
+    """
+    Extract grant data using heuristic rules (single-pass scan + Regex).
+
+    Args:
+        html: HTML content
+        url: Source URL
+        source: Source name
+        parser: HTML scanner backend ('auto', 'lxml', 'stdlib' or 'bs4')
+
+    Returns:
+        GrantData if extraction successful, None otherwise
+    """
+    try:
+        with span('heuristic_extract'):
+            return _extract(html, url, source, parser)
+    except Exception as e:
+        logger.error(f"Heuristic extraction failed: {str(e)}")
+        return None
+
+
+def _extract(html: str, url: str, source: str, parser: str) -> Optional[GrantData]:
+    with span('soup'):
+        scan = scan_page(html, parser)
+
+    # Extract title: h1, h2, title tag (in that priority)
+    title = scan.title
+    if not title:
+        title = 'Grant from ' + source
+
+    # Extract description: First long paragraph or text content
+    description = scan.paragraph or scan.text_head
+
+    with span('amount_regex'):
+        amount = find_amount(scan.text)
+    deadline = find_deadline(scan.text)
+
+    # Validate minimum requirements
+    if len(title) < 5 or len(description) < 10:
+        logger.warning(f"Heuristic extraction did not meet minimum requirements from {source}")
+        return None
+
+    return GrantData(
+        title=title,
+        description=description,
+        amount=amount,
+        deadline=deadline,
+        url=url,
+        source=source,
+        extraction_method=ExtractionMethod.HEURISTIC,
+    )
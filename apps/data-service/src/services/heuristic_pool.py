@@ -0,0 +1,203 @@
+"""
+Execution modes for CPU-bound heuristic extraction
+
+Heuristic extraction is pure CPU work. Running it directly inside an async
+handler blocks the event loop, stalling every other request on the worker
+(including /health). HeuristicRunner moves it off the loop:
+
+- inline: run in the event loop thread (legacy behavior)
+- thread: run in the default thread executor (frees the loop, shares the GIL)
+- process: run in a warm process pool (uses all cores)
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Optional
+
+from models import GrantData
+from services.heuristic_extractor import heuristic_extract
+from services.html_scanner import scan_html
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_MODES = ('inline', 'thread', 'process')
+
+_WARM_UP_HTML = '<html><h1>Warm-up grant</h1><p>' + 'x' * 60 + ' 1.000 EUR 2026-01-01</p></html>'
+
+
+def _warm_worker(parser: str) -> None:
+    """Process initializer: import heavy modules and prime the parser."""
+    scan_html(_WARM_UP_HTML, backend=parser)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class HeuristicRunner:
+    """Runs heuristic extraction inline, in a thread, or in a process pool."""
+
+    DEFAULT_MAX_TASK_CHARS = 1_000_000
+
+    def __init__(
+        self,
+        mode: str = 'inline',
+        pool_size: Optional[int] = None,
+        max_task_chars: int = DEFAULT_MAX_TASK_CHARS,
+        parser: str = 'auto',
+        start_method: str = 'spawn',
+    ):
+        """
+        Initialize the runner.
+
+        Args:
+            mode: 'inline', 'thread' or 'process'
+            pool_size: Worker processes in process mode (default: CPU count)
+            max_task_chars: Largest HTML document accepted per task
+            parser: HTML scanner backend passed to heuristic_extract
+            start_method: multiprocessing start method for pool workers
+        """
+        if mode not in EXECUTION_MODES:
+            raise ValueError(f"Unknown heuristic execution mode: {mode}")
+
+        self.mode = mode
+        self.pool_size = max(1, pool_size or os.cpu_count() or 1)
+        self.max_task_chars = max_task_chars
+        self.parser = parser
+        self.start_method = start_method
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._start_lock = asyncio.Lock()
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+
+    @classmethod
+    def from_env(cls, parser: str = 'auto') -> 'HeuristicRunner':
+        """Build a runner from HEURISTIC_EXECUTION_MODE and HEURISTIC_POOL_* settings."""
+        mode = os.getenv('HEURISTIC_EXECUTION_MODE', 'inline').lower()
+        if mode not in EXECUTION_MODES:
+            logger.warning(f"Unknown HEURISTIC_EXECUTION_MODE '{mode}' - using 'inline'")
+            mode = 'inline'
+
+        pool_size = os.getenv('HEURISTIC_POOL_SIZE')
+        return cls(
+            mode=mode,
+            pool_size=int(pool_size) if pool_size else None,
+            max_task_chars=int(
+                os.getenv('HEURISTIC_POOL_MAX_TASK_CHARS', str(cls.DEFAULT_MAX_TASK_CHARS))
+            ),
+            parser=parser,
+            start_method=os.getenv('HEURISTIC_POOL_START_METHOD', 'spawn'),
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    async def start(self) -> None:
+        """
+        Create and warm up the process pool (no-op outside process mode).
+
+        Every worker is spawned and has imported the parser before this returns,
+        so the first real requests do not pay process start-up costs.
+        """
+        if self.mode != 'process':
+            return
+
+        async with self._start_lock:
+            if self._pool is not None:
+                return
+
+            started_at = time.perf_counter()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.pool_size,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_warm_worker,
+                initargs=(self.parser,),
+            )
+            loop = asyncio.get_running_loop()
+            pids = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _ping) for _ in range(self.pool_size)
+            ))
+            logger.info(
+                f"Heuristic process pool ready: {len(set(pids))}/{self.pool_size} workers warm "
+                f"in {time.perf_counter() - started_at:.2f}s"
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the process pool, cancelling queued tasks."""
+        if self._pool is None:
+            return
+        logger.info("Shutting down heuristic process pool")
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+        self._pool = None
+
+    async def run(self, html: str, url: str, source: str) -> Optional[GrantData]:
+        """
+        Run heuristic extraction in the configured mode.
+
+        Args:
+            html: HTML content
+            url: Source URL
+            source: Source name
+
+        Returns:
+            GrantData if extraction successful, None otherwise
+
+        Raises:
+            ValueError: If the document exceeds max_task_chars
+        """
+        if len(html) > self.max_task_chars:
+            self.rejected += 1
+            raise ValueError(
+                f"HTML document too large for heuristic extraction "
+                f"({len(html)} > {self.max_task_chars} chars)"
+            )
+
+        self.in_flight += 1
+        try:
+            if self.mode == 'thread':
+                return await asyncio.to_thread(heuristic_extract, html, url, source, self.parser)
+            if self.mode == 'process':
+                return await self._run_in_pool(html, url, source)
+            return heuristic_extract(html, url, source, self.parser)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def _run_in_pool(self, html: str, url: str, source: str) -> Optional[GrantData]:
+        if self._pool is None:
+            await self.start()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._pool, heuristic_extract, html, url, source, self.parser
+            )
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): drop the pool (restarted lazily)
+            # and run this task in a thread instead
+            logger.error("Heuristic process pool is broken - restarting it")
+            self.pool_restarts += 1
+            self.shutdown(wait=False)
+            return await asyncio.to_thread(heuristic_extract, html, url, source, self.parser)
+
+    def stats(self) -> dict[str, Any]:
+        """Return execution counters."""
+        return {
+            'mode': self.mode,
+            'pool_size': self.pool_size if self.mode == 'process' else 0,
+            'pool_started': self.started,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'pool_restarts': self.pool_restarts,
+            'max_task_chars': self.max_task_chars,
+        }
@@ -0,0 +1,313 @@
+"""
+Single-pass HTML scanner for heuristic extraction
+
+Collects everything the heuristic extractor needs in one walk over the document:
+- Title candidates: text of the first h1, h2 and title elements
+- First paragraph whose stripped text is longer than 50 characters
+- Visible text (script/style/comments excluded), raw and stripped
+
+Backends:
+- lxml: C parser, used when lxml is installed (fastest)
+- stdlib: streaming html.parser walk, always available
+- bs4: the original BeautifulSoup traversal, kept as a fallback
+
+The stdlib backend reproduces BeautifulSoup's html.parser output exactly. lxml
+repairs markup like a browser does (e.g. a <div> closes an open <p>), so on
+malformed pages its paragraph boundaries can differ slightly.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:  # pragma: no cover - depends on the environment
+    lxml_etree = None
+    lxml_html = None
+
+TITLE_TAGS = ('h1', 'h2', 'title')
+SKIPPED_TAGS = ('script', 'style')
+MIN_PARAGRAPH_LENGTH = 50
+SNIPPET_LENGTH = 500
+
+BACKENDS = ('auto', 'lxml', 'stdlib', 'bs4')
+
+# libxml2 drops anything after </html>; removing the end tags keeps trailing text
+_DOCUMENT_END_TAGS = re.compile(r'</(?:body|html)\s*>', re.IGNORECASE)
+
+
+@dataclass
+class PageScan:
+    """Result of scanning an HTML document."""
+
+    title: Optional[str]
+    """Stripped text of the first h1, else h2, else title (None if none exist)."""
+
+    paragraph: str
+    """First paragraph longer than 50 chars, truncated to 500 ('' if none)."""
+
+    text_head: str
+    """First 500 chars of the stripped visible text."""
+
+    text: str
+    """Full visible text, unstripped (used for regex searches)."""
+
+
+def lxml_available() -> bool:
+    return lxml_html is not None
+
+
+def parse_document(html: str):
+    """Parse a whole document with lxml (the caller checks lxml_available())."""
+    return lxml_html.document_fromstring(_DOCUMENT_END_TAGS.sub('', html))
+
+
+def scan_html(html: str, backend: str = 'auto') -> PageScan:
+    """
+    Scan an HTML document in a single pass.
+
+    Args:
+        html: HTML content
+        backend: 'auto' (lxml if installed, else stdlib), 'lxml', 'stdlib' or 'bs4'
+
+    Returns:
+        PageScan with title candidates, first long paragraph and visible text
+
+    Raises:
+        ValueError: If the backend is unknown or unavailable
+    """
+    if backend == 'auto':
+        backend = 'lxml' if lxml_available() else 'stdlib'
+
+    if backend == 'lxml':
+        if not lxml_available():
+            raise ValueError('lxml backend requested but lxml is not installed')
+        return _scan_with_lxml(html)
+    if backend == 'stdlib':
+        return _scan_with_stdlib(html)
+    if backend == 'bs4':
+        return _scan_with_soup(html)
+
+    raise ValueError(f"Unknown HTML scanner backend: {backend}")
+
+
+def _pick_title(candidates: dict[str, str]) -> Optional[str]:
+    for name in TITLE_TAGS:
+        if name in candidates:
+            return candidates[name]
+    return None
+
+
+def _head(pieces, limit: int = SNIPPET_LENGTH) -> str:
+    """Join stripped, non-empty pieces until `limit` characters are collected."""
+    collected = []
+    size = 0
+    for piece in pieces:
+        piece = piece.strip()
+        if piece:
+            collected.append(piece)
+            size += len(piece)
+            if size >= limit:
+                break
+    return ''.join(collected)[:limit]
+
+
+# ---------------------------------------------------------------------------
+# lxml backend
+# ---------------------------------------------------------------------------
+
+def _scan_with_lxml(html: str) -> PageScan:
+    root = parse_document(html)
+    lxml_etree.strip_elements(root, lxml_etree.Comment, *SKIPPED_TAGS, with_tail=False)
+
+    candidates: dict[str, str] = {}
+    paragraph = ''
+    # Filtered iteration runs in C: Python only sees title and paragraph tags
+    for element in root.iter(*TITLE_TAGS, 'p'):
+        tag = element.tag
+        if tag == 'p':
+            if not paragraph:
+                text = ''.join(piece.strip() for piece in element.itertext())
+                if len(text) > MIN_PARAGRAPH_LENGTH:
+                    paragraph = text[:SNIPPET_LENGTH]
+        elif tag not in candidates:
+            candidates[tag] = ''.join(piece.strip() for piece in element.itertext())
+
+        if paragraph and 'h1' in candidates:
+            break
+
+    return PageScan(
+        title=_pick_title(candidates),
+        paragraph=paragraph,
+        text_head=_head(root.itertext()),
+        text=''.join(root.itertext()),
+    )
+
+
+# ---------------------------------------------------------------------------
+# stdlib backend
+# ---------------------------------------------------------------------------
+
+class _SinglePassParser(HTMLParser):
+    """
+    Streaming html.parser walk that mirrors BeautifulSoup's html.parser tree.
+
+    End tags close the most recently opened element with the same name (and
+    everything opened after it); stray end tags are ignored. Text is attributed
+    to every open title/paragraph capture, so nested elements behave like
+    get_text() on the enclosing tag.
+    """
+
+    VOID_ELEMENTS = frozenset((
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+        'link', 'meta', 'param', 'source', 'track', 'wbr',
+    ))
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: list[str] = []
+        self.skip_depth = 0
+
+        self.candidates: dict[str, list[str]] = {}
+        self.open_captures: list[tuple[int, list[str]]] = []
+
+        self.paragraphs: list[list[str]] = []
+        self.paragraph_lengths: list[int] = []
+        self.paragraph_closed: list[bool] = []
+        self.open_paragraphs: list[tuple[int, int]] = []
+        self.next_paragraph = 0
+        self.paragraph: Optional[str] = None
+
+        self.text_parts: list[str] = []
+        self.head_parts: list[str] = []
+        self.head_size = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_ELEMENTS:
+            return
+        depth = len(self.stack)
+        self.stack.append(tag)
+
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'p':
+            if self.paragraph is None:
+                self.paragraphs.append([])
+                self.paragraph_lengths.append(0)
+                self.paragraph_closed.append(False)
+                self.open_paragraphs.append((depth, len(self.paragraphs) - 1))
+        elif tag in TITLE_TAGS and tag not in self.candidates:
+            parts: list[str] = []
+            self.candidates[tag] = parts
+            self.open_captures.append((depth, parts))
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth] == tag:
+                self._close_to(depth)
+                return
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+
+        self.text_parts.append(data)
+        stripped = data.strip()
+        if not stripped:
+            return
+
+        if self.head_size < SNIPPET_LENGTH:
+            self.head_parts.append(stripped)
+            self.head_size += len(stripped)
+        for _, parts in self.open_captures:
+            parts.append(stripped)
+        for _, index in self.open_paragraphs:
+            self.paragraphs[index].append(stripped)
+            self.paragraph_lengths[index] += len(stripped)
+
+    def close(self):
+        super().close()
+        self._close_to(0)
+
+    def _close_to(self, depth: int) -> None:
+        closed = self.stack[depth:]
+        del self.stack[depth:]
+
+        self.skip_depth -= sum(1 for tag in closed if tag in SKIPPED_TAGS)
+        while self.open_captures and self.open_captures[-1][0] >= depth:
+            self.open_captures.pop()
+        closed_paragraph = False
+        while self.open_paragraphs and self.open_paragraphs[-1][0] >= depth:
+            _, index = self.open_paragraphs.pop()
+            self.paragraph_closed[index] = True
+            closed_paragraph = True
+        if closed_paragraph:
+            self._resolve_paragraph()
+
+    def _resolve_paragraph(self) -> None:
+        """Pick the first paragraph (in start order) once it is known to qualify."""
+        while self.paragraph is None and self.next_paragraph < len(self.paragraphs):
+            index = self.next_paragraph
+            if not self.paragraph_closed[index]:
+                return
+            if self.paragraph_lengths[index] > MIN_PARAGRAPH_LENGTH:
+                self.paragraph = ''.join(self.paragraphs[index])[:SNIPPET_LENGTH]
+                # No more paragraph bookkeeping is needed
+                self.paragraphs.clear()
+                self.open_paragraphs.clear()
+                return
+            self.paragraphs[index] = []
+            self.next_paragraph += 1
+
+
+def _scan_with_stdlib(html: str) -> PageScan:
+    parser = _SinglePassParser()
+    parser.feed(html)
+    parser.close()
+
+    return PageScan(
+        title=_pick_title({name: ''.join(parts) for name, parts in parser.candidates.items()}),
+        paragraph=parser.paragraph or '',
+        text_head=''.join(parser.head_parts)[:SNIPPET_LENGTH],
+        text=''.join(parser.text_parts),
+    )
+
+
+# ---------------------------------------------------------------------------
+# BeautifulSoup backend (original implementation, kept as a fallback)
+# ---------------------------------------------------------------------------
+
+def _scan_with_soup(html: str) -> PageScan:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Remove script and style elements
+    for tag in soup(list(SKIPPED_TAGS)):
+        tag.decompose()
+
+    candidates = {}
+    for selector in TITLE_TAGS:
+        tag = soup.find(selector)
+        if tag:
+            candidates[selector] = tag.get_text(strip=True)
+
+    paragraph = ''
+    for p_tag in soup.find_all('p'):
+        text = p_tag.get_text(strip=True)
+        if len(text) > MIN_PARAGRAPH_LENGTH:
+            paragraph = text[:SNIPPET_LENGTH]
+            break
+
+    return PageScan(
+        title=_pick_title(candidates),
+        paragraph=paragraph,
+        text_head=soup.get_text(strip=True)[:SNIPPET_LENGTH],
+        text=soup.get_text(),
+    )
@@ -1,96 +1,539 @@
 import asyncio
 import logging
 import os
-import re
 import json
-from typing import Optional
-from bs4 import BeautifulSoup
+import time
+from typing import AsyncIterator, Optional
 from pydantic import ValidationError
 
-from models import GrantData, ExtractionMethod
+from models import (
+    ExtractionMethod,
+    ExtractionMode,
+    ExtractionRequest,
+    ExtractionResponse,
+    GrantData,
+)
+from services.circuit_breaker import CallPermit, circuit_breakers
+from services.content_distiller import distill
+from services.gemini_client import gemini_models
+from services.gemini_executor import ExecutorSaturated, gemini_executor
+from services.heuristic_extractor import heuristic_extract
+from services.heuristic_pool import HeuristicRunner
+from services.html_scanner import BACKENDS as SCANNER_BACKENDS
+from services.metrics import EXTRACTION_LATENCY, EXTRACTIONS, FALLBACKS, HTML_SIZE
+from services.profiling import span
+from services.prompt_packer import PromptPacker, SharedPackFailure
+from services.rate_limiter import RateLimitExceeded, rate_limiters
+from services.result_cache import ResultCache, content_hash
 
 logger = logging.getLogger(__name__)
 
+def extraction_cache_key(html: str, url: str, source: str) -> str:
+    """
+    Build the content-addressed cache key for an extraction.
+
+    Whitespace runs in the HTML are collapsed so re-indented or re-serialized
+    pages with the same content share a key.
+    """
+    normalized_html = ' '.join(html.split())
+    return content_hash(url, source, normalized_html)
+
 
 class IAService:
     """Intelligence & Analytics Service for grant data extraction"""
 
     EXTRACTION_TIMEOUT_SECONDS = 10
     MAX_EXTRACTION_ATTEMPTS = 2
+    DEFAULT_BATCH_CONCURRENCY = 8
+    DEFAULT_CACHE_MAX_ENTRIES = 1024
+    DEFAULT_CACHE_TTL_SECONDS = 86400
+    DEFAULT_HEDGE_BUDGET_MS = 2000
+    DEFAULT_PROMPT_TOKEN_BUDGET = 1500
+    RAW_HTML_PROMPT_CHARS = 5000
+    DEFAULT_PACK_WINDOW_MS = PromptPacker.DEFAULT_WINDOW_MS
+    DEFAULT_PACK_MAX_DOCS = PromptPacker.DEFAULT_MAX_DOCS
+    DEFAULT_PACK_MAX_TOKENS = PromptPacker.DEFAULT_MAX_TOKENS
 
     def __init__(self):
-        """Initialize IAService with Gemini API"""
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        self.model = None
+        """Initialize IAService (the Gemini model is built lazily by gemini_models)"""
+        self.gemini_api_key = gemini_models.api_key
+        self._model = None
+        self.batch_concurrency = int(
+            os.getenv('IA_BATCH_CONCURRENCY', str(self.DEFAULT_BATCH_CONCURRENCY))
+        )
+        self.cache = self._build_cache()
+        self.heuristic_parser = os.getenv('HEURISTIC_PARSER', 'auto').lower()
+        if self.heuristic_parser not in SCANNER_BACKENDS:
+            logger.warning(f"Unknown HEURISTIC_PARSER '{self.heuristic_parser}' - using 'auto'")
+            self.heuristic_parser = 'auto'
+        self.heuristic_runner = HeuristicRunner.from_env(parser=self.heuristic_parser)
+        self.hedge_budget_ms = int(
+            os.getenv('HEDGE_LATENCY_BUDGET_MS', str(self.DEFAULT_HEDGE_BUDGET_MS))
+        )
+        self.prompt_token_budget = int(
+            os.getenv('GEMINI_PROMPT_TOKEN_BUDGET', str(self.DEFAULT_PROMPT_TOKEN_BUDGET))
+        )
+        self.packer = PromptPacker(
+            generate=self._generate,
+            parse=self._grant_from_extracted,
+            extract_single=self._extract_with_gemini,
+            window_ms=int(os.getenv('GEMINI_PACK_WINDOW_MS', str(self.DEFAULT_PACK_WINDOW_MS))),
+            max_docs=int(os.getenv('GEMINI_PACK_MAX_DOCS', str(self.DEFAULT_PACK_MAX_DOCS))),
+            max_tokens=int(os.getenv('GEMINI_PACK_MAX_TOKENS', str(self.DEFAULT_PACK_MAX_TOKENS))),
+            doc_token_budget=self.prompt_token_budget,
+        )
+        # Late Gemini calls of hedged requests, kept referenced until they finish
+        self._late_tasks: set[asyncio.Task] = set()
+
+    @property
+    def model(self):
+        """Gemini model: the shared lazily built one unless overridden (tests)."""
+        if self._model is not None:
+            return self._model
+        return gemini_models.get()
+
+    @model.setter
+    def model(self, model) -> None:
+        self._model = model
+
+    def _build_cache(self) -> Optional[ResultCache]:
+        """Create the extraction result cache from environment settings."""
+        if os.getenv('EXTRACTION_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+            logger.info("Extraction cache disabled")
+            return None
 
-        if not self.gemini_api_key:
-            logger.warning("GEMINI_API_KEY not set - will use fallback heuristic extraction only")
-        else:
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.gemini_api_key)
-                self.model = genai.GenerativeModel('gemini-pro')
-                logger.info("Gemini AI model initialized successfully")
-            except ImportError:
-                logger.warning("google-generativeai not installed - will use fallback heuristic extraction only")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Gemini: {str(e)} - will use fallback heuristic extraction only")
+        return ResultCache(
+            namespace='extraction',
+            max_entries=int(
+                os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', str(self.DEFAULT_CACHE_MAX_ENTRIES))
+            ),
+            ttl_seconds=float(
+                os.getenv('EXTRACTION_CACHE_TTL_SECONDS', str(self.DEFAULT_CACHE_TTL_SECONDS))
+            ),
+            db_path=os.getenv('EXTRACTION_CACHE_DB_PATH') or None,
+        )
+
+    async def extract(self, request: ExtractionRequest) -> ExtractionResponse:
+        """
+        Extract grant data for a single request.
+
+        Wraps extract_grant and packs its result tuple into an ExtractionResponse.
+        Results are looked up in (and stored to) the extraction cache, keyed by
+        the normalized HTML plus url/source. Failures are reported in the
+        response (success=False) instead of raised, and are never cached.
+
+        Args:
+            request: Extraction request with html, url and source
+
+        Returns:
+            ExtractionResponse for the request (cached=True on cache hit)
+        """
+        HTML_SIZE.observe(len(request.html))
+        cache_key = None
+        if self.cache is not None:
+            cache_key = extraction_cache_key(request.html, request.url, request.source)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"✓ Extraction cache hit for {request.source} ({request.url})")
+                return ExtractionResponse(
+                    success=True,
+                    data=GrantData.model_validate(cached),
+                    method_used=cached['extraction_method'],
+                    cached=True,
+                )
+
+        success, data, method, error = await self.extract_grant(
+            html=request.html,
+            url=request.url,
+            source=request.source,
+            mode=request.mode,
+            latency_budget_ms=request.latency_budget_ms,
+            cache_late_result=request.cache_late_result,
+        )
+        if success and data is not None and cache_key is not None:
+            self.cache.set(cache_key, data.model_dump(mode='json'))
+
+        return ExtractionResponse(
+            success=success,
+            data=data,
+            method_used=method,
+            error=error,
+        )
+
+    async def extract_batch(
+        self,
+        requests: list[ExtractionRequest],
+        concurrency: Optional[int] = None,
+    ) -> list[ExtractionResponse]:
+        """
+        Extract grant data for several requests with bounded concurrency.
+
+        At most `concurrency` extractions run at the same time. A failing item
+        never fails the batch: its error is reported in its own response.
+
+        Args:
+            requests: Extraction requests to process
+            concurrency: Max concurrent extractions (default: IA_BATCH_CONCURRENCY)
+
+        Returns:
+            One ExtractionResponse per request, in request order
+        """
+        limit = max(1, concurrency or self.batch_concurrency)
+        semaphore = asyncio.Semaphore(limit)
+        logger.info(f"Starting batch extraction of {len(requests)} documents (concurrency={limit})")
+
+        async def run(request: ExtractionRequest) -> ExtractionResponse:
+            async with semaphore:
+                return await self._extract_safely(request)
+
+        return list(await asyncio.gather(*(run(request) for request in requests)))
+
+    async def extract_stream(
+        self,
+        requests: list[ExtractionRequest],
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[tuple[int, ExtractionResponse]]:
+        """
+        Extract several documents and yield each result as soon as it is ready.
+
+        Results come in completion order, tagged with the request index. A
+        fixed set of workers pulls requests and hands results over through a
+        queue of `concurrency` slots: when the consumer stops reading, workers
+        block on the full queue and no new extraction starts, so memory stays
+        bounded by the concurrency instead of the batch size. Closing the
+        iterator (e.g. client disconnect) cancels the remaining work.
+
+        Args:
+            requests: Extraction requests to process
+            concurrency: Max concurrent extractions (default: IA_BATCH_CONCURRENCY)
+
+        Yields:
+            (request index, ExtractionResponse) pairs in completion order
+        """
+        limit = max(1, min(concurrency or self.batch_concurrency, len(requests)))
+        queue: asyncio.Queue[tuple[int, ExtractionResponse]] = asyncio.Queue(maxsize=limit)
+        pending = iter(enumerate(requests))
+        logger.info(f"Starting streamed extraction of {len(requests)} documents (concurrency={limit})")
+
+        async def worker() -> None:
+            for index, request in pending:
+                await queue.put((index, await self._extract_safely(request)))
+
+        workers = [asyncio.create_task(worker()) for _ in range(limit)]
+        try:
+            for _ in range(len(requests)):
+                yield await queue.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _extract_safely(self, request: ExtractionRequest) -> ExtractionResponse:
+        """Run extract, reporting unexpected errors in the response instead of raising."""
+        try:
+            return await self.extract(request)
+        except Exception as e:
+            logger.error(f"✗ Unexpected error extracting {request.url}: {str(e)}")
+            return ExtractionResponse(
+                success=False,
+                method_used=ExtractionMethod.HEURISTIC,
+                error=f"Unexpected error during extraction: {str(e)}",
+            )
 
     async def extract_grant(
         self,
         html: str,
         url: str,
         source: str,
+        mode: ExtractionMode = ExtractionMode.SEQUENTIAL,
+        latency_budget_ms: Optional[int] = None,
+        cache_late_result: bool = True,
     ) -> tuple[bool, Optional[GrantData], ExtractionMethod, Optional[str]]:
         """
         Extract grant data from HTML with fallback logic.
 
-        Flow:
+        Flow (sequential mode):
         1. Try Gemini extraction (10s timeout)
         2. On timeout: Use heuristic extraction
         3. On error: Raise explicit error (never return empty)
 
+        In hedged mode the heuristic starts together with Gemini, and its result
+        is returned if Gemini has not answered within the latency budget.
+
+        In packed mode the Gemini step goes through the prompt packer, which
+        shares one Gemini call between requests arriving within a few
+        milliseconds; the fallback chain is the same as in sequential mode.
+
         Args:
             html: HTML content to extract from
             url: Source URL
             source: Source name
+            mode: Sequential, hedged or packed extraction
+            latency_budget_ms: Hedged mode budget for Gemini (default: HEDGE_LATENCY_BUDGET_MS)
+            cache_late_result: Hedged mode: cache a Gemini answer that arrives after the budget
 
         Returns:
             Tuple of (success, data, method_used, error_message)
         """
         logger.info(f"Starting grant extraction from {source} ({url})")
 
-        # 1. Try primary: Gemini extraction with timeout
-        if self.model and self.gemini_api_key:
+        # 1. Try primary: Gemini extraction with timeout (skipped while the circuit is open)
+        breaker = circuit_breakers.get('gemini')
+        permit = breaker.allow_request() if self.model and self.gemini_api_key else None
+        if self.model and self.gemini_api_key and permit is None:
+            FALLBACKS.labels('circuit_open').inc()
+            logger.warning("⚡ Gemini circuit open - going straight to heuristic")
+
+        elif permit is not None and mode == ExtractionMode.HEDGED:
+            result = await self._extract_hedged(
+                html,
+                url,
+                source,
+                latency_budget_ms if latency_budget_ms is not None else self.hedge_budget_ms,
+                cache_late_result,
+                permit,
+            )
+            if result is None:
+                # The hedge already ran the heuristic: no second attempt
+                return self._extraction_failed(source)
+            EXTRACTIONS.labels(result[2].value).inc()
+            return result
+
+        elif permit is not None:
             try:
                 logger.debug("Attempting Gemini AI extraction...")
-                data = await self._extract_with_gemini(html, url, source)
+                data = await self._run_gemini(html, url, source, mode)
+                breaker.record_success(permit)
+                EXTRACTIONS.labels('gemini').inc()
                 logger.info(f"✓ Gemini extraction successful from {source}")
                 return True, data, ExtractionMethod.GEMINI, None
 
+            except SharedPackFailure as e:
+                # The packed call failed for several requests: another one recorded it
+                breaker.release(permit)
+                FALLBACKS.labels(self._fallback_reason(e.error)).inc()
+                logger.warning(f"✗ Packed Gemini call failed: {str(e)} - falling back to heuristic")
+
             except asyncio.TimeoutError:
+                breaker.record_failure(timeout=True, permit=permit)
+                FALLBACKS.labels('timeout').inc()
                 logger.warning(
                     f"⏱ Gemini timeout after {self.EXTRACTION_TIMEOUT_SECONDS}s - falling back to heuristic"
                 )
 
+            except (RateLimitExceeded, ExecutorSaturated) as e:
+                breaker.release(permit)
+                FALLBACKS.labels('rate_limited' if isinstance(e, RateLimitExceeded) else 'saturated').inc()
+                logger.warning(f"⏳ {str(e)} - falling back to heuristic")
+
+            except ValueError as e:
+                # Gemini answered, but with unusable content: the provider is healthy
+                breaker.record_success(permit)
+                FALLBACKS.labels('invalid_response').inc()
+                logger.error(f"✗ Gemini extraction failed: {str(e)} - falling back to heuristic")
+
             except Exception as e:
+                breaker.record_failure(permit=permit)
+                FALLBACKS.labels('error').inc()
                 logger.error(f"✗ Gemini extraction failed: {str(e)} - falling back to heuristic")
 
         # 2. Try fallback 1: Heuristic extraction
         try:
             logger.debug("Attempting heuristic extraction...")
-            data = self._heuristic_extract(html, url, source)
+            data = await self._run_heuristic(html, url, source)
             if data:
+                EXTRACTIONS.labels('heuristic').inc()
                 logger.info(f"✓ Heuristic extraction successful from {source}")
                 return True, data, ExtractionMethod.HEURISTIC, None
         except Exception as e:
             logger.error(f"✗ Heuristic extraction failed: {str(e)}")
 
         # 3. Fallback 2: Explicit error (never return empty)
+        return self._extraction_failed(source)
+
+    @staticmethod
+    def _extraction_failed(source: str) -> tuple[bool, None, ExtractionMethod, str]:
+        """Explicit error result once every extraction method failed."""
         error_msg = f"Failed to extract grant data from {source}. Both AI and heuristic extraction failed."
+        EXTRACTIONS.labels('none').inc()
         logger.error(f"✗ All extraction methods failed for {source}: {error_msg}")
         return False, None, ExtractionMethod.HEURISTIC, error_msg
 
+    async def _run_gemini(
+        self,
+        html: str,
+        url: str,
+        source: str,
+        mode: ExtractionMode = ExtractionMode.SEQUENTIAL,
+    ) -> GrantData:
+        """Run the Gemini step (packed or single-document), recording its latency."""
+        started_at = time.perf_counter()
+        try:
+            with span('gemini'):
+                if mode == ExtractionMode.PACKED:
+                    return await self.packer.extract(html, url, source)
+                return await self._extract_with_gemini(html, url, source)
+        finally:
+            EXTRACTION_LATENCY.labels('gemini').observe(time.perf_counter() - started_at)
+
+    async def _run_heuristic(self, html: str, url: str, source: str) -> Optional[GrantData]:
+        """Run heuristic extraction in the configured mode, recording its latency."""
+        started_at = time.perf_counter()
+        try:
+            return await self.heuristic_runner.run(html, url, source)
+        finally:
+            EXTRACTION_LATENCY.labels('heuristic').observe(time.perf_counter() - started_at)
+
+    async def _extract_hedged(
+        self,
+        html: str,
+        url: str,
+        source: str,
+        latency_budget_ms: int,
+        cache_late_result: bool,
+        permit: Optional[CallPermit] = None,
+    ) -> Optional[tuple[bool, Optional[GrantData], ExtractionMethod, Optional[str]]]:
+        """
+        Run Gemini and heuristic extraction concurrently under a latency budget.
+
+        - Gemini answers within the budget: its result wins, the heuristic is cancelled
+        - Budget exceeded (or Gemini failed): the heuristic result is returned; a
+          late Gemini answer can still be written to the cache
+        - Heuristic failed too: wait for Gemini up to its own timeout
+
+        The circuit breaker was already acquired by the caller (permit); the
+        Gemini outcome is recorded whenever the call finishes, even after we return.
+
+        Returns:
+            Extraction result tuple, or None if both methods failed
+        """
+        breaker = circuit_breakers.get('gemini')
+        gemini_task = asyncio.create_task(self._run_gemini(html, url, source))
+        gemini_task.add_done_callback(lambda task: self._record_gemini_outcome(breaker, task, permit))
+        heuristic_task = asyncio.create_task(self._run_heuristic(html, url, source))
+
+        await asyncio.wait({gemini_task}, timeout=latency_budget_ms / 1000)
+        if gemini_task.done() and not gemini_task.cancelled() and gemini_task.exception() is None:
+            heuristic_task.cancel()
+            logger.info(f"✓ Gemini extraction successful from {source} (hedged, within budget)")
+            return True, gemini_task.result(), ExtractionMethod.GEMINI, None
+
+        if not gemini_task.done():
+            FALLBACKS.labels('hedge_budget').inc()
+            logger.info(f"⏱ Gemini exceeded {latency_budget_ms}ms budget - using hedged heuristic result")
+
+        try:
+            data = await heuristic_task
+        except Exception as e:
+            logger.error(f"✗ Heuristic extraction failed: {str(e)}")
+            data = None
+
+        if data:
+            if not gemini_task.done():
+                self._track_late_gemini(gemini_task, html, url, source, cache_late_result)
+            logger.info(f"✓ Heuristic extraction successful from {source} (hedged)")
+            return True, data, ExtractionMethod.HEURISTIC, None
+
+        # Heuristic failed: Gemini is the only remaining option
+        try:
+            data = await gemini_task
+            logger.info(f"✓ Gemini extraction successful from {source} (hedged, after heuristic failed)")
+            return True, data, ExtractionMethod.GEMINI, None
+        except Exception as e:
+            logger.error(f"✗ Gemini extraction failed: {str(e) or type(e).__name__}")
+            return None
+
+    def _track_late_gemini(
+        self,
+        task: asyncio.Task,
+        html: str,
+        url: str,
+        source: str,
+        cache_late_result: bool,
+    ) -> None:
+        """Keep a late Gemini call alive and optionally cache its answer."""
+        self._late_tasks.add(task)
+        task.add_done_callback(self._late_tasks.discard)
+        if not (cache_late_result and self.cache is not None):
+            return
+
+        cache_key = extraction_cache_key(html, url, source)
+
+        def cache_result(done: asyncio.Task) -> None:
+            if done.cancelled() or done.exception() is not None:
+                return
+            self.cache.set(cache_key, done.result().model_dump(mode='json'))
+            logger.info(f"✓ Cached late Gemini result for {source} ({url})")
+
+        task.add_done_callback(cache_result)
+
+    @staticmethod
+    def _fallback_reason(error: BaseException) -> str:
+        """Fallback metric reason for a failed Gemini call."""
+        if isinstance(error, asyncio.TimeoutError):
+            return 'timeout'
+        if isinstance(error, RateLimitExceeded):
+            return 'rate_limited'
+        if isinstance(error, ExecutorSaturated):
+            return 'saturated'
+        if isinstance(error, ValueError):
+            return 'invalid_response'
+        return 'error'
+
+    @staticmethod
+    def _record_gemini_outcome(breaker, task: asyncio.Task, permit: Optional[CallPermit] = None) -> None:
+        """Report a finished Gemini call to the circuit breaker."""
+        if task.cancelled():
+            breaker.release(permit)
+            return
+        error = task.exception()
+        if error is None or isinstance(error, ValueError):
+            breaker.record_success(permit)
+        elif isinstance(error, (RateLimitExceeded, ExecutorSaturated)):
+            breaker.release(permit)
+        elif isinstance(error, asyncio.TimeoutError):
+            breaker.record_failure(timeout=True, permit=permit)
+        else:
+            breaker.record_failure(permit=permit)
+
+    def _build_prompt(self, html: str) -> str:
+        """
+        Build the Gemini extraction prompt from the page's main content.
+
+        The page is distilled (boilerplate removed, main block isolated, compact
+        markdown) and cut to GEMINI_PROMPT_TOKEN_BUDGET tokens. Pages with no
+        recognizable text content fall back to the first characters of raw HTML.
+        """
+        content = distill(html, max_tokens=self.prompt_token_budget)
+        if not content.text:
+            return f"""
+        Extract grant information from the following HTML. Return JSON with:
+        - title: Grant name/title
+        - description: Grant description
+        - amount: Grant amount in EUR (number only, or null)
+        - deadline: Application deadline (ISO 8601 date or null)
+
+        HTML:
+        {html[:self.RAW_HTML_PROMPT_CHARS]}
+
+        Return ONLY valid JSON, no markdown, no extra text.
+        """
+
+        return f"""
+        Extract grant information from the following page content. Return JSON with:
+        - title: Grant name/title
+        - description: Grant description
+        - amount: Grant amount in EUR (number only, or null)
+        - deadline: Application deadline (ISO 8601 date or null)
+
+        Page title: {content.title or 'unknown'}
+
+        Content:
+        {content.text}
+
+        Return ONLY valid JSON, no markdown, no extra text.
+        """
+
     async def _extract_with_gemini(
         self,
         html: str,
@@ -110,35 +553,58 @@ class IAService:
 
         Raises:
             asyncio.TimeoutError: If API call exceeds timeout
+            RateLimitExceeded: If the Gemini rate limit would need a longer wait
+            ExecutorSaturated: If the Gemini executor has no capacity left
             ValueError: If Gemini response is invalid
         """
-        prompt = f"""
-        Extract grant information from the following HTML. Return JSON with:
-        - title: Grant name/title
-        - description: Grant description
-        - amount: Grant amount in EUR (number only, or null)
-        - deadline: Application deadline (ISO 8601 date or null)
+        # Distillation is a pure-Python parse of the whole page: keep it off the event loop
+        prompt = await asyncio.to_thread(self._build_prompt, html)
 
-        HTML:
-        {html[:5000]}
+        try:
+            extracted = json.loads(await self._generate(prompt))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON from Gemini: {str(e)}")
 
-        Return ONLY valid JSON, no markdown, no extra text.
+        return self._grant_from_extracted(extracted, url, source)
+
+    async def _generate(self, prompt: str) -> str:
         """
+        Send one prompt to Gemini (rate limited, with timeout).
+
+        Raises:
+            asyncio.TimeoutError: If API call exceeds timeout
+            RateLimitExceeded: If the Gemini rate limit would need a longer wait
+            ExecutorSaturated: If the Gemini executor has no capacity left
+        """
+        # Client-side throttling, shared with discovery validation
+        await rate_limiters.bucket('gemini', self.gemini_api_key).acquire()
 
         try:
-            # Run with timeout
-            response = await asyncio.wait_for(
-                asyncio.to_thread(
-                    self.model.generate_content,
-                    prompt,
-                ),
+            # Dedicated bounded executor: timed-out calls cannot starve the default pool
+            response = await gemini_executor.generate(
+                self.model,
+                prompt,
                 timeout=self.EXTRACTION_TIMEOUT_SECONDS,
             )
+            return response.text
+
+        except asyncio.TimeoutError:
+            logger.warning(f"Gemini extraction timeout after {self.EXTRACTION_TIMEOUT_SECONDS}s")
+            raise
 
-            extracted = json.loads(response.text)
+    @staticmethod
+    def _grant_from_extracted(extracted: dict, url: str, source: str) -> GrantData:
+        """
+        Validate one object extracted by Gemini into GrantData.
+
+        Raises:
+            ValueError: If the object is not valid grant data
+        """
+        if not isinstance(extracted, dict):
+            raise ValueError(f"Invalid grant data: expected an object, got {type(extracted).__name__}")
 
-            # Validate and create GrantData
-            data = GrantData(
+        try:
+            return GrantData(
                 title=extracted.get('title', 'Unknown'),
                 description=extracted.get('description', 'No description'),
                 amount=extracted.get('amount'),
@@ -147,16 +613,6 @@ class IAService:
                 source=source,
                 extraction_method=ExtractionMethod.GEMINI,
             )
-
-            return data
-
-        except asyncio.TimeoutError:
-            logger.warning(f"Gemini extraction timeout after {self.EXTRACTION_TIMEOUT_SECONDS}s")
-            raise
-
-        except json.JSONDecodeError as e:
-            raise ValueError(f"Invalid JSON from Gemini: {str(e)}")
-
         except ValidationError as e:
             raise ValueError(f"Invalid grant data: {str(e)}")
 
@@ -167,9 +623,11 @@ class IAService:
         source: str,
     ) -> Optional[GrantData]:
         """
-        Extract grant data using heuristic rules (Regex + BeautifulSoup).
+        Extract grant data using heuristic rules (single-pass scan + Regex).
 
-        Fallback method when Gemini fails or times out.
+        Fallback method when Gemini fails or times out. Runs synchronously in
+        the calling thread; extract_grant goes through heuristic_runner instead,
+        which applies the configured execution mode (inline, thread or process).
 
         Args:
             html: HTML content
@@ -179,83 +637,7 @@ class IAService:
         Returns:
             GrantData if extraction successful, None otherwise
         """
-        try:
-            soup = BeautifulSoup(html, 'html.parser')
-
-            # Remove script and style elements
-            for tag in soup(['script', 'style']):
-                tag.decompose()
-
-            # Extract title: Try h1, h2, title tag
-            title = None
-            for selector in ['h1', 'h2', 'title']:
-                tag = soup.find(selector)
-                if tag:
-                    title = tag.get_text(strip=True)
-                    break
-
-            if not title:
-                title = 'Grant from ' + source
-
-            # Extract description: First paragraph or text content
-            description = ''
-            for p_tag in soup.find_all('p'):
-                text = p_tag.get_text(strip=True)
-                if len(text) > 50:
-                    description = text[:500]
-                    break
-
-            if not description:
-                description = soup.get_text(strip=True)[:500]
-
-            # Extract amount: Look for EUR/€ patterns
-            amount = None
-            text = soup.get_text()
-            # Pattern: €50,000 or €50000 or 50,000 EUR or 50000 EUR
-            # More specific patterns that require either currency symbol or EUR keyword
-            amount_patterns = [
-                r'[€$]\s*(\d{1,3}(?:[,\.]\d{3})+)',  # €50,000 or $50,000
-                r'(\d{1,3}(?:[,\.]\d{3})+)\s*EUR',    # 50,000 EUR
-                r'amount[:\s]+[€$]?\s*(\d+(?:[,\.]\d{3})+)',  # amount: 50,000
-            ]
-            for pattern in amount_patterns:
-                amount_match = re.search(pattern, text, re.IGNORECASE)
-                if amount_match:
-                    try:
-                        amount_str = amount_match.group(1).replace(',', '').replace('.', '')
-                        amount = int(amount_str)
-                        break
-                    except (ValueError, IndexError):
-                        continue
-
-            # Extract deadline: Look for date patterns
-            deadline = None
-            # ISO 8601 date pattern
-            date_match = re.search(r'(\d{4}-\d{2}-\d{2})', text)
-            if date_match:
-                deadline = date_match.group(1)
-
-            # Validate minimum requirements
-            if len(title) < 5 or len(description) < 10:
-                logger.warning(f"Heuristic extraction did not meet minimum requirements from {source}")
-                return None
-
-            # Create GrantData
-            data = GrantData(
-                title=title,
-                description=description,
-                amount=amount,
-                deadline=deadline,
-                url=url,
-                source=source,
-                extraction_method=ExtractionMethod.HEURISTIC,
-            )
-
-            return data
-
-        except Exception as e:
-            logger.error(f"Heuristic extraction failed: {str(e)}")
-            return None
+        return heuristic_extract(html, url, source, parser=self.heuristic_parser)
 
 
 # Singleton instance
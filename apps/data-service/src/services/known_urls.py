@@ -0,0 +1,147 @@
+"""
+Known source URLs, shared across discovery runs
+
+The `seen` set of discover_sources only lives for one call, so every run
+validated (and, with auto_save, posted) sources the backend already had.
+KnownUrlSet remembers the URLs the backend holds: it is seeded from
+GET /sources at startup and grows with every source discovery saves.
+discover_sources drops known URLs before any validation or network work.
+
+Membership is tested on url_key (canonical URL without scheme and www.), so
+the spellings of one URL are known together. Keys are stored as a sorted
+array of 64-bit hashes: 8 bytes per URL, binary search lookups and, unlike a
+Bloom filter, no capacity to size up front. False positives need a 64-bit
+hash collision (about 1 in 10^9 for 100k URLs).
+
+Configuration:
+- DISCOVERY_KNOWN_URLS_ENABLED: Set to false to keep known URLs in results (default: true)
+- DISCOVERY_KNOWN_URLS_PATH: Optional file the set is loaded from and saved to
+- DISCOVERY_KNOWN_URLS_SEED: Seed from the backend at startup (default: true)
+"""
+
+import hashlib
+import logging
+import os
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterable, Optional
+
+from services.url_canonicalizer import url_key
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b'GRANTER-KNOWN-URLS-1\n'
+
+
+def url_hash(url: str) -> Optional[int]:
+    """64-bit hash of the url_key of a URL (None for invalid URLs)."""
+    key = url_key(url)
+    if key is None:
+        return None
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class KnownUrlSet:
+    """Compact set of URLs (sorted 64-bit hashes), optionally persisted to a file."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the set.
+
+        Args:
+            path: File the set is loaded from and saved to (None keeps it in memory)
+        """
+        self.path = path
+        self._hashes = array('Q')
+        self.seeded = 0
+        self.skipped = 0
+        if path:
+            self._load(path)
+
+    @classmethod
+    def from_env(cls) -> Optional['KnownUrlSet']:
+        """Create the set from environment settings (None when disabled)."""
+        if os.getenv('DISCOVERY_KNOWN_URLS_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+            logger.info("Discovery known-URL filter disabled")
+            return None
+        return cls(path=os.getenv('DISCOVERY_KNOWN_URLS_PATH') or None)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def __contains__(self, url: str) -> bool:
+        value = url_hash(url)
+        if value is None:
+            return False
+        index = bisect_left(self._hashes, value)
+        return index < len(self._hashes) and self._hashes[index] == value
+
+    def add(self, url: str) -> bool:
+        """
+        Add a URL.
+
+        Returns:
+            True if it was not known yet
+        """
+        value = url_hash(url)
+        if value is None:
+            return False
+        index = bisect_left(self._hashes, value)
+        if index < len(self._hashes) and self._hashes[index] == value:
+            return False
+        self._hashes.insert(index, value)
+        return True
+
+    def update(self, urls: Iterable[str]) -> int:
+        """
+        Add many URLs at once (one sort instead of an insert per URL).
+
+        Returns:
+            Number of URLs that were not known yet
+        """
+        before = len(self._hashes)
+        values = {value for value in map(url_hash, urls) if value is not None}
+        values.update(self._hashes)
+        self._hashes = array('Q', sorted(values))
+        return len(self._hashes) - before
+
+    def save(self) -> None:
+        """Write the set to its file (atomically; no-op without a path)."""
+        if not self.path:
+            return
+        temporary = f'{self.path}.tmp'
+        try:
+            with open(temporary, 'wb') as handle:
+                handle.write(_MAGIC)
+                self._hashes.tofile(handle)
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.warning(f"Failed to save known URLs to {self.path}: {str(e)}")
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, 'rb') as handle:
+                if handle.read(len(_MAGIC)) != _MAGIC:
+                    logger.warning(f"Ignoring {path}: not a known-URL file")
+                    return
+                data = handle.read()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Failed to load known URLs from {path}: {str(e)}")
+            return
+
+        hashes = array('Q')
+        hashes.frombytes(data[: len(data) - len(data) % hashes.itemsize])
+        self._hashes = hashes
+        logger.info(f"Loaded {len(hashes)} known URLs from {path}")
+
+    def stats(self) -> dict[str, Any]:
+        """Return size and counters."""
+        return {
+            'urls': len(self._hashes),
+            'bytes': len(self._hashes) * self._hashes.itemsize,
+            'persistent': bool(self.path),
+            'seeded': self.seeded,
+            'skipped': self.skipped,
+        }
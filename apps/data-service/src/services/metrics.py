@@ -0,0 +1,323 @@
+"""
+Prometheus metrics (text exposition format 0.0.4)
+
+A small in-process implementation, so the hot path does not depend on an
+extra package and recording stays cheap:
+
+- Label sets known up front (extraction methods, fallback reasons, discovery
+  stages) are preallocated at import; recording is a dict lookup plus an
+  in-place add on the child
+- No locks: metrics are updated from the event loop thread (and occasionally
+  from worker threads, where a lost increment is acceptable for monitoring)
+- Histograms keep per-bucket counts and build the cumulative series only when
+  /metrics is scraped
+- Values owned by other components (cache counters, executor queue depth,
+  breaker state) are read by collectors at scrape time, not pushed
+
+Usage:
+    EXTRACTION_LATENCY.labels('gemini').observe(elapsed)
+    FALLBACKS.labels('timeout').inc()
+"""
+
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Optional
+
+# Seconds; covers ~1ms heuristic runs up to the 10s Gemini timeout
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Characters; 1K to the 1M request limit
+SIZE_BUCKETS = (1_000, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class _Metric:
+    kind = 'untyped'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        preallocate: Iterable[tuple[str, ...]] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], object] = {}
+        if not labelnames:
+            self._children[()] = self._new_child()
+        for values in preallocate:
+            self.labels(*values)
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child for these label values (created on first use)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def render(self) -> list[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values, child) -> list[str]:
+        return [f'{self.name}{_label_text(self.labelnames, values)} {_format_value(child.value)}']
+
+
+class _Value:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    kind = 'counter'
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].value += amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down."""
+
+    kind = 'gauge'
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._children[()].value -= amount
+
+    def set(self, value: float) -> None:
+        self._children[()].value = value
+
+
+class _HistogramChild:
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def time(self) -> '_Timer':
+        """Context manager observing the elapsed seconds of its block."""
+        return _Timer(self)
+
+
+class _Timer:
+    __slots__ = ('child', 'started')
+
+    def __init__(self, child: _HistogramChild):
+        self.child = child
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.child.observe(time.perf_counter() - self.started)
+        return False
+
+
+class Histogram(_Metric):
+    """Distribution of observations in fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        preallocate: Iterable[tuple[str, ...]] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.bucket_bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, preallocate)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bucket_bounds)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def _render_child(self, values, child: _HistogramChild) -> list[str]:
+        lines = []
+        cumulative = 0
+        counts = list(child.counts)
+        for bound, count in zip(self.bucket_bounds + (math.inf,), counts):
+            cumulative += count
+            labels = _label_text(self.labelnames, values, f'le="{_format_value(bound)}"')
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _label_text(self.labelnames, values)
+        lines.append(f'{self.name}_sum{labels} {_format_value(child.sum)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+# A collector returns (name, type, help, [(labels dict, value), ...]) families at scrape time
+Collector = Callable[[], Iterable[tuple[str, str, str, list[tuple[dict[str, str], float]]]]]
+
+
+class MetricsRegistry:
+    """Process-wide set of metrics and scrape-time collectors."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Collector] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                preallocate: Iterable[tuple[str, ...]] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, preallocate))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+              preallocate: Iterable[tuple[str, ...]] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, preallocate))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                  preallocate: Iterable[tuple[str, ...]] = (),
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, preallocate, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        """Register a callback that reports values owned by other components."""
+        self._collectors.append(collector)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    names = tuple(labels)
+                    lines.append(
+                        f'{name}{_label_text(names, tuple(labels[n] for n in names))} {_format_value(value)}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+# Singleton registry
+metrics = MetricsRegistry()
+
+EXTRACTION_METHODS = ('gemini', 'heuristic')
+FALLBACK_REASONS = (
+    'circuit_open', 'timeout', 'rate_limited', 'saturated', 'invalid_response', 'error', 'hedge_budget',
+)
+DISCOVERY_STAGES = ('search', 'validate', 'backend_post')
+VALIDATION_PROMPT_KINDS = ('single', 'batch')
+
+HTTP_REQUESTS = metrics.counter(
+    'granter_http_requests_total', 'HTTP requests by route, method and status code',
+    ('route', 'method', 'status'),
+)
+HTTP_IN_FLIGHT = metrics.gauge(
+    'granter_http_requests_in_flight', 'HTTP requests currently being served',
+)
+HTTP_LATENCY = metrics.histogram(
+    'granter_http_request_duration_seconds', 'HTTP request latency by route', ('route',),
+)
+EXTRACTIONS = metrics.counter(
+    'granter_extractions_total', 'Extractions by the method that produced the result (none: failed)',
+    ('method',), preallocate=[(method,) for method in EXTRACTION_METHODS + ('none',)],
+)
+EXTRACTION_LATENCY = metrics.histogram(
+    'granter_extraction_duration_seconds', 'Latency of each extraction method attempt',
+    ('method',), preallocate=[(method,) for method in EXTRACTION_METHODS],
+)
+FALLBACKS = metrics.counter(
+    'granter_extraction_fallbacks_total', 'Gemini extractions that fell back to heuristics, by reason',
+    ('reason',), preallocate=[(reason,) for reason in FALLBACK_REASONS],
+)
+HTML_SIZE = metrics.histogram(
+    'granter_extraction_html_chars', 'Size (characters) of HTML documents submitted for extraction',
+    buckets=SIZE_BUCKETS,
+)
+DISCOVERY_LATENCY = metrics.histogram(
+    'granter_discovery_stage_duration_seconds', 'Latency of discovery stages',
+    ('stage',), preallocate=[(stage,) for stage in DISCOVERY_STAGES],
+)
+DISCOVERY_TIMEOUTS = metrics.counter(
+    'granter_discovery_timeouts_total', 'Discovery stage calls that timed out',
+    ('stage',), preallocate=[(stage,) for stage in DISCOVERY_STAGES],
+)
+DISCOVERY_VALIDATION_PROMPTS = metrics.counter(
+    'granter_discovery_validation_prompts_total', 'Gemini validation prompts sent, by kind',
+    ('kind',), preallocate=[(kind,) for kind in VALIDATION_PROMPT_KINDS],
+)
+DISCOVERY_BATCH_SIZE = metrics.histogram(
+    'granter_discovery_validation_batch_candidates', 'Candidates per batch validation prompt',
+    buckets=(2, 5, 10, 15, 20, 25, 50),
+)
+DISCOVERY_BATCH_RETRIES = metrics.counter(
+    'granter_discovery_validation_batch_retries_total',
+    'Candidates classified again after a malformed or incomplete batch answer',
+)
+DISCOVERY_KNOWN_SKIPPED = metrics.counter(
+    'granter_discovery_known_urls_skipped_total', 'Candidates dropped because the backend already has them',
+)
+STARTUP_SECONDS = metrics.gauge(
+    'granter_startup_seconds', 'Cold start duration by phase (imports, warm_up)', ('phase',),
+)
@@ -0,0 +1,404 @@
+"""
+On-demand request profiling
+
+Captures a sampling profile of individual requests without redeploying with
+a profiler attached:
+
+- A request is profiled when it carries X-Profile-Token matching
+  PROFILING_TOKEN, or when it falls in the PROFILING_SAMPLE_RATE fraction of
+  traffic (only while a token is configured, since profiles are downloaded
+  with it)
+- While the request runs, a sampler thread records the Python stacks of the
+  threads the request is executing on (the event loop thread, plus worker
+  threads that entered one of its spans) every PROFILING_INTERVAL_MS
+- Named spans (heuristic_extract, soup, amount_regex, gemini) time the
+  pipeline stages of the profiled request; outside a profiled request a span
+  is a context-variable lookup
+- Finished profiles are kept in a small in-memory store and downloaded as
+  speedscope JSON or collapsed stacks (flamegraph.pl / speedscope input)
+
+The event loop thread is shared, so samples taken on it may include other
+requests served concurrently; spans are always per request. Heuristic
+extraction in process mode runs in another process and is not sampled.
+
+Usage:
+    with span('gemini'):
+        data = await self._extract_with_gemini(html, url, source)
+"""
+
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FORMATS = ('speedscope', 'collapsed')
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+_active_profile: ContextVar[Optional['RequestProfile']] = ContextVar('granter_profile', default=None)
+
+
+class RequestProfile:
+    """Samples and spans recorded for one request."""
+
+    def __init__(self, name: str, reason: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.reason = reason
+        self.created_at = time.time()
+        self.started_at = time.perf_counter()
+        self.duration = 0.0
+
+        # Threads to sample: registered by the middleware and by span entry
+        self.threads: set[int] = set()
+        self.thread_names: dict[int, str] = {}
+        self.frames: list[tuple[str, str, int]] = []
+        self._frame_index: dict[tuple[str, str, int], int] = {}
+        # (offset seconds, thread id, stack as frame indexes root first)
+        self.samples: list[tuple[float, int, tuple[int, ...]]] = []
+        # (name, start offset, end offset, thread id)
+        self.spans: list[tuple[str, float, float, int]] = []
+
+    def add_thread(self, thread_id: int) -> None:
+        if thread_id not in self.threads:
+            self.thread_names[thread_id] = threading.current_thread().name
+            self.threads.add(thread_id)
+
+    def add_sample(self, thread_id: int, frame: Any) -> None:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_qualname, code.co_filename, code.co_firstlineno)
+            index = self._frame_index.get(key)
+            if index is None:
+                index = self._frame_index[key] = len(self.frames)
+                self.frames.append(key)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        self.samples.append((time.perf_counter() - self.started_at, thread_id, tuple(stack)))
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.started_at
+
+    def summary(self) -> dict[str, Any]:
+        """Metadata shown in the profile listing."""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'reason': self.reason,
+            'created_at': self.created_at,
+            'duration_ms': round(self.duration * 1000, 2),
+            'samples': len(self.samples),
+            'spans': [
+                {'name': name, 'start_ms': round(start * 1000, 3), 'duration_ms': round((end - start) * 1000, 3)}
+                for name, start, end, _ in self.spans
+            ],
+        }
+
+    def _frame_label(self, index: int) -> str:
+        qualname, filename, line = self.frames[index]
+        return f"{qualname} ({os.path.basename(filename)}:{line})"
+
+    def to_collapsed(self) -> str:
+        """Render samples as collapsed stacks ("thread;frame;frame count" lines)."""
+        counts: Counter = Counter()
+        for _, thread_id, stack in self.samples:
+            frames = [self.thread_names.get(thread_id, str(thread_id))]
+            frames.extend(self._frame_label(index).replace(';', ':') for index in stack)
+            counts[';'.join(frames)] += 1
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+    def to_speedscope(self) -> dict[str, Any]:
+        """Render samples (one profile per thread) and spans in the speedscope file format."""
+        frames = [
+            {'name': qualname, 'file': filename, 'line': line} for qualname, filename, line in self.frames
+        ]
+        end_ms = self.duration * 1000
+        profiles = []
+
+        for thread_id in sorted(self.threads, key=lambda tid: self.thread_names.get(tid, '')):
+            samples = [(offset, stack) for offset, tid, stack in self.samples if tid == thread_id]
+            if not samples:
+                continue
+            # Each sample stands for the time until the next one
+            offsets = [offset for offset, _ in samples] + [self.duration]
+            profiles.append({
+                'type': 'sampled',
+                'name': f"{self.name} [{self.thread_names.get(thread_id, thread_id)}]",
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': end_ms,
+                'samples': [list(stack) for _, stack in samples],
+                'weights': [
+                    max(0.0, (offsets[i + 1] - offsets[i]) * 1000) for i in range(len(samples))
+                ],
+            })
+
+        span_frames: dict[str, int] = {}
+        for lane_index, lane in enumerate(self._span_lanes()):
+            events = []
+            for name, start, end in lane:
+                index = span_frames.get(name)
+                if index is None:
+                    index = span_frames[name] = len(frames)
+                    frames.append({'name': f"span:{name}"})
+                events.append((start, 'O', index))
+                events.append((end, 'C', index))
+            # Closes sort before opens at the same instant
+            events.sort(key=lambda event: (event[0], event[1] == 'O'))
+            profiles.append({
+                'type': 'evented',
+                'name': f"{self.name} [spans {lane_index + 1}]",
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': end_ms,
+                'events': [{'type': kind, 'frame': index, 'at': at * 1000} for at, kind, index in events],
+            })
+
+        return {
+            '$schema': SPEEDSCOPE_SCHEMA,
+            'name': self.name,
+            'exporter': 'granter-data-service',
+            'shared': {'frames': frames},
+            'profiles': profiles,
+        }
+
+    def _span_lanes(self) -> list[list[tuple[str, float, float]]]:
+        """Split spans into lanes where they nest properly (concurrent spans overlap)."""
+        lanes: list[list[tuple[str, float, float]]] = []
+        stacks: list[list[float]] = []
+        for name, start, end, _ in sorted(self.spans, key=lambda item: (item[1], -item[2])):
+            for lane, stack in zip(lanes, stacks):
+                while stack and stack[-1] <= start:
+                    stack.pop()
+                if not stack or end <= stack[-1]:
+                    lane.append((name, start, end))
+                    stack.append(end)
+                    break
+            else:
+                lanes.append([(name, start, end)])
+                stacks.append([end])
+        return lanes
+
+
+class _Span:
+    __slots__ = ('profile', 'name', 'started')
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.profile.add_thread(threading.get_ident())
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        profile = self.profile
+        profile.spans.append((
+            self.name,
+            self.started - profile.started_at,
+            time.perf_counter() - profile.started_at,
+            threading.get_ident(),
+        ))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """
+    Time a named stage of the current request.
+
+    Returns a no-op context manager unless the request is being profiled.
+    """
+    profile = _active_profile.get()
+    if profile is None:
+        return _NO_SPAN
+    return _Span(profile, name)
+
+
+class _Sampler(threading.Thread):
+    """Background thread sampling the stacks of a profile's threads."""
+
+    def __init__(self, profile: RequestProfile, interval: float):
+        super().__init__(name=f'profiler-{profile.id}', daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.profile.threads):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.profile.add_sample(thread_id, frame)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+class Profiler:
+    """Decides which requests to profile, runs the sampler and keeps recent profiles."""
+
+    DEFAULT_INTERVAL_MS = 2.0
+    DEFAULT_MAX_STORED = 20
+    DEFAULT_MAX_CONCURRENT = 2
+
+    def __init__(
+        self,
+        token: str = '',
+        sample_rate: float = 0.0,
+        interval_ms: float = DEFAULT_INTERVAL_MS,
+        max_stored: int = DEFAULT_MAX_STORED,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            token: Secret for X-Profile-Token (empty disables profiling)
+            sample_rate: Fraction of requests profiled without the header
+            interval_ms: Stack sampling interval
+            max_stored: Profiles kept for download (oldest dropped first)
+            max_concurrent: Requests profiled at the same time (others run unprofiled)
+        """
+        self.token = token
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.interval = max(0.1, interval_ms) / 1000
+        self.max_stored = max(1, max_stored)
+        self.max_concurrent = max(1, max_concurrent)
+
+        self._profiles: OrderedDict[str, RequestProfile] = OrderedDict()
+        self._lock = threading.Lock()
+        self.active = 0
+        self.captured = 0
+        self.skipped = 0
+
+    @classmethod
+    def from_env(cls) -> 'Profiler':
+        """Build a profiler from PROFILING_* settings."""
+        return cls(
+            token=os.getenv('PROFILING_TOKEN', ''),
+            sample_rate=float(os.getenv('PROFILING_SAMPLE_RATE', '0')),
+            interval_ms=float(os.getenv('PROFILING_INTERVAL_MS', str(cls.DEFAULT_INTERVAL_MS))),
+            max_stored=int(os.getenv('PROFILING_MAX_STORED', str(cls.DEFAULT_MAX_STORED))),
+            max_concurrent=int(os.getenv('PROFILING_MAX_CONCURRENT', str(cls.DEFAULT_MAX_CONCURRENT))),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorized(self, token: Optional[str]) -> bool:
+        """Whether the given token grants access to profiling."""
+        return self.enabled and token is not None and hmac.compare_digest(token, self.token)
+
+    def trigger(self, token: Optional[str]) -> Optional[str]:
+        """
+        Decide whether to profile a request.
+
+        Args:
+            token: Value of the X-Profile-Token header, if any
+
+        Returns:
+            'header' or 'sampled' if the request should be profiled, else None
+        """
+        if not self.enabled:
+            return None
+        if token is not None:
+            if self.authorized(token):
+                return 'header'
+            logger.warning("✗ Rejected X-Profile-Token - request not profiled")
+            return None
+        if self.sample_rate and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def start(self, name: str, reason: str) -> Optional[tuple[RequestProfile, _Sampler, Any]]:
+        """
+        Start profiling the current request (thread and context).
+
+        Returns:
+            Handle for stop(), or None if max_concurrent profiles are running
+        """
+        with self._lock:
+            if self.active >= self.max_concurrent:
+                self.skipped += 1
+                return None
+            self.active += 1
+
+        profile = RequestProfile(name, reason)
+        profile.add_thread(threading.get_ident())
+        context_token = _active_profile.set(profile)
+        sampler = _Sampler(profile, self.interval)
+        sampler.start()
+        return profile, sampler, context_token
+
+    def stop(self, handle: tuple[RequestProfile, _Sampler, Any]) -> RequestProfile:
+        """Stop sampling and keep the profile for download."""
+        profile, sampler, context_token = handle
+        sampler.stop()
+        _active_profile.reset(context_token)
+        profile.finish()
+
+        with self._lock:
+            self.active -= 1
+            self.captured += 1
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_stored:
+                self._profiles.popitem(last=False)
+
+        logger.info(
+            f"⏱ Profiled {profile.name} ({profile.reason}): {profile.duration * 1000:.1f}ms, "
+            f"{len(profile.samples)} samples - profile {profile.id}"
+        )
+        return profile
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+    def list(self) -> list[dict[str, Any]]:
+        """Summaries of stored profiles, newest first."""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        return [profile.summary() for profile in reversed(profiles)]
+
+    def stats(self) -> dict[str, Any]:
+        """Return profiling counters."""
+        return {
+            'enabled': self.enabled,
+            'sample_rate': self.sample_rate,
+            'interval_ms': self.interval * 1000,
+            'active': self.active,
+            'captured': self.captured,
+            'skipped': self.skipped,
+            'stored': len(self._profiles),
+        }
+
+
+# Singleton profiler
+profiler = Profiler.from_env()
@@ -0,0 +1,293 @@
+"""
+Multi-document prompt packing for Gemini extraction
+
+Short grant pages spend most of their Gemini latency and quota on per-call
+overhead. The packer collects extraction requests that arrive within a few
+milliseconds of each other (concurrent single requests or the items of a
+batch), sends their distilled content in one prompt and demultiplexes the JSON
+array answer back to each caller:
+
+1. Requests are queued until the window elapses, GEMINI_PACK_MAX_DOCS documents
+   are waiting, or the next document would exceed GEMINI_PACK_MAX_TOKENS
+2. The pack is sent as a single generate_content call; every document carries
+   an id ("d0", "d1", ...) that the model must echo in its answer
+3. Documents missing from the answer (or a malformed answer as a whole) are
+   retried one by one with the regular single-document prompt
+4. A failed packed call (timeout, provider error) is raised as is to one
+   caller and as SharedPackFailure to the others, so it counts once
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+
+from services.content_distiller import DistilledContent, distill, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Generates text for a prompt (rate limiting and timeout included)
+GenerateFn = Callable[[str], Awaitable[str]]
+# Parses one extracted JSON object into a result for the caller
+ParseFn = Callable[[dict[str, Any], str, str], Any]
+# Single-document extraction used as fallback
+ExtractFn = Callable[[str, str, str], Awaitable[Any]]
+
+
+class SharedPackFailure(Exception):
+    """The packed call of this document failed; another caller of the pack got the original error."""
+
+    def __init__(self, error: BaseException):
+        super().__init__(str(error) or type(error).__name__)
+        self.error = error
+
+
+@dataclass
+class _PackedDocument:
+    html: str
+    url: str
+    source: str
+    content: DistilledContent
+    tokens: int
+    future: asyncio.Future
+
+
+def build_packed_prompt(documents: list[tuple[str, DistilledContent]]) -> str:
+    """
+    Build one extraction prompt for several distilled documents.
+
+    Args:
+        documents: (document id, distilled content) pairs
+
+    Returns:
+        Prompt asking for a JSON array with one object per document id
+    """
+    sections = []
+    for doc_id, content in documents:
+        sections.append(
+            f"=== Document {doc_id} ===\n"
+            f"Page title: {content.title or 'unknown'}\n"
+            f"Content:\n{content.text}"
+        )
+    joined = '\n\n'.join(sections)
+
+    return f"""
+        Extract grant information from each of the following {len(documents)} documents.
+        Return a JSON array with exactly one object per document, each with:
+        - id: The document id exactly as given (e.g. "d0")
+        - title: Grant name/title
+        - description: Grant description
+        - amount: Grant amount in EUR (number only, or null)
+        - deadline: Application deadline (ISO 8601 date or null)
+
+{joined}
+
+        Return ONLY a valid JSON array, no markdown, no extra text.
+        """
+
+
+def parse_packed_response(text: str) -> dict[str, dict[str, Any]]:
+    """
+    Split a packed Gemini answer into per-document objects.
+
+    Args:
+        text: Raw response text
+
+    Returns:
+        Extracted objects keyed by document id (entries without an id are dropped)
+
+    Raises:
+        ValueError: If the response is not a JSON array of objects
+    """
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON from Gemini: {str(e)}")
+
+    if isinstance(parsed, dict) and isinstance(parsed.get('documents'), list):
+        parsed = parsed['documents']
+    if not isinstance(parsed, list):
+        raise ValueError(f"Packed Gemini response is a {type(parsed).__name__}, expected an array")
+
+    results: dict[str, dict[str, Any]] = {}
+    for item in parsed:
+        if isinstance(item, dict) and item.get('id') is not None:
+            results.setdefault(str(item['id']), item)
+    return results
+
+
+class PromptPacker:
+    """Micro-batcher that packs concurrent extraction requests into one Gemini call."""
+
+    DEFAULT_WINDOW_MS = 20
+    DEFAULT_MAX_DOCS = 8
+    DEFAULT_MAX_TOKENS = 6000
+
+    def __init__(
+        self,
+        generate: GenerateFn,
+        parse: ParseFn,
+        extract_single: ExtractFn,
+        window_ms: int = DEFAULT_WINDOW_MS,
+        max_docs: int = DEFAULT_MAX_DOCS,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        doc_token_budget: int = 1500,
+    ):
+        """
+        Initialize the packer.
+
+        Args:
+            generate: Sends a prompt to Gemini and returns the response text
+            parse: Turns one extracted object (plus url, source) into a result
+            extract_single: Regular single-document extraction (fallback path)
+            window_ms: How long the first queued request waits for companions
+            max_docs: Most documents per packed prompt
+            max_tokens: Token budget for the documents of one prompt
+            doc_token_budget: Distillation budget per document
+        """
+        self._generate = generate
+        self._parse = parse
+        self._extract_single = extract_single
+        self.window_ms = max(0, window_ms)
+        self.max_docs = max(1, max_docs)
+        self.max_tokens = max_tokens
+        self.doc_token_budget = doc_token_budget
+
+        self._pending: list[_PackedDocument] = []
+        self._pending_tokens = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.packs_sent = 0
+        self.documents_packed = 0
+        self.single_calls = 0
+        self.fallbacks = 0
+        self.malformed_responses = 0
+
+    async def extract(self, html: str, url: str, source: str) -> Any:
+        """
+        Queue a document for the next packed prompt and wait for its result.
+
+        Args:
+            html: HTML content
+            url: Source URL
+            source: Source name
+
+        Returns:
+            The parsed result for this document
+
+        Raises:
+            Whatever the packed call (or the single-document fallback) raised:
+            asyncio.TimeoutError, RateLimitExceeded, ValueError, ... A failed
+            packed call is raised to one caller only; the others of the pack get
+            SharedPackFailure wrapping it
+        """
+        # Distillation parses the whole page: keep it off the event loop
+        content = await asyncio.to_thread(distill, html, max_tokens=self.doc_token_budget)
+        tokens = estimate_tokens(content.text)
+        loop = asyncio.get_running_loop()
+        document = _PackedDocument(html, url, source, content, tokens, loop.create_future())
+
+        if self._pending and self._pending_tokens + tokens > self.max_tokens:
+            self._flush()
+        self._pending.append(document)
+        self._pending_tokens += tokens
+
+        if len(self._pending) >= self.max_docs:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await document.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        documents, self._pending, self._pending_tokens = self._pending, [], 0
+        task = asyncio.get_running_loop().create_task(self._send(documents))
+        # Keep a reference until the pack is answered
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, documents: list[_PackedDocument]) -> None:
+        if len(documents) == 1 or any(not document.content.text for document in documents):
+            # Nothing to share a prompt with (or raw-HTML documents): regular calls
+            await asyncio.gather(*(self._send_single(document) for document in documents))
+            return
+
+        ids = [f"d{index}" for index in range(len(documents))]
+        prompt = build_packed_prompt(
+            [(doc_id, document.content) for doc_id, document in zip(ids, documents)]
+        )
+        self.packs_sent += 1
+        self.documents_packed += len(documents)
+        logger.debug(f"Sending packed Gemini prompt with {len(documents)} documents")
+
+        try:
+            answers = parse_packed_response(await self._generate(prompt))
+        except ValueError as e:
+            self.malformed_responses += 1
+            logger.warning(f"✗ Malformed packed Gemini response: {str(e)} - retrying per document")
+            answers = {}
+        except Exception as e:
+            # Timeouts, rate limits and provider errors apply to every document,
+            # but only one caller reports the failed call (e.g. to the circuit breaker)
+            reported = False
+            for document in documents:
+                if not document.future.done():
+                    document.future.set_exception(e if not reported else SharedPackFailure(e))
+                    reported = True
+            return
+
+        retries = []
+        for doc_id, document in zip(ids, documents):
+            answer = answers.get(doc_id)
+            if answer is None:
+                retries.append(document)
+                continue
+            try:
+                self._resolve(document, self._parse(answer, document.url, document.source))
+            except ValueError:
+                retries.append(document)
+
+        if retries:
+            self.fallbacks += len(retries)
+            logger.info(f"Retrying {len(retries)}/{len(documents)} packed documents one by one")
+            await asyncio.gather(*(self._send_single(document) for document in retries))
+
+    async def _send_single(self, document: _PackedDocument) -> None:
+        self.single_calls += 1
+        try:
+            result = await self._extract_single(document.html, document.url, document.source)
+        except Exception as e:
+            if not document.future.done():
+                document.future.set_exception(e)
+            return
+        self._resolve(document, result)
+
+    @staticmethod
+    def _resolve(document: _PackedDocument, result: Any) -> None:
+        if not document.future.done():
+            document.future.set_result(result)
+
+    def stats(self) -> dict[str, Any]:
+        """Return packing counters."""
+        return {
+            'window_ms': self.window_ms,
+            'max_docs': self.max_docs,
+            'max_tokens': self.max_tokens,
+            'pending': len(self._pending),
+            'packs_sent': self.packs_sent,
+            'documents_packed': self.documents_packed,
+            'avg_documents_per_pack': (
+                round(self.documents_packed / self.packs_sent, 2) if self.packs_sent else 0.0
+            ),
+            'single_calls': self.single_calls,
+            'fallbacks': self.fallbacks,
+            'malformed_responses': self.malformed_responses,
+        }
@@ -0,0 +1,219 @@
+"""
+Client-side Rate Limiting for external providers
+
+Token buckets shared by every caller of a provider (Gemini, DuckDuckGo), so
+bursts are smoothed out before they hit provider quotas. Waiting a little is
+cheaper than the quota errors and retries that follow an overrun.
+
+Buckets are named per provider and API key. A bucket with burst=1 behaves as a
+leaky bucket (strictly paced requests).
+
+Configuration per provider (upper-case name, e.g. GEMINI, DDGS):
+- RATE_LIMIT_<PROVIDER>_PER_SECOND: Sustained rate (<= 0 disables limiting)
+- RATE_LIMIT_<PROVIDER>_BURST: Bucket capacity
+- RATE_LIMIT_<PROVIDER>_MAX_WAIT_SECONDS: Longest acceptable wait
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait longer than allowed."""
+
+    pass
+
+
+@dataclass
+class RateLimitConfig:
+    """Rate limit settings for one provider."""
+
+    rate_per_second: float
+    burst: int
+    max_wait_seconds: float
+
+
+DEFAULT_CONFIGS = {
+    # Gemini free tier: 60 requests/minute
+    'gemini': RateLimitConfig(rate_per_second=1.0, burst=5, max_wait_seconds=5.0),
+    # DuckDuckGo throttles aggressive clients quickly
+    'ddgs': RateLimitConfig(rate_per_second=0.5, burst=2, max_wait_seconds=30.0),
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket with reservations.
+
+    Callers reserve tokens immediately (the balance may go negative) and then
+    sleep until their reservation is covered, so waiters are served in order.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate_per_second: float,
+        burst: int,
+        max_wait_seconds: float,
+    ):
+        """
+        Initialize the bucket (full).
+
+        Args:
+            name: Bucket name (provider[:key fingerprint])
+            rate_per_second: Tokens added per second (<= 0 disables limiting)
+            burst: Bucket capacity
+            max_wait_seconds: Default longest acceptable wait
+        """
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = max(1, burst)
+        self.max_wait_seconds = max_wait_seconds
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.throttled_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate_per_second > 0
+
+    def _reserve(self, tokens: float, max_wait: Optional[float]) -> float:
+        """Reserve tokens and return how long the caller must wait."""
+        if not self.enabled:
+            self.acquired += 1
+            return 0.0
+
+        limit = self.max_wait_seconds if max_wait is None else max_wait
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated_at
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate_per_second)
+            self._updated_at = now
+
+            wait = max(0.0, (tokens - self._tokens) / self.rate_per_second)
+            if wait > limit:
+                self.rejected += 1
+                raise RateLimitExceeded(
+                    f"Rate limit '{self.name}' exceeded: wait of {wait:.2f}s > {limit:.2f}s"
+                )
+
+            self._tokens -= tokens
+            self.acquired += 1
+            if wait > 0:
+                self.throttled += 1
+                self.throttled_seconds += wait
+            return wait
+
+    async def acquire(self, tokens: float = 1, max_wait: Optional[float] = None) -> float:
+        """
+        Wait (asynchronously) until tokens are available.
+
+        Args:
+            tokens: Tokens to consume
+            max_wait: Longest acceptable wait (default: bucket's max_wait_seconds)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitExceeded: If the wait would exceed max_wait
+        """
+        wait = self._reserve(tokens, max_wait)
+        if wait > 0:
+            logger.debug(f"Rate limit '{self.name}': waiting {wait:.2f}s")
+            await asyncio.sleep(wait)
+        return wait
+
+    def stats(self) -> dict[str, Any]:
+        """Return throttling counters."""
+        return {
+            'rate_per_second': self.rate_per_second,
+            'burst': self.burst,
+            'max_wait_seconds': self.max_wait_seconds,
+            'acquired': self.acquired,
+            'throttled': self.throttled,
+            'rejected': self.rejected,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+        }
+
+
+def load_config(provider: str) -> RateLimitConfig:
+    """Read a provider's rate limit settings from the environment."""
+    default = DEFAULT_CONFIGS.get(provider, RateLimitConfig(1.0, 1, 10.0))
+    prefix = f"RATE_LIMIT_{provider.upper()}"
+    return RateLimitConfig(
+        rate_per_second=float(os.getenv(f"{prefix}_PER_SECOND", str(default.rate_per_second))),
+        burst=int(os.getenv(f"{prefix}_BURST", str(default.burst))),
+        max_wait_seconds=float(
+            os.getenv(f"{prefix}_MAX_WAIT_SECONDS", str(default.max_wait_seconds))
+        ),
+    )
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short, non-reversible identifier for an API key (safe to expose in stats)."""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:8]
+
+
+class RateLimiterRegistry:
+    """Process-wide registry of named token buckets."""
+
+    def __init__(self):
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, provider: str, api_key: Optional[str] = None) -> TokenBucket:
+        """
+        Get (or create) the bucket for a provider and API key.
+
+        Args:
+            provider: Provider name ('gemini', 'ddgs', ...)
+            api_key: API key the calls are made with (each key has its own quota)
+
+        Returns:
+            Shared TokenBucket
+        """
+        name = f"{provider}:{key_fingerprint(api_key)}" if api_key else provider
+        bucket = self._buckets.get(name)
+        if bucket is not None:
+            return bucket
+
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                config = load_config(provider)
+                bucket = TokenBucket(
+                    name=name,
+                    rate_per_second=config.rate_per_second,
+                    burst=config.burst,
+                    max_wait_seconds=config.max_wait_seconds,
+                )
+                self._buckets[name] = bucket
+            return bucket
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return counters of every bucket, keyed by bucket name."""
+        return {name: bucket.stats() for name, bucket in self._buckets.items()}
+
+    def reset(self) -> None:
+        """Drop every bucket (configuration is re-read on next use)."""
+        with self._lock:
+            self._buckets.clear()
+
+
+# Singleton registry
+rate_limiters = RateLimiterRegistry()
@@ -0,0 +1,208 @@
+"""
+Result Cache with LRU eviction and optional SQLite persistence
+
+Two-tier cache for JSON-serializable results:
+- Memory tier: bounded LRU (OrderedDict), checked first
+- Disk tier: optional SQLite table that survives restarts
+
+Every entry has a TTL. Expired entries are treated as misses and dropped lazily.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """Bounded in-memory LRU cache with TTL and an optional SQLite tier."""
+
+    def __init__(
+        self,
+        namespace: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 86400,
+        db_path: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            namespace: Logical cache name (several caches can share one database)
+            max_entries: Max entries kept in memory before LRU eviction
+            ttl_seconds: Time to live for every entry
+            db_path: SQLite file for the persistent tier (None disables it)
+        """
+        self.namespace = namespace
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if db_path:
+            self._db = self._open_db(db_path)
+
+    def _open_db(self, db_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entries ('
+                ' namespace TEXT NOT NULL,'
+                ' key TEXT NOT NULL,'
+                ' value TEXT NOT NULL,'
+                ' expires_at REAL NOT NULL,'
+                ' PRIMARY KEY (namespace, key))'
+            )
+            logger.info(f"Cache '{self.namespace}' persistent tier at {db_path}")
+            return db
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to open cache database {db_path}: {str(e)} - using memory only")
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key in memory, then on disk.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None on miss or expiry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+            row = self._get_from_db(key, now)
+            if row is not None:
+                value, expires_at = row
+                self._store_in_memory(key, value, expires_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_in_memory(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at)'
+                        ' VALUES (?, ?, ?, ?)',
+                        (self.namespace, key, json.dumps(value), expires_at),
+                    )
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist cache entry: {str(e)}")
+
+    def clear(self) -> None:
+        """Remove every entry of this namespace from both tiers."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM cache_entries WHERE namespace = ?', (self.namespace,))
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'namespace': self.namespace,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'persistent': self._db is not None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the persistent tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _store_in_memory(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _get_from_db(self, key: str, now: float) -> Optional[tuple[Any, float]]:
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                'SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?',
+                (self.namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self._db.execute(
+                    'DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+                    (self.namespace, key),
+                )
+                self.expirations += 1
+                return None
+            return json.loads(row[0]), row[1]
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Failed to read cache entry: {str(e)}")
+            return None
+
+
+def content_hash(*parts: str) -> str:
+    """
+    Build a stable SHA-256 key from several strings.
+
+    Args:
+        *parts: Strings to hash (order matters)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8', errors='surrogatepass'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
@@ -0,0 +1,184 @@
+"""
+Search Result Cache for discovery queries
+
+build_queries produces the same query strings on every run for a given scope
+and province list, so scheduled discovery runs kept re-asking DuckDuckGo the
+same questions (slow, and the reason we get throttled). SearchCache keeps the
+results of each (query, max_results) in a ResultCache (memory LRU plus
+optional SQLite tier):
+
+- Fresh entries (younger than the TTL) are served without searching
+- Stale entries (past the TTL, within the stale window) are served at once
+  and refreshed in the background (stale-while-revalidate); concurrent
+  refreshes of one query are collapsed into one search
+- Older entries are misses
+- Only complete searches are stored (discovery does not cache throttled or
+  failed ones), and never empty results; a failed refresh keeps the stale entry
+
+Configuration:
+- DISCOVERY_SEARCH_CACHE_ENABLED: Set to false to always search (default: true)
+- DISCOVERY_SEARCH_CACHE_TTL_SECONDS: Freshness lifetime (default: 21600)
+- DISCOVERY_SEARCH_CACHE_STALE_SECONDS: Extra time a stale entry may still be
+  served while it is refreshed (default: 86400)
+- DISCOVERY_SEARCH_CACHE_MAX_ENTRIES: In-memory LRU size (default: 512)
+- DISCOVERY_SEARCH_CACHE_DB_PATH: Optional SQLite file for the persistent tier
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from services.result_cache import ResultCache, content_hash
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """TTL'd search results with stale-while-revalidate."""
+
+    DEFAULT_TTL_SECONDS = 21600
+    DEFAULT_STALE_SECONDS = 86400
+    DEFAULT_MAX_ENTRIES = 512
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        stale_seconds: float = DEFAULT_STALE_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        db_path: Optional[str] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: Age up to which results are served without searching
+            stale_seconds: Additional age up to which results are served while
+                being refreshed in the background
+            max_entries: Max queries kept in memory
+            db_path: SQLite file for the persistent tier (None disables it)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = max(0.0, stale_seconds)
+        # The underlying entries live for the whole stale window; freshness is
+        # decided here from the stored timestamp
+        self._cache = ResultCache(
+            namespace='discovery_search',
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds + self.stale_seconds,
+            db_path=db_path,
+        )
+        self._refreshing: dict[str, asyncio.Task] = {}
+
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+
+    @classmethod
+    def from_env(cls) -> Optional['SearchCache']:
+        """Create the cache from environment settings (None when disabled)."""
+        if os.getenv('DISCOVERY_SEARCH_CACHE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+            logger.info("Discovery search cache disabled")
+            return None
+
+        return cls(
+            ttl_seconds=float(os.getenv('DISCOVERY_SEARCH_CACHE_TTL_SECONDS', str(cls.DEFAULT_TTL_SECONDS))),
+            stale_seconds=float(
+                os.getenv('DISCOVERY_SEARCH_CACHE_STALE_SECONDS', str(cls.DEFAULT_STALE_SECONDS))
+            ),
+            max_entries=int(os.getenv('DISCOVERY_SEARCH_CACHE_MAX_ENTRIES', str(cls.DEFAULT_MAX_ENTRIES))),
+            db_path=os.getenv('DISCOVERY_SEARCH_CACHE_DB_PATH') or None,
+        )
+
+    @staticmethod
+    def key(query: str, max_results: int) -> str:
+        return content_hash(query, str(max_results))
+
+    def get(self, query: str, max_results: int) -> tuple[Optional[list[dict]], bool]:
+        """
+        Look up the results of a query.
+
+        Args:
+            query: Search query
+            max_results: Result count the query was run with
+
+        Returns:
+            (results, stale): results is None on miss; stale is True when the
+            entry is past its TTL and should be refreshed
+        """
+        entry = self._cache.get(self.key(query, max_results))
+        if entry is None:
+            self.misses += 1
+            return None, False
+
+        if time.time() - entry['stored_at'] <= self.ttl_seconds:
+            self.fresh_hits += 1
+            return entry['results'], False
+        self.stale_hits += 1
+        return entry['results'], True
+
+    def set(self, query: str, max_results: int, results: list[dict]) -> None:
+        """
+        Store the results of a query (empty results are ignored).
+
+        Args:
+            query: Search query
+            max_results: Result count the query was run with
+            results: JSON-serializable results
+        """
+        if not results:
+            return
+        self._cache.set(self.key(query, max_results), {'stored_at': time.time(), 'results': results})
+
+    def revalidate(
+        self,
+        query: str,
+        max_results: int,
+        search: Callable[[], Awaitable[list[dict]]],
+    ) -> None:
+        """
+        Refresh a stale entry in the background (at most one refresh per key).
+
+        Args:
+            query: Search query
+            max_results: Result count the query was run with
+            search: Coroutine function running the live search
+        """
+        key = self.key(query, max_results)
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                self.set(query, max_results, await search())
+                self.refreshes += 1
+            except Exception as e:
+                self.refresh_failures += 1
+                logger.warning(f"✗ Search cache refresh failed for '{query}': {str(e)}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def clear(self) -> None:
+        """Remove every cached query from both tiers."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return freshness counters plus the underlying cache counters."""
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'stale_seconds': self.stale_seconds,
+            'fresh_hits': self.fresh_hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'hit_ratio': round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'refreshing': len(self._refreshing),
+            'store': self._cache.stats(),
+        }
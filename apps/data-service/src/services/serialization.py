@@ -0,0 +1,64 @@
+"""
+Fast JSON serialization for hot responses
+
+By default FastAPI validates every returned object against the endpoint's
+response_model and then serializes it. For objects the service built itself
+(extraction results, discovered sources) the validation is pure overhead.
+
+With FAST_JSON_RESPONSES enabled, hot endpoints return FastJSONResponse, which
+skips response validation and writes the bytes with encoders compiled once at
+import time:
+
+- pydantic models: the core serializer pydantic compiles for each model class
+  (ExtractionResponse/GrantData, DiscoveryResponse/DiscoveredSource, ...)
+- plain dicts/lists: orjson when installed (`pip install .[orjson]`), stdlib
+  json otherwise
+"""
+
+import json
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def fast_json_enabled() -> bool:
+    """Whether hot endpoints should use the fast serialization path (FAST_JSON_RESPONSES)."""
+    return os.getenv('FAST_JSON_RESPONSES', 'false').lower() in ('1', 'true', 'yes')
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode='json')
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    """
+    Serialize a response body to JSON bytes without validation.
+
+    Args:
+        content: A pydantic model, or JSON-compatible dicts/lists (which may
+            contain models)
+
+    Returns:
+        UTF-8 JSON bytes
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the pre-compiled encoders (no re-validation)."""
+
+    def render(self, content: Any) -> bytes:
+        return dump_json(content)
@@ -0,0 +1,124 @@
+"""
+URL canonicalization for discovered sources
+
+Search results point at the same portal in many spellings: http and https,
+with and without www., upper-case hosts, explicit default ports, index pages,
+tracking parameters, Unicode or punycode hosts. Discovery used to treat each
+spelling as a new source, validating it and posting it to the backend again.
+
+- canonicalize_url: one spelling per URL (the source baseUrl)
+    - scheme and host lower-cased, host IDNA-encoded (punycode), trailing dot
+      removed
+    - default ports (http:80, https:443), user info and fragment dropped
+    - empty and dot path segments resolved, percent-escapes upper-cased,
+      index pages (index.html, default.aspx, ...) and trailing slash dropped
+    - query dropped; with keep_query, tracking parameters (utm_*, gclid,
+      fbclid, ...) are dropped and the rest sorted
+- url_key: identity of a URL for de-duplication, ignoring the scheme and a
+  leading www. ('madrid.gob.es/ayudas')
+"""
+
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+INDEX_PAGES = frozenset({
+    'index.html', 'index.htm', 'index.php', 'index.asp', 'index.aspx', 'index.jsp',
+    'default.htm', 'default.html', 'default.asp', 'default.aspx',
+})
+
+TRACKING_PARAMS = frozenset({
+    'gclid', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid', 'yclid', 'twclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl', '_hsenc', '_hsmi', 'ref_src',
+})
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_')
+
+_PERCENT_ESCAPE = re.compile(r'%[0-9a-fA-F]{2}')
+
+
+def _canonical_host(host: str) -> str:
+    host = host.rstrip('.')
+    if ':' in host:
+        # IPv6 literal
+        return f'[{host}]'
+    try:
+        return host.encode('idna').decode('ascii')
+    except UnicodeError:
+        return host
+
+
+def _canonical_path(path: str) -> str:
+    segments: list[str] = []
+    for segment in path.split('/'):
+        if segment in ('', '.'):
+            continue
+        if segment == '..':
+            if segments:
+                segments.pop()
+            continue
+        segments.append(segment)
+    if segments and segments[-1].lower() in INDEX_PAGES:
+        segments.pop()
+    return _PERCENT_ESCAPE.sub(lambda match: match.group(0).upper(), ''.join(f'/{s}' for s in segments))
+
+
+def _canonical_query(query: str) -> str:
+    params = [
+        (name, value)
+        for name, value in parse_qsl(query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlencode(sorted(params))
+
+
+def canonicalize_url(raw_url: str, keep_query: bool = False) -> Optional[str]:
+    """
+    Build the canonical spelling of a URL.
+
+    Args:
+        raw_url: URL as found (search result, backend record, ...)
+        keep_query: Keep the non-tracking query parameters (sorted)
+
+    Returns:
+        Canonical URL, or None if raw_url has no scheme or host
+    """
+    try:
+        parsed = urlsplit(raw_url.strip())
+        host = parsed.hostname
+        port = parsed.port
+    except (AttributeError, ValueError):
+        return None
+
+    scheme = parsed.scheme.lower()
+    if not scheme or not host:
+        return None
+
+    netloc = _canonical_host(host)
+    if port is not None and port != DEFAULT_PORTS.get(scheme):
+        netloc = f'{netloc}:{port}'
+
+    url = f'{scheme}://{netloc}{_canonical_path(parsed.path)}'
+    if keep_query and parsed.query:
+        query = _canonical_query(parsed.query)
+        if query:
+            url = f'{url}?{query}'
+    return url
+
+
+def url_key(raw_url: str) -> Optional[str]:
+    """
+    Identity of a URL for de-duplication: http/https and www. variants share it.
+
+    Args:
+        raw_url: URL as found
+
+    Returns:
+        Canonical URL without scheme and leading www., or None if invalid
+    """
+    canonical = canonicalize_url(raw_url)
+    if canonical is None:
+        return None
+    key = canonical.split('://', 1)[1]
+    return key[4:] if key.startswith('www.') else key
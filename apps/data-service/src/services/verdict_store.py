@@ -0,0 +1,132 @@
+"""
+Validation Verdict Store for discovery
+
+Whether a portal is an official grant portal almost never changes, but
+validate_candidate asked Gemini again every time a URL came up in a discovery
+run. VerdictStore keeps Gemini's verdict (confidence, description,
+organization, region) per normalized URL in a ResultCache (memory LRU plus
+optional SQLite tier) so later runs reuse it.
+
+Every verdict is stored with the version of the model and validation prompt
+that produced it. Verdicts of another version are treated as misses and
+replaced, so changing the model or bumping the prompt version invalidates
+the store without a migration.
+
+Only verdicts parsed from a Gemini answer are stored; heuristic fallbacks
+(Gemini unavailable, throttled or failing) are not.
+
+Configuration:
+- DISCOVERY_VERDICT_STORE_ENABLED: Set to false to always ask Gemini (default: true)
+- DISCOVERY_VERDICT_TTL_SECONDS: Verdict lifetime (default: 2592000, 30 days)
+- DISCOVERY_VERDICT_MAX_ENTRIES: In-memory LRU size (default: 4096)
+- DISCOVERY_VERDICT_DB_PATH: Optional SQLite file for the persistent tier
+"""
+
+import logging
+import os
+from typing import Any, Optional
+
+from services.result_cache import ResultCache, content_hash
+
+logger = logging.getLogger(__name__)
+
+VERDICT_FIELDS = ('description', 'organization', 'region')
+
+
+class VerdictStore:
+    """Gemini validation verdicts per normalized URL, tagged with a version."""
+
+    DEFAULT_TTL_SECONDS = 2592000
+    DEFAULT_MAX_ENTRIES = 4096
+
+    def __init__(
+        self,
+        version: str,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        db_path: Optional[str] = None,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            version: Model and prompt version of the verdicts this process produces
+            ttl_seconds: Verdict lifetime
+            max_entries: Max verdicts kept in memory
+            db_path: SQLite file for the persistent tier (None disables it)
+        """
+        self.version = version
+        self._cache = ResultCache(
+            namespace='discovery_verdicts',
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            db_path=db_path,
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.outdated = 0
+
+    @classmethod
+    def from_env(cls, version: str) -> Optional['VerdictStore']:
+        """Create the store from environment settings (None when disabled)."""
+        if os.getenv('DISCOVERY_VERDICT_STORE_ENABLED', 'true').lower() in ('0', 'false', 'no'):
+            logger.info("Discovery verdict store disabled")
+            return None
+
+        return cls(
+            version=version,
+            ttl_seconds=float(os.getenv('DISCOVERY_VERDICT_TTL_SECONDS', str(cls.DEFAULT_TTL_SECONDS))),
+            max_entries=int(os.getenv('DISCOVERY_VERDICT_MAX_ENTRIES', str(cls.DEFAULT_MAX_ENTRIES))),
+            db_path=os.getenv('DISCOVERY_VERDICT_DB_PATH') or None,
+        )
+
+    def get(self, url: str) -> Optional[tuple[float, dict]]:
+        """
+        Look up the verdict for a URL.
+
+        Args:
+            url: Normalized URL (normalize_url output)
+
+        Returns:
+            (confidence, metadata), or None on miss or version mismatch
+        """
+        entry = self._cache.get(content_hash(url))
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry['version'] != self.version:
+            self.outdated += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry['confidence'], dict(entry['meta'])
+
+    def set(self, url: str, confidence: float, meta: dict) -> None:
+        """
+        Store the verdict for a URL.
+
+        Args:
+            url: Normalized URL (normalize_url output)
+            confidence: Validated confidence
+            meta: Parsed Gemini answer (only description, organization and region are kept)
+        """
+        kept = {field: meta[field] for field in VERDICT_FIELDS if field in meta}
+        self._cache.set(content_hash(url), {'version': self.version, 'confidence': confidence, 'meta': kept})
+
+    def clear(self) -> None:
+        """Remove every verdict from both tiers."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counters plus the underlying cache counters."""
+        lookups = self.hits + self.misses
+        return {
+            'version': self.version,
+            'hits': self.hits,
+            'misses': self.misses,
+            'outdated': self.outdated,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            'store': self._cache.stats(),
+        }
@@ -10,6 +10,26 @@ sys.path.insert(0, str(SERVICE_ROOT / 'src'))
 from main import app
 
 
+@pytest.fixture(autouse=True)
+def no_discovery_stores(monkeypatch):
+    """Keep stubbed searches and verdicts out of the shared discovery stores."""
+    from services import discovery_service
+
+    monkeypatch.setattr(discovery_service, 'search_cache', None)
+    monkeypatch.setattr(discovery_service, 'verdict_store', None)
+    monkeypatch.setattr(discovery_service, 'known_urls', None)
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_searches(monkeypatch):
+    """Let stubbed searches skip the DuckDuckGo rate limit (fresh buckets per test)."""
+    from services import discovery_service
+    from services.rate_limiter import RateLimiterRegistry
+
+    monkeypatch.setenv('RATE_LIMIT_DDGS_PER_SECOND', '0')
+    monkeypatch.setattr(discovery_service, 'rate_limiters', RateLimiterRegistry())
+
+
 @pytest.fixture
 def client() -> TestClient:
     return TestClient(app)
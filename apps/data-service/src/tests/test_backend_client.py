@@ -0,0 +1,119 @@
+"""Tests for the pooled backend client."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from models import DiscoveredSource
+from services.backend_client import BackendClient
+
+
+def _source(index: int) -> DiscoveredSource:
+    return DiscoveredSource(name=f'Portal {index}', baseUrl=f'https://sede{index}.gob.es')
+
+
+def _client(handler, **kwargs) -> BackendClient:
+    return BackendClient(service_token='token', transport=httpx.MockTransport(handler), **kwargs)
+
+
+class TestCreateSource:
+    """Test the outcome reported for one source."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('status_code,outcome', [
+        (201, 'created'), (200, 'created'), (409, 'exists'), (400, 'failed'),
+    ])
+    async def test_status_codes(self, status_code, outcome):
+        """Test that backend answers map to outcomes."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(status_code, text='detail')
+
+        result = await _client(handler).create_source(_source(1))
+
+        assert result.status == outcome
+        assert result.status_code == status_code
+        assert requests[0].url.path == '/sources/service'
+        assert requests[0].headers['x-service-token'] == 'token'
+        assert json.loads(requests[0].content)['baseUrl'] == 'https://sede1.gob.es'
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_a_failure(self):
+        """Test that a timed-out POST is reported instead of raised."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadTimeout('slow', request=request)
+
+        result = await _client(handler).create_source(_source(1))
+
+        assert (result.status, result.error) == ('failed', 'timeout')
+
+    @pytest.mark.asyncio
+    async def test_unconfigured_backend_is_skipped(self):
+        """Test that nothing is sent without a service token."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise AssertionError('no request expected')
+
+        client = BackendClient(service_token='', transport=httpx.MockTransport(handler))
+
+        assert (await client.upsert_sources([_source(1)]))[0].status == 'skipped'
+
+
+class TestUpsertSources:
+    """Test concurrent bulk creation."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded_and_outcomes_ordered(self):
+        """Test that at most upsert_concurrency POSTs are in flight and outcomes keep order."""
+        active = 0
+        peak = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            index = int(json.loads(request.content)['name'].split()[-1])
+            return httpx.Response(409 if index % 5 == 0 else 201)
+
+        client = _client(handler, upsert_concurrency=3)
+        results = await client.upsert_sources([_source(index) for index in range(12)])
+
+        assert peak == 3
+        assert [result.baseUrl for result in results] == [f'https://sede{index}.gob.es' for index in range(12)]
+        assert [result.status for result in results].count('exists') == 3
+        assert client.stats()['created'] == 9
+        await client.close()
+
+    @pytest.mark.asyncio
+    async def test_pool_is_reused(self):
+        """Test that every call goes through the one pooled client."""
+        client = _client(lambda request: httpx.Response(201))
+        await client.start()
+        pooled = client.client
+
+        await client.upsert_sources([_source(1), _source(2)])
+
+        assert client.client is pooled
+        await client.close()
+        assert client._client is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_source_urls():
+    """Test that backend source records are reduced to their URLs."""
+    records = [
+        {'id': '1', 'url': 'https://madrid.gob.es'},
+        {'id': '2', 'baseUrl': 'https://sevilla.gob.es'},
+        {'id': '3'},
+    ]
+    client = _client(lambda request: httpx.Response(200, json=records))
+
+    assert await client.fetch_source_urls() == ['https://madrid.gob.es', 'https://sevilla.gob.es']
+
+    failing = _client(lambda request: httpx.Response(503))
+    assert await failing.fetch_source_urls() is None
@@ -0,0 +1,185 @@
+"""Tests for the Circuit Breaker."""
+
+from services.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_breaker(clock: FakeClock, **overrides) -> CircuitBreaker:
+    settings = dict(
+        failure_rate_threshold=0.5,
+        min_calls=4,
+        window_seconds=60,
+        open_seconds=30,
+        half_open_probes=1,
+    )
+    settings.update(overrides)
+    return CircuitBreaker('test', clock=clock, **settings)
+
+
+class TestTripping:
+    """Test transitions from closed to open."""
+
+    def test_opens_when_failure_rate_exceeds_threshold(self):
+        """Test that failures and timeouts over the window trip the breaker."""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED  # below min_calls
+
+        breaker.record_failure(timeout=True)
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is None
+        assert breaker.stats()['rejected'] == 1
+        assert breaker.stats()['window_timeouts'] == 1
+
+    def test_stays_closed_below_threshold(self):
+        """Test that occasional failures do not trip the breaker."""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+
+        for _ in range(4):
+            breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_old_outcomes_leave_the_window(self):
+        """Test that failures older than the window are forgotten."""
+        clock = FakeClock()
+        breaker = make_breaker(clock)
+
+        for _ in range(3):
+            breaker.record_failure()
+        clock.now += 61
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()['window_calls'] == 1
+
+
+class TestRecovery:
+    """Test half-open probing."""
+
+    def _open(self, clock: FakeClock) -> CircuitBreaker:
+        breaker = make_breaker(clock, min_calls=1)
+        breaker.record_failure()
+        assert breaker.state == CircuitState.OPEN
+        return breaker
+
+    def test_half_open_after_cool_down(self):
+        """Test that a single probe is allowed after open_seconds."""
+        clock = FakeClock()
+        breaker = self._open(clock)
+
+        clock.now += 30
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is not None
+        assert breaker.allow_request() is None  # only one probe in flight
+
+    def test_successful_probe_closes_circuit(self):
+        """Test that a successful probe closes the circuit."""
+        clock = FakeClock()
+        breaker = self._open(clock)
+        clock.now += 30
+
+        permit = breaker.allow_request()
+        assert permit.probe
+        breaker.record_success(permit)
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.stats()['window_calls'] == 0
+
+    def test_failed_probe_reopens_circuit(self):
+        """Test that a failed probe opens the circuit for another cool-down."""
+        clock = FakeClock()
+        breaker = self._open(clock)
+        clock.now += 30
+
+        permit = breaker.allow_request()
+        breaker.record_failure(timeout=True, permit=permit)
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.stats()['times_opened'] == 2
+        assert breaker.stats()['retry_in_seconds'] == 30
+
+    def test_released_probe_can_be_retried(self):
+        """Test that release() frees the probe slot."""
+        clock = FakeClock()
+        breaker = self._open(clock)
+        clock.now += 30
+
+        permit = breaker.allow_request()
+        breaker.release(permit)
+
+        assert breaker.allow_request() is not None
+
+    def test_late_success_of_closed_call_does_not_close_half_open_circuit(self):
+        """Test that only a probe's success closes a half-open circuit."""
+        clock = FakeClock()
+        breaker = make_breaker(clock, min_calls=1)
+        late = breaker.allow_request()  # let through while closed
+        breaker.record_failure()
+        clock.now += 30
+        probe = breaker.allow_request()
+
+        breaker.record_success(late)
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is None  # the probe still holds the slot
+        breaker.record_success(probe)
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_release_of_closed_call_keeps_probe_slot(self):
+        """Test that releasing a non-probe call while half-open frees no probe slot."""
+        clock = FakeClock()
+        breaker = make_breaker(clock, min_calls=1)
+        late = breaker.allow_request()
+        breaker.record_failure()
+        clock.now += 30
+        assert breaker.allow_request().probe
+
+        breaker.release(late)
+
+        assert breaker.allow_request() is None
+
+    def test_probe_of_previous_half_open_period_is_ignored(self):
+        """Test that a probe permit is only valid for its own half-open period."""
+        clock = FakeClock()
+        breaker = self._open(clock)
+        clock.now += 30
+        stale = breaker.allow_request()
+        breaker.record_failure(permit=stale)
+        clock.now += 30
+        current = breaker.allow_request()
+
+        breaker.record_success(stale)
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        breaker.record_success(current)
+        assert breaker.state == CircuitState.CLOSED
+
+
+def test_registry_reads_settings_from_env(monkeypatch):
+    """Test per-breaker configuration from environment variables."""
+    monkeypatch.setenv('CIRCUIT_BREAKER_GEMINI_MIN_CALLS', '10')
+    monkeypatch.setenv('CIRCUIT_BREAKER_GEMINI_OPEN_SECONDS', '5')
+    registry = CircuitBreakerRegistry()
+
+    breaker = registry.get('gemini')
+
+    assert registry.get('gemini') is breaker
+    assert breaker.min_calls == 10
+    assert breaker.open_seconds == 5
+    assert set(registry.stats()) == {'gemini'}
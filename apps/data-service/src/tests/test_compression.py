@@ -0,0 +1,197 @@
+"""Tests for compressed and raw-body transport on the extraction endpoints."""
+
+import gzip
+import json
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware.decompression import RequestDecompressionMiddleware
+
+GRANT_HTML = """
+<html>
+    <h1>Compressed Transport Grant</h1>
+    <p>This grant page travels compressed over the wire and is decoded by the service.</p>
+    <p>Deadline: 2026-11-30</p>
+</html>
+"""
+
+
+def _payload():
+    return {"html": GRANT_HTML, "url": "https://example.com/compressed", "source": "Test"}
+
+
+def test_gzip_request_body(client: TestClient):
+    """Test that a gzip-encoded JSON body is accepted"""
+    body = gzip.compress(json.dumps(_payload()).encode("utf-8"))
+
+    response = client.post(
+        "/api/ia/extract",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["title"] == "Compressed Transport Grant"
+
+
+def test_deflate_request_body(client: TestClient):
+    """Test that a deflate-encoded JSON body is accepted"""
+    body = zlib.compress(json.dumps(_payload()).encode("utf-8"))
+
+    response = client.post(
+        "/api/ia/extract",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "deflate"},
+    )
+
+    assert response.status_code == 200
+
+
+def test_brotli_request_body(client: TestClient):
+    """Test that a brotli-encoded JSON body is accepted when brotli is installed"""
+    brotli = pytest.importorskip("brotli")
+    body = brotli.compress(json.dumps(_payload()).encode("utf-8"))
+
+    response = client.post(
+        "/api/ia/extract",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+    )
+
+    assert response.status_code == 200
+
+
+def test_unsupported_encoding_rejected(client: TestClient):
+    """Test that unknown encodings are rejected with 415"""
+    response = client.post(
+        "/api/ia/extract",
+        content=b"whatever",
+        headers={"Content-Type": "application/json", "Content-Encoding": "compress"},
+    )
+
+    assert response.status_code == 415
+
+
+def test_corrupt_body_rejected(client: TestClient):
+    """Test that a body that is not valid gzip is rejected with 400"""
+    response = client.post(
+        "/api/ia/extract",
+        content=b"not gzip at all",
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_decompression_bomb_rejected():
+    """Test that bodies inflating beyond the limit are rejected with 413"""
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(payload: dict) -> dict:
+        return {"size": len(payload["data"])}
+
+    app.add_middleware(RequestDecompressionMiddleware, max_decompressed_bytes=10_000)
+    body = gzip.compress(json.dumps({"data": "x" * 100_000}).encode("utf-8"))
+
+    response = TestClient(app).post(
+        "/echo",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_brotli_bomb_rejected():
+    """Test that brotli bodies stop expanding at the limit and are rejected with 413"""
+    brotli = pytest.importorskip("brotli")
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(payload: dict) -> dict:
+        return {"size": len(payload["data"])}
+
+    app.add_middleware(RequestDecompressionMiddleware, max_decompressed_bytes=10_000)
+    body = brotli.compress(json.dumps({"data": "x" * 10_000_000}).encode("utf-8"))
+
+    response = TestClient(app).post(
+        "/echo",
+        content=body,
+        headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+    )
+
+    assert response.status_code == 413
+
+
+def test_raw_html_body_with_query_parameters(client: TestClient):
+    """Test the raw text/html body mode with url/source in the query string"""
+    response = client.post(
+        "/api/ia/extract/html",
+        params={"url": "https://example.com/raw", "source": "Test"},
+        content=GRANT_HTML.encode("utf-8"),
+        headers={"Content-Type": "text/html; charset=utf-8"},
+    )
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert data["title"] == "Compressed Transport Grant"
+    assert data["url"] == "https://example.com/raw"
+
+
+def test_raw_html_body_compressed_with_headers(client: TestClient):
+    """Test the raw body mode with gzip encoding and url/source headers"""
+    response = client.post(
+        "/api/ia/extract/html",
+        content=gzip.compress(GRANT_HTML.encode("latin-1")),
+        headers={
+            "Content-Type": "text/html; charset=latin-1",
+            "Content-Encoding": "gzip",
+            "X-Source-Url": "https://example.com/raw-gzip",
+            "X-Source-Name": "Test",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["url"] == "https://example.com/raw-gzip"
+
+
+def test_raw_html_body_requires_url_and_source(client: TestClient):
+    """Test that the raw body mode rejects requests without url/source"""
+    response = client.post(
+        "/api/ia/extract/html",
+        content=GRANT_HTML.encode("utf-8"),
+        headers={"Content-Type": "text/html"},
+    )
+
+    assert response.status_code == 422
+
+
+def test_raw_html_body_too_short(client: TestClient):
+    """Test that the raw body mode applies the html length limits"""
+    response = client.post(
+        "/api/ia/extract/html",
+        params={"url": "https://example.com/raw", "source": "Test"},
+        content=b"<html></html>",
+        headers={"Content-Type": "text/html"},
+    )
+
+    assert response.status_code == 422
+
+
+def test_large_responses_are_gzipped(client: TestClient):
+    """Test that responses above the size threshold are gzip-compressed"""
+    items = [_payload() for _ in range(10)]
+
+    response = client.post(
+        "/api/ia/extract/batch",
+        json={"items": items},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["succeeded"] == 10
@@ -0,0 +1,140 @@
+"""Tests for main-content distillation."""
+
+import pytest
+
+from services.content_distiller import distill, estimate_tokens
+from services.html_scanner import lxml_available
+
+PORTAL_PAGE = """
+<html>
+<head><title>Ayuntamiento - Ayudas</title><script>var tracking = true;</script></head>
+<body>
+    <div id="cookie-banner">Usamos cookies para mejorar su experiencia de navegación.</div>
+    <header><nav><ul><li><a href="/">Inicio</a></li><li><a href="/sede">Sede electrónica</a></li></ul></nav></header>
+    <div class="wrapper">
+        <div class="sidebar-left"><ul><li>Trámites</li><li>Empleo público</li></ul></div>
+        <div class="content">
+            <h1>Subvenciones a la rehabilitación 2026</h1>
+            <p>El Ayuntamiento convoca ayudas para la rehabilitación de fachadas con un presupuesto de 200.000 €.</p>
+            <ul><li>Plazo: hasta 2026-12-31</li><li>Beneficiarios: comunidades de propietarios</li></ul>
+            <table><tr><th>Concepto</th><th>Importe</th></tr><tr><td>Fachada</td><td>10.000 €</td></tr></table>
+        </div>
+    </div>
+    <footer>© 2026 Ayuntamiento. Aviso legal.</footer>
+</body>
+</html>
+"""
+
+
+def test_distill_removes_boilerplate():
+    """Test that scripts, navigation, cookie banners, sidebars and footers are dropped"""
+    content = distill(PORTAL_PAGE)
+
+    assert "Subvenciones a la rehabilitación 2026" in content.text
+    for boilerplate in ("tracking", "cookies", "Sede electrónica", "Trámites", "Aviso legal"):
+        assert boilerplate not in content.text
+
+
+def test_distill_renders_compact_markdown():
+    """Test that headings, list items and table rows are rendered as markdown lines"""
+    content = distill(PORTAL_PAGE)
+
+    assert content.blocks == [
+        "# Subvenciones a la rehabilitación 2026",
+        "El Ayuntamiento convoca ayudas para la rehabilitación de fachadas con un presupuesto de 200.000 €.",
+        "- Plazo: hasta 2026-12-31",
+        "- Beneficiarios: comunidades de propietarios",
+        "Concepto | Importe",
+        "Fachada | 10.000 €",
+    ]
+    assert content.title == "Subvenciones a la rehabilitación 2026"
+    assert content.truncated is False
+
+
+def test_distill_plain_text_mode():
+    """Test that markdown=False keeps the blocks as plain text"""
+    content = distill(PORTAL_PAGE, markdown=False)
+
+    assert content.blocks[0] == "Subvenciones a la rehabilitación 2026"
+    assert "- Plazo: hasta 2026-12-31" not in content.blocks
+
+
+def test_distill_prefers_main_element():
+    """Test that <main> content is isolated from the rest of the page"""
+    html = """
+    <html><body>
+        <div><p>Related news: the city council approved the annual budget for parks and gardens.</p></div>
+        <main><h2>Innovation Grant</h2><p>Funding for small companies developing new products.</p></main>
+    </body></html>
+    """
+    content = distill(html)
+
+    assert content.blocks == [
+        "## Innovation Grant",
+        "Funding for small companies developing new products.",
+    ]
+
+
+def test_distill_picks_densest_container():
+    """Test that the container holding most paragraph text is selected"""
+    html = """
+    <html><body>
+        <div class="promo"><p>Short promo text.</p></div>
+        <div class="body">
+            <p>The programme funds research projects on renewable energy storage.</p>
+            <p>Applications are evaluated by an independent panel of experts.</p>
+        </div>
+    </body></html>
+    """
+    content = distill(html)
+
+    assert "Short promo text." not in content.text
+    assert "independent panel" in content.text
+
+
+def test_distill_respects_token_budget():
+    """Test that long pages are cut to the token budget"""
+    paragraphs = "".join(f"<p>Paragraph {i} describing the grant conditions in detail.</p>" for i in range(200))
+    content = distill(f"<html><body><h1>Long Grant</h1>{paragraphs}</body></html>", max_tokens=100)
+
+    assert content.truncated is True
+    assert estimate_tokens(content.text) <= 101
+    assert content.blocks[0] == "# Long Grant"
+
+
+def test_distill_falls_back_to_title_tag():
+    """Test that the <title> is used when the page has no h1"""
+    content = distill("<html><head><title> Portal de Ayudas </title></head><body><p>Texto</p></body></html>")
+
+    assert content.title == "Portal de Ayudas"
+    assert content.text == "Texto"
+
+
+def test_distill_empty_page():
+    """Test that pages without visible text distill to nothing"""
+    content = distill("<html><script>console.log('x')</script><body></body></html>")
+
+    assert content.text == ""
+    assert content.title is None
+
+
+@pytest.mark.skipif(not lxml_available(), reason="lxml not installed")
+@pytest.mark.parametrize('html', [
+    PORTAL_PAGE,
+    "<html><body><main><p>Línea uno<br>línea dos</p></main><p>Fuera</p></body></html>",
+    "<html><body><table><tr>Total<td>10.000 €</td> <th>2026</th></tr></table>Pie</body></html>",
+    "<html><body><div role=\"navigation\">Menú</div><p>Texto <span aria-hidden=\"true\">x</span>final</p></body></html>",
+])
+def test_distill_lxml_backend_matches_stdlib(html):
+    """Test that the lxml tree walk produces the same content as the html.parser collector"""
+    expected = distill(html, backend='stdlib')
+    result = distill(html, backend='lxml')
+
+    assert result.text == expected.text
+    assert result.title == expected.title
+
+
+def test_distill_unknown_backend():
+    """Test that an unknown backend raises ValueError"""
+    with pytest.raises(ValueError):
+        distill("<p>Texto</p>", backend='regex')
@@ -1,3 +1,6 @@
+import asyncio
+import re
+
 import pytest
 
 from services import discovery_service as ds
@@ -40,3 +43,324 @@ async def test_discover_sources_returns_results(monkeypatch):
 
     assert len(results) == 1
     assert results[0].metadata['confidence'] == 0.8
+
+
+@pytest.mark.asyncio
+async def test_throttled_search_skips_search_when_rate_limited(monkeypatch):
+    from services.rate_limiter import TokenBucket
+
+    bucket = TokenBucket('ddgs', rate_per_second=0.001, burst=1, max_wait_seconds=0)
+    await bucket.acquire()
+    monkeypatch.setattr(ds.rate_limiters, 'bucket', lambda provider, api_key=None: bucket)
+
+    class ExplodingDDGS:
+        def __init__(self):
+            raise AssertionError('DDGS should not be called when rate limited')
+
+    monkeypatch.setattr(ds, 'DDGS', ExplodingDDGS)
+
+    with pytest.raises(ds.SearchFailed) as failed:
+        await ds.throttled_search('subvenciones', max_results=5)
+    assert failed.value.results == []
+    assert bucket.stats()['rejected'] == 1
+
+
+def _candidates_for(query: str, count: int = 3) -> list[ds.CandidateSource]:
+    slug = re.sub(r'[^a-z0-9]+', '-', query.lower()).strip('-')
+    return [
+        ds.CandidateSource(title=f'Ayudas {query}', url=f'https://{slug}.gob.es/{i}', snippet='')
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_discover_sources_searches_concurrently_off_the_loop(monkeypatch):
+    import threading
+    import time
+
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_search(query: str, max_results: int):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)  # blocking, like the DDGS client
+        with lock:
+            active -= 1
+        return _candidates_for(query)
+
+    monkeypatch.setattr(ds, 'search_web', slow_search)
+    monkeypatch.setenv('DISCOVERY_SEARCH_CONCURRENCY', '3')
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    ticker_task = asyncio.create_task(ticker())
+    results = await ds.discover_sources(
+        scope='espana',
+        provincias=['Madrid', 'Sevilla', 'Valencia', 'Bilbao'],
+        max_results=100,
+        validate_with_ia=False,
+        skip_domain_filter=True,
+    )
+    ticker_task.cancel()
+
+    queries = ds.build_queries('espana', ['Madrid', 'Sevilla', 'Valencia', 'Bilbao'])
+    assert len(results) == 3 * len(queries)
+    assert peak == 3
+    # The event loop kept running while searches blocked their threads
+    assert ticks >= 5
+
+
+@pytest.mark.asyncio
+async def test_search_concurrently_yields_searches_as_they_finish(monkeypatch):
+    import time
+
+    def search(query: str, max_results: int):
+        time.sleep(0.2 if query == 'slow' else 0.01)
+        return _candidates_for(query, count=1)
+
+    monkeypatch.setattr(ds, 'search_web', search)
+
+    yielded = [index async for index, _ in ds.search_concurrently(['slow', 'a', 'b'], 5, concurrency=3)]
+
+    assert yielded[-1] == 0
+    assert sorted(yielded) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_search_concurrently_close_collects_cancelled_searches(monkeypatch):
+    import time
+
+    def search(query: str, max_results: int):
+        time.sleep(0.01 if query == 'fast' else 0.2)
+        return _candidates_for(query, count=1)
+
+    monkeypatch.setattr(ds, 'search_web', search)
+    searches = ds.search_concurrently(['fast', 'slow', 'queued'], 5, concurrency=2)
+
+    assert (await searches.__anext__())[0] == 0
+    await searches.aclose()
+
+    pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    assert pending == []
+
+
+@pytest.mark.asyncio
+async def test_discover_sources_cancels_outstanding_searches_at_max_results(monkeypatch):
+    started = []
+
+    def search(query: str, max_results: int):
+        started.append(query)
+        return _candidates_for(query, count=5)
+
+    monkeypatch.setattr(ds, 'search_web', search)
+    monkeypatch.setenv('DISCOVERY_SEARCH_CONCURRENCY', '1')
+
+    results = await ds.discover_sources(
+        scope='espana',
+        provincias=['Madrid', 'Sevilla', 'Valencia'],
+        max_results=4,
+        validate_with_ia=False,
+        skip_domain_filter=True,
+    )
+    await asyncio.sleep(0.05)
+
+    queries = ds.build_queries('espana', ['Madrid', 'Sevilla', 'Valencia'])
+    assert len(results) == 4
+    # Queued searches never started once max_results was reached (the slot freed
+    # by the first search may already have let a second one start)
+    assert len(started) <= 2 < len(queries)
+
+
+@pytest.mark.asyncio
+async def test_discover_sources_validates_concurrently_in_admission_order(monkeypatch):
+    active = 0
+    peak = 0
+
+    def search(query: str, max_results: int):
+        return _candidates_for(query, count=4)
+
+    async def slow_validate(cand: ds.CandidateSource, scope: str):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        # Later candidates finish first
+        await asyncio.sleep(0.05 / (int(cand.url.rsplit('/', 1)[1]) + 1))
+        active -= 1
+        return 0.8, {'description': cand.url}
+
+    monkeypatch.setattr(ds, 'search_web', search)
+    monkeypatch.setattr(ds, 'validate_candidate', slow_validate)
+    monkeypatch.setenv('DISCOVERY_VALIDATION_CONCURRENCY', '3')
+    monkeypatch.setenv('DISCOVERY_VALIDATION_BATCH_SIZE', '1')
+
+    results = await ds.discover_sources(
+        scope='espana',
+        provincias=['Madrid'],
+        max_results=100,
+        validate_with_ia=True,
+        skip_domain_filter=True,
+    )
+
+    queries = ds.build_queries('espana', ['Madrid'])
+    expected = [candidate.url for query in queries for candidate in _candidates_for(query, count=4)]
+    assert [source.baseUrl for source in results] == expected
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_discover_sources_stops_validating_at_max_results(monkeypatch):
+    validated = []
+
+    def search(query: str, max_results: int):
+        return _candidates_for(query, count=5)
+
+    async def validate(cand: ds.CandidateSource, scope: str):
+        validated.append(cand.url)
+        await asyncio.sleep(0)
+        return 0.7, {}
+
+    monkeypatch.setattr(ds, 'search_web', search)
+    monkeypatch.setattr(ds, 'validate_candidate', validate)
+    # One search at a time: searches finish in query order, so the cut is deterministic
+    monkeypatch.setenv('DISCOVERY_SEARCH_CONCURRENCY', '1')
+    monkeypatch.setenv('DISCOVERY_VALIDATION_CONCURRENCY', '4')
+    monkeypatch.setenv('DISCOVERY_VALIDATION_BATCH_SIZE', '1')
+
+    results = await ds.discover_sources(
+        scope='europa',
+        provincias=[],
+        max_results=7,
+        validate_with_ia=True,
+        skip_domain_filter=True,
+    )
+
+    queries = ds.build_queries('europa', [])
+    expected = [candidate.url for query in queries for candidate in _candidates_for(query, count=5)][:7]
+    assert [source.baseUrl for source in results] == expected
+    assert sorted(validated) == sorted(expected)
+
+
+class ScriptedModel:
+    def __init__(self, answer):
+        self.answer = answer
+        self.prompts = []
+
+    async def generate_content_async(self, prompt: str):
+        import types
+
+        self.prompts.append(prompt)
+        return types.SimpleNamespace(text=self.answer(prompt, len(self.prompts)))
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    from services.fake_providers import answer_prompt
+
+    monkeypatch.setenv('RATE_LIMIT_GEMINI_PER_SECOND', '0')
+    monkeypatch.setattr(ds, 'rate_limiters', type(ds.rate_limiters)())
+    model = ScriptedModel(lambda prompt, call: answer_prompt(prompt))
+    monkeypatch.setattr(ds, 'ensure_gemini_model', lambda: model)
+    return model
+
+
+def test_batch_validation_prompt_round_trip():
+    from services.fake_providers import answer_prompt
+
+    candidates = _candidates_for('subvenciones madrid', count=3)
+    prompt = ds.build_batch_validation_prompt(candidates, 'espana')
+
+    verdicts = ds.parse_batch_validation_response(answer_prompt(prompt))
+
+    assert sorted(verdicts) == ['c0', 'c1', 'c2']
+    assert verdicts['c1']['confidence'] == 0.85
+    with pytest.raises(ValueError):
+        ds.parse_batch_validation_response('{"confidence": 0.9}')
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_uses_one_prompt(gemini):
+    candidates = _candidates_for('subvenciones madrid', count=10)
+
+    verdicts = await ds.classify_batch(candidates, 'espana')
+
+    assert len(gemini.prompts) == 1
+    assert [confidence for confidence, _ in verdicts] == [0.85] * 10
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_splits_malformed_answers(gemini):
+    from services.fake_providers import answer_prompt
+
+    gemini.answer = lambda prompt, call: 'Sure! [' if call == 1 else answer_prompt(prompt)
+    candidates = _candidates_for('subvenciones madrid', count=6)
+
+    verdicts = await ds.classify_batch(candidates, 'espana')
+
+    # The malformed answer, then one prompt per half
+    assert len(gemini.prompts) == 3
+    assert all('c2' in prompt and 'c3' not in prompt for prompt in gemini.prompts[1:])
+    assert [confidence for confidence, _ in verdicts] == [0.85] * 6
+
+
+@pytest.mark.asyncio
+async def test_classify_batch_retries_only_missing_items(gemini):
+    import json
+
+    from services.fake_providers import answer_prompt
+
+    def drop_c1(prompt, call):
+        answer = json.loads(answer_prompt(prompt))
+        return json.dumps([item for item in answer if item['id'] != 'c1'] if call == 1 else answer)
+
+    gemini.answer = drop_c1
+    candidates = _candidates_for('subvenciones madrid', count=4)
+
+    verdicts = await ds.classify_batch(candidates, 'espana')
+
+    assert len(gemini.prompts) == 2
+    # The retry is a regular single-candidate prompt for the missing candidate
+    assert 'Classify if this URL' in gemini.prompts[1]
+    assert candidates[1].url in gemini.prompts[1]
+    assert all(verdict[1]['organization'] == 'Administración pública' for verdict in verdicts)
+
+
+@pytest.mark.asyncio
+async def test_discover_sources_batches_validation_by_prompt_size(gemini, monkeypatch):
+    def search(query: str, max_results: int):
+        return _candidates_for(query, count=10)
+
+    monkeypatch.setattr(ds, 'search_web', search)
+    monkeypatch.setenv('DISCOVERY_VALIDATION_CONCURRENCY', '2')
+
+    async def discover():
+        return await ds.discover_sources(
+            scope='europa',
+            provincias=[],
+            max_results=40,
+            validate_with_ia=True,
+            skip_domain_filter=True,
+        )
+
+    batched = await discover()
+    batched_prompts = len(gemini.prompts)
+
+    gemini.prompts.clear()
+    budget = 3 * ds.candidate_prompt_chars(_candidates_for('subvenciones site:gov')[0])
+    monkeypatch.setenv('DISCOVERY_VALIDATION_BATCH_CHARS', str(budget))
+    small_batches = await discover()
+
+    assert [source.baseUrl for source in batched] == [source.baseUrl for source in small_batches]
+    assert len(batched) == 40
+    assert batched_prompts <= 8
+    assert len(gemini.prompts) > batched_prompts
+    assert all(prompt.count('=== Candidate') <= 3 for prompt in gemini.prompts)
@@ -0,0 +1,144 @@
+"""Tests for the fake Gemini and search providers."""
+
+import asyncio
+import json
+
+import pytest
+
+from models import ExtractionMethod
+from services import discovery_service as ds
+from services.content_distiller import distill
+from services.fake_providers import (
+    FakeGeminiConfig,
+    FakeGeminiModel,
+    FakeProviderError,
+    FakeSearch,
+    answer_prompt,
+)
+from services.ia_service import IAService
+from services.prompt_packer import build_packed_prompt
+
+GRANT_HTML = """
+<html>
+    <head><title>Ayudas Fake</title></head>
+    <body>
+        <h1>Ayudas a la innovación 2026</h1>
+        <p>Subvenciones de hasta 25.000 euros para proyectos de innovación en pymes.</p>
+    </body>
+</html>
+"""
+
+
+def _fake_model(**overrides) -> FakeGeminiModel:
+    return FakeGeminiModel(FakeGeminiConfig(latency_ms=0, latency_sigma=0, seed=1, **overrides))
+
+
+def test_extraction_prompt_answer_is_valid_grant_json():
+    """Test that the fake answers the extraction prompt with the expected fields"""
+    prompt = IAService()._build_prompt(GRANT_HTML)
+
+    answer = json.loads(answer_prompt(prompt))
+
+    assert answer["title"] == "Ayudas a la innovación 2026"
+    assert answer["amount"] == 25000
+    assert set(answer) == {"title", "description", "amount", "deadline"}
+
+
+def test_packed_prompt_answer_echoes_document_ids():
+    """Test that a packed prompt gets one object per document id"""
+    content = distill(GRANT_HTML)
+    prompt = build_packed_prompt([("d0", content), ("d1", content)])
+
+    answer = json.loads(answer_prompt(prompt))
+
+    assert [item["id"] for item in answer] == ["d0", "d1"]
+
+
+def test_validation_prompt_scores_official_domains_higher():
+    """Test the discovery validation answer"""
+    official = ds.CandidateSource("Ayudas", "https://sede.madrid.gob.es/ayudas", "")
+    other = ds.CandidateSource("Ayudas", "https://www.blog-ayudas.com/", "")
+
+    official_answer = json.loads(answer_prompt(ds.build_validation_prompt(official, "espana")))
+    other_answer = json.loads(answer_prompt(ds.build_validation_prompt(other, "espana")))
+
+    assert official_answer["confidence"] > other_answer["confidence"]
+
+
+def test_injected_error_and_malformed_answers():
+    """Test that error and malformed rates of 1 always inject that outcome"""
+    with pytest.raises(FakeProviderError):
+        _fake_model(error_rate=1.0).generate_content("Classify if this URL")
+
+    text = _fake_model(malformed_rate=1.0).generate_content("Classify if this URL").text
+    with pytest.raises(json.JSONDecodeError):
+        json.loads(text)
+
+
+@pytest.mark.asyncio
+async def test_injected_timeout_hangs_async_call():
+    """Test that a timeout outcome outlasts the caller's timeout"""
+    model = _fake_model(timeout_rate=1.0, timeout_seconds=5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(model.generate_content_async("prompt"), timeout=0.05)
+    assert model.stats()["timeouts"] == 1
+
+
+def test_latency_distribution_is_seeded():
+    """Test that the same seed reproduces the same latencies"""
+    config = FakeGeminiConfig(latency_ms=100, latency_sigma=0.5, seed=7)
+    first = [FakeGeminiModel(config)._plan()[1] for _ in range(3)]
+    second = [FakeGeminiModel(config)._plan()[1] for _ in range(3)]
+
+    assert first == second
+    assert all(latency > 0 for latency in first)
+
+
+def test_fake_search_serves_canned_results_by_query():
+    """Test canned results per query and the max_results cap"""
+    results = [{"title": f"T{i}", "href": f"https://a{i}.gob.es", "body": ""} for i in range(5)]
+    search = FakeSearch(results={"ayudas": results}, latency_ms=0)
+
+    with search as client:
+        assert list(client.text("ayudas", max_results=3)) == results[:3]
+        assert list(client.text("other", max_results=3)) == []
+
+
+@pytest.mark.asyncio
+async def test_service_uses_fake_gemini_when_configured(monkeypatch):
+    """Test that GEMINI_PROVIDER=fake routes extraction through the fake model"""
+    from services import fake_providers
+    from services import ia_service as ia_module
+    from services.circuit_breaker import CircuitBreakerRegistry
+    from services.gemini_client import GeminiModelRegistry
+
+    monkeypatch.setenv("GEMINI_PROVIDER", "fake")
+    monkeypatch.setenv("RATE_LIMIT_GEMINI_PER_SECOND", "0")
+    monkeypatch.setattr(fake_providers, "_shared_model", _fake_model())
+    monkeypatch.setattr(ia_module, "gemini_models", GeminiModelRegistry())
+    monkeypatch.setattr(ia_module, "circuit_breakers", CircuitBreakerRegistry())
+    monkeypatch.setattr(ia_module, "rate_limiters", type(ia_module.rate_limiters)())
+
+    success, data, method, _ = await IAService().extract_grant(
+        html=GRANT_HTML, url="https://example.com/fake", source="Test"
+    )
+
+    assert success is True
+    assert method == ExtractionMethod.GEMINI
+    assert data.amount == 25000
+
+
+def test_search_web_uses_fake_search_when_configured(monkeypatch):
+    """Test that SEARCH_PROVIDER=fake replaces DuckDuckGo"""
+    from services import fake_providers
+
+    monkeypatch.setenv("SEARCH_PROVIDER", "fake")
+    monkeypatch.setenv("RATE_LIMIT_DDGS_PER_SECOND", "0")
+    monkeypatch.setattr(fake_providers, "_shared_search", FakeSearch(latency_ms=0))
+    monkeypatch.setattr(ds, "rate_limiters", type(ds.rate_limiters)())
+
+    candidates = ds.search_web("subvenciones espana", max_results=5)
+
+    assert len(candidates) == 5
+    assert all(candidate.url.startswith("https://") for candidate in candidates)
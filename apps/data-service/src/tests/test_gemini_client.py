@@ -0,0 +1,99 @@
+"""Tests for the shared, lazily built Gemini model registry."""
+
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+from services import discovery_service as ds
+from services.gemini_client import GeminiModelRegistry
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    """Stand-in google.generativeai module counting configure/model calls"""
+    calls = {"configure": 0, "models": 0}
+
+    class GenerativeModel:
+        def __init__(self, name):
+            calls["models"] += 1
+            self.name = name
+
+    def configure(api_key):
+        calls["configure"] += 1
+
+    genai = types.SimpleNamespace(configure=configure, GenerativeModel=GenerativeModel)
+    google = types.ModuleType("google")
+    google.generativeai = genai
+    monkeypatch.setitem(sys.modules, "google", google)
+    monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.delenv("GEMINI_PROVIDER", raising=False)
+    return calls
+
+
+def test_model_is_built_once_and_shared(fake_genai):
+    """Test that the SDK is configured once and the model reused"""
+    registry = GeminiModelRegistry()
+
+    first = registry.get()
+    second = registry.get()
+
+    assert first is second
+    assert fake_genai == {"configure": 1, "models": 1}
+    assert registry.stats()["models"] == ["gemini-pro"]
+
+
+def test_missing_key_returns_none_without_import(monkeypatch):
+    """Test that no API key means no model (and the SDK is not imported)"""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    monkeypatch.delenv("GEMINI_PROVIDER", raising=False)
+    monkeypatch.setitem(sys.modules, "google.generativeai", None)  # import would raise
+
+    registry = GeminiModelRegistry()
+
+    assert registry.get() is None
+    assert registry.get() is None
+    assert registry.stats()["models"] == []
+
+
+@pytest.mark.asyncio
+async def test_warm_up_builds_model(fake_genai):
+    """Test that warm_up builds the model ahead of the first request"""
+    registry = GeminiModelRegistry()
+
+    model = await registry.warm_up()
+
+    assert model is registry.get()
+    assert registry.stats()["init_seconds"] is not None
+
+
+def test_discovery_reuses_shared_model(fake_genai, monkeypatch):
+    """Test that validating several candidates does not rebuild the model"""
+    monkeypatch.setattr(ds, "gemini_models", GeminiModelRegistry())
+
+    models = {id(ds.ensure_gemini_model()) for _ in range(5)}
+
+    assert len(models) == 1
+    assert fake_genai["models"] == 1
+
+
+def test_importing_service_does_not_import_sdk():
+    """Test that the service modules leave google.generativeai unimported"""
+    service_root = Path(__file__).resolve().parents[2]
+    code = (
+        "import sys; sys.path.insert(0, 'src'); import main; "
+        "print('google.generativeai' in sys.modules, 'duckduckgo_search' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=service_root,
+        capture_output=True,
+        text=True,
+        env={"GEMINI_API_KEY": "test-key", "PATH": ""},
+        check=True,
+    )
+
+    assert result.stdout.split() == ["False", "False"]
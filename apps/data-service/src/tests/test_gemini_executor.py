@@ -0,0 +1,159 @@
+"""Tests for the dedicated Gemini executor."""
+
+import asyncio
+import threading
+
+import pytest
+
+from services.gemini_executor import ExecutorSaturated, GeminiExecutor
+
+
+class BlockingModel:
+    """Model whose generate_content blocks until released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def generate_content(self, prompt):
+        self.release.wait(timeout=5)
+        return f"answer to {prompt}"
+
+
+class NativeModel:
+    """Model with a native async API."""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.sync_calls = 0
+
+    def generate_content(self, prompt):
+        self.sync_calls += 1
+        return "sync"
+
+    async def generate_content_async(self, prompt):
+        await asyncio.sleep(self.delay)
+        return "native"
+
+
+@pytest.mark.asyncio
+async def test_runs_calls_in_dedicated_threads():
+    """Test that model calls run on the executor's own threads"""
+    executor = GeminiExecutor(max_workers=2, max_queue=0)
+
+    class NamedModel:
+        def generate_content(self, prompt):
+            return threading.current_thread().name
+
+    name = await executor.generate(NamedModel(), "prompt", timeout=1)
+
+    assert name.startswith("gemini")
+    assert executor.stats()["completed"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_calls_are_counted_as_abandoned():
+    """Test that a timed-out call keeps its thread and is reported as abandoned"""
+    executor = GeminiExecutor(max_workers=1, max_queue=0)
+    model = BlockingModel()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.generate(model, "slow", timeout=0.05)
+
+    stats = executor.stats()
+    assert stats["abandoned"] == 1
+    assert stats["running"] == 1
+    assert stats["timeouts"] == 1
+
+    model.release.set()
+    for _ in range(100):
+        if executor.stats()["abandoned"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert executor.stats()["abandoned"] == 0
+    assert executor.stats()["abandoned_total"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_calls_when_saturated():
+    """Test that calls beyond workers + queue are rejected immediately"""
+    executor = GeminiExecutor(max_workers=1, max_queue=1)
+    model = BlockingModel()
+
+    first = asyncio.create_task(executor.generate(model, "a", timeout=5))
+    second = asyncio.create_task(executor.generate(model, "b", timeout=5))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ExecutorSaturated):
+        await executor.generate(model, "c", timeout=5)
+    assert executor.stats()["queue_depth"] == 1
+    assert executor.stats()["rejected"] == 1
+
+    model.release.set()
+    assert await first == "answer to a"
+    assert await second == "answer to b"
+    assert executor.stats()["saturation"] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queued_call_is_dequeued_on_timeout():
+    """Test that a call that never started does not stay in the queue"""
+    executor = GeminiExecutor(max_workers=1, max_queue=1)
+    model = BlockingModel()
+
+    running = asyncio.create_task(executor.generate(model, "a", timeout=5))
+    await asyncio.sleep(0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.generate(model, "b", timeout=0.05)
+
+    stats = executor.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["abandoned"] == 0
+
+    model.release.set()
+    await running
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_uses_native_async_api_when_available():
+    """Test that generate_content_async is preferred and really cancelled on timeout"""
+    executor = GeminiExecutor(max_workers=1, max_queue=0)
+
+    assert await executor.generate(NativeModel(), "prompt", timeout=1) == "native"
+
+    with pytest.raises(asyncio.TimeoutError):
+        await executor.generate(NativeModel(delay=1), "prompt", timeout=0.05)
+    stats = executor.stats()
+    assert stats["running"] == 0
+    assert stats["abandoned"] == 0
+    assert stats["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_native_async_can_be_disabled():
+    """Test that native_async=False always uses the thread pool"""
+    executor = GeminiExecutor(native_async=False)
+    model = NativeModel()
+
+    assert await executor.generate(model, "prompt", timeout=1) == "sync"
+    assert model.sync_calls == 1
+    executor.shutdown()
+
+
+def test_native_slots_work_across_event_loops():
+    """Test that the shared executor keeps working when later calls run on a new event loop"""
+    executor = GeminiExecutor(max_workers=1, max_queue=1)
+
+    async def contended_calls():
+        # Two calls for one slot: the second waits on the semaphore
+        return await asyncio.gather(
+            executor.generate(NativeModel(delay=0.01), "a", timeout=1),
+            executor.generate(NativeModel(delay=0.01), "b", timeout=1),
+        )
+
+    assert asyncio.run(contended_calls()) == ["native", "native"]
+    assert asyncio.run(contended_calls()) == ["native", "native"]
+    assert executor.stats()["completed"] == 4
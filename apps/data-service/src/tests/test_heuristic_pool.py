@@ -0,0 +1,87 @@
+"""Tests for heuristic extraction execution modes."""
+
+import pytest
+
+from services.heuristic_pool import HeuristicRunner
+
+GRANT_HTML = """
+<html>
+    <h1>Research Grant 2026</h1>
+    <p>This is a comprehensive research grant for climate change mitigation projects with excellent funding opportunities.</p>
+    <p>Total amount: €50,000 EUR</p>
+    <p>Deadline: 2026-12-31</p>
+</html>
+"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('mode', ['inline', 'thread'])
+async def test_run_in_local_modes(mode):
+    """Test that inline and thread modes extract the same data."""
+    runner = HeuristicRunner(mode=mode)
+
+    data = await runner.run(GRANT_HTML, 'https://example.com/grant', 'Test Source')
+
+    assert data.title == 'Research Grant 2026'
+    assert data.amount == 50000
+    assert runner.stats()['completed'] == 1
+    assert runner.stats()['in_flight'] == 0
+
+
+@pytest.mark.asyncio
+async def test_run_in_process_pool():
+    """Test that the process pool warms every worker and extracts data."""
+    runner = HeuristicRunner(mode='process', pool_size=2)
+    try:
+        await runner.start()
+        assert runner.started is True
+
+        data = await runner.run(GRANT_HTML, 'https://example.com/grant', 'Test Source')
+
+        assert data.title == 'Research Grant 2026'
+        assert data.deadline == '2026-12-31'
+    finally:
+        runner.shutdown()
+
+    assert runner.started is False
+
+
+@pytest.mark.asyncio
+async def test_start_is_noop_outside_process_mode():
+    """Test that no pool is created in inline mode."""
+    runner = HeuristicRunner(mode='inline')
+
+    await runner.start()
+
+    assert runner.started is False
+
+
+@pytest.mark.asyncio
+async def test_oversized_documents_are_rejected():
+    """Test the per-task size limit."""
+    runner = HeuristicRunner(mode='inline', max_task_chars=100)
+
+    with pytest.raises(ValueError, match='too large'):
+        await runner.run(GRANT_HTML, 'https://example.com', 'Test')
+
+    assert runner.stats()['rejected'] == 1
+
+
+def test_unknown_mode_is_rejected():
+    """Test that an unknown execution mode raises ValueError."""
+    with pytest.raises(ValueError):
+        HeuristicRunner(mode='gpu')
+
+
+def test_from_env(monkeypatch):
+    """Test configuration from environment variables."""
+    monkeypatch.setenv('HEURISTIC_EXECUTION_MODE', 'process')
+    monkeypatch.setenv('HEURISTIC_POOL_SIZE', '3')
+    monkeypatch.setenv('HEURISTIC_POOL_MAX_TASK_CHARS', '5000')
+
+    runner = HeuristicRunner.from_env(parser='stdlib')
+
+    assert runner.mode == 'process'
+    assert runner.pool_size == 3
+    assert runner.max_task_chars == 5000
+    assert runner.parser == 'stdlib'
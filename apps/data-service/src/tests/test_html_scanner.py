@@ -0,0 +1,74 @@
+"""Tests for the single-pass HTML scanner."""
+
+import pytest
+
+from services.html_scanner import lxml_available, scan_html
+
+FAST_BACKENDS = ['stdlib'] + (['lxml'] if lxml_available() else [])
+
+WELL_FORMED_PAGES = [
+    """
+    <html>
+        <h1>Research Grant 2026</h1>
+        <p>This is a comprehensive research grant for climate change mitigation projects.</p>
+        <p>Total amount: €50,000 EUR</p>
+        <p>Deadline: 2026-12-31</p>
+    </html>
+    """,
+    """
+    <html><head><title>Portal de Ayudas</title><style>p { color: red; }</style></head>
+    <body>
+        <h2>Ayudas &amp; Subvenciones</h2>
+        <p>Corta</p>
+        <p>La convocatoria <b>2026</b> financia proyectos de <i>innovación</i> con hasta 30.000 EUR.</p>
+        <script>var html = '<h1>Not a title</h1>';</script>
+        <!-- <h1>Commented out</h1> -->
+        <h1>Convocatoria Principal</h1>
+    </body></html>
+    """,
+    "<html><script>console.log('test')</script><style>body{color:red}</style></html>" + "x" * 150,
+    "<html><body></body></html>",
+]
+
+
+@pytest.mark.parametrize('backend', FAST_BACKENDS)
+@pytest.mark.parametrize('html', WELL_FORMED_PAGES)
+def test_fast_backends_match_beautifulsoup(backend, html):
+    """Test that fast backends produce the same scan as the BeautifulSoup path."""
+    expected = scan_html(html, backend='bs4')
+    result = scan_html(html, backend=backend)
+
+    assert result.title == expected.title
+    assert result.paragraph == expected.paragraph
+    assert result.text_head == expected.text_head
+    assert ' '.join(result.text.split()) == ' '.join(expected.text.split())
+
+
+def test_stdlib_backend_matches_beautifulsoup_on_malformed_html():
+    """Test that the stdlib backend reproduces html.parser tree quirks exactly."""
+    html = (
+        '<h2>Second</h2><p>short<p>nested paragraph that is definitely longer than fifty chars'
+        '</p></p><div><p>unclosed paragraph<div>inside</div></div> after <h1></h1>'
+    )
+
+    assert scan_html(html, backend='stdlib') == scan_html(html, backend='bs4')
+
+
+def test_scan_picks_title_by_priority():
+    """Test that h1 wins over h2 and title regardless of document order."""
+    html = '<title>Page Title</title><h2>Section</h2><h1>Main Title</h1>'
+
+    for backend in FAST_BACKENDS:
+        assert scan_html(html, backend=backend).title == 'Main Title'
+
+
+def test_scan_without_title_tags():
+    """Test that title is None when no candidate tag exists."""
+    for backend in FAST_BACKENDS:
+        assert scan_html('<div>No headings here</div>', backend=backend).title is None
+
+
+def test_unknown_backend_is_rejected():
+    """Test that an unknown backend raises ValueError."""
+    with pytest.raises(ValueError):
+        scan_html('<p>x</p>', backend='regex')
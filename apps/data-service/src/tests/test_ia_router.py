@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -129,3 +131,115 @@ def test_extract_grant_response_schema(client: TestClient):
         assert "source" in data["data"]
         assert "extraction_method" in data["data"]
         assert data["error"] is None
+
+
+def test_extract_grant_batch(client: TestClient):
+    """Test batch extraction returns per-item results without failing the batch"""
+    good = {
+        "html": """
+        <html>
+            <h1>Batch Grant Endpoint</h1>
+            <p>This grant verifies that the batch endpoint extracts every document it receives.</p>
+        </html>
+        """,
+        "url": "https://example.com/grant",
+        "source": "Test"
+    }
+    bad = {
+        "html": "<html><body></body></html>" + " " * 100,
+        "url": "https://example.com/empty",
+        "source": "Test"
+    }
+
+    response = client.post("/api/ia/extract/batch", json={"items": [good, bad], "concurrency": 2})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["succeeded"] == 1
+    assert data["failed"] == 1
+    assert data["results"][0]["success"] is True
+    assert data["results"][0]["data"]["title"] == "Batch Grant Endpoint"
+    assert data["results"][1]["success"] is False
+    assert "Failed to extract" in data["results"][1]["error"]
+
+
+def test_extract_grant_batch_rejects_empty_batch(client: TestClient):
+    """Test that an empty batch is rejected"""
+    response = client.post("/api/ia/extract/batch", json={"items": []})
+
+    assert response.status_code == 422
+
+
+def test_extraction_stats(client: TestClient):
+    """Test that the stats endpoint exposes cache counters"""
+    response = client.get("/api/ia/stats")
+
+    assert response.status_code == 200
+    cache = response.json()["cache"]
+    assert {"hits", "misses", "hit_ratio", "entries"} <= set(cache)
+    executor = response.json()["gemini_executor"]
+    assert {"running", "queue_depth", "abandoned", "rejected"} <= set(executor)
+
+
+def test_circuit_breaker_states(client: TestClient):
+    """Test that the Gemini circuit breaker state is exposed"""
+    response = client.get("/api/ia/circuit-breakers")
+
+    assert response.status_code == 200
+    gemini = response.json()["breakers"]["gemini"]
+    assert gemini["state"] in ["closed", "open", "half_open"]
+    assert "failure_rate" in gemini
+
+
+def _stream_items():
+    good = {
+        "html": """
+        <html>
+            <h1>Streamed Grant Endpoint</h1>
+            <p>This grant verifies that the stream endpoint emits one record per document.</p>
+        </html>
+        """,
+        "url": "https://example.com/stream",
+        "source": "Test"
+    }
+    bad = {
+        "html": "<html><body></body></html>" + " " * 100,
+        "url": "https://example.com/empty",
+        "source": "Test"
+    }
+    return [good, bad]
+
+
+def test_extract_grant_stream_ndjson(client: TestClient):
+    """Test that the stream endpoint emits one NDJSON line per document plus a summary"""
+    response = client.post("/api/ia/extract/stream", json={"items": _stream_items()})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = sorted(lines[:-1], key=lambda record: record["index"])
+    assert [record["success"] for record in results] == [True, False]
+    assert results[0]["data"]["title"] == "Streamed Grant Endpoint"
+    assert lines[-1]["summary"]["total"] == 2
+    assert lines[-1]["summary"]["succeeded"] == 1
+    assert lines[-1]["summary"]["failed"] == 1
+
+
+def test_extract_grant_stream_sse(client: TestClient):
+    """Test that server-sent events are used when requested"""
+    response = client.post(
+        "/api/ia/extract/stream",
+        json={"items": _stream_items()},
+        headers={"Accept": "text/event-stream"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert [event.splitlines()[0] for event in events] == [
+        "event: result",
+        "event: result",
+        "event: summary",
+    ]
+    summary = json.loads(events[-1].splitlines()[1][len("data: "):])
+    assert summary["summary"]["succeeded"] == 1
@@ -251,3 +251,468 @@ async def test_extraction_timeout_handling():
 
     # Should either succeed or fail gracefully
     assert success is not None
+
+
+@pytest.mark.asyncio
+async def test_extract_batch_reports_failures_per_item(ia_service_instance):
+    """Test that a failing item does not fail the whole batch"""
+    from models import ExtractionRequest
+
+    good = ExtractionRequest(
+        html="""
+        <html>
+            <h1>Batch Test Grant</h1>
+            <p>This grant checks that batch extraction returns one result per requested document.</p>
+        </html>
+        """,
+        url="https://example.com/good",
+        source="Test",
+    )
+    bad = ExtractionRequest(
+        html="<html><body></body></html>" + " " * 100,
+        url="https://example.com/bad",
+        source="Test",
+    )
+
+    results = await ia_service_instance.extract_batch([good, bad, good], concurrency=2)
+
+    assert [result.success for result in results] == [True, False, True]
+    assert results[0].data.url == "https://example.com/good"
+    assert results[1].data is None
+    assert "Failed to extract grant data" in results[1].error
+
+
+@pytest.mark.asyncio
+async def test_extract_batch_respects_concurrency_limit(ia_service_instance, monkeypatch):
+    """Test that no more than `concurrency` extractions run at the same time"""
+    from models import ExtractionRequest
+
+    running = 0
+    peak = 0
+
+    async def fake_extract_grant(html, url, source, **options):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return False, None, ExtractionMethod.HEURISTIC, "failed"
+
+    monkeypatch.setattr(ia_service_instance, "extract_grant", fake_extract_grant)
+    request = ExtractionRequest(html="x" * 100, url="https://example.com", source="Test")
+
+    results = await ia_service_instance.extract_batch([request] * 10, concurrency=3)
+
+    assert len(results) == 10
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_extract_serves_repeated_html_from_cache(ia_service_instance, monkeypatch):
+    """Test that identical HTML (modulo whitespace) is extracted only once"""
+    from models import ExtractionRequest
+
+    html = """
+    <html>
+        <h1>Cached Grant Page</h1>
+        <p>This grant page is submitted twice and should only be extracted the first time.</p>
+    </html>
+    """
+    first = await ia_service_instance.extract(
+        ExtractionRequest(html=html, url="https://example.com/cached", source="Test")
+    )
+
+    async def fail_extract_grant(html, url, source, **options):
+        raise AssertionError("extract_grant should not run on a cache hit")
+
+    monkeypatch.setattr(ia_service_instance, "extract_grant", fail_extract_grant)
+    second = await ia_service_instance.extract(
+        ExtractionRequest(html="  " + html.replace("\n", "\n  "), url="https://example.com/cached", source="Test")
+    )
+
+    assert first.cached is False
+    assert second.cached is True
+    assert second.data == first.data
+    assert second.method_used == first.method_used
+    assert ia_service_instance.cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parser", ["stdlib", "bs4"])
+async def test_heuristic_extraction_with_parser_backend(parser, monkeypatch):
+    """Test that every parser backend produces the same heuristic result"""
+    monkeypatch.setenv("HEURISTIC_PARSER", parser)
+    service = IAService()
+    html = """
+    <html>
+        <h1>Research Grant 2026</h1>
+        <p>This is a comprehensive research grant for climate change mitigation projects with excellent funding opportunities.</p>
+        <p>Total amount: €50,000 EUR</p>
+        <p>Deadline: 2026-12-31</p>
+    </html>
+    """
+
+    data = service._heuristic_extract(html, "https://example.com/grant", "Test Source")
+
+    assert service.heuristic_parser == parser
+    assert data.title == "Research Grant 2026"
+    assert data.amount == 50000
+    assert data.deadline == "2026-12-31"
+
+
+@pytest.mark.asyncio
+async def test_heuristic_extraction_falls_back_to_beautifulsoup(ia_service_instance, monkeypatch):
+    """Test that a failing fast scanner falls back to the BeautifulSoup path"""
+    from services import heuristic_extractor
+
+    original_scan = heuristic_extractor.scan_html
+    backends = []
+
+    def flaky_scan(html, backend="auto"):
+        backends.append(backend)
+        if backend != "bs4":
+            raise RuntimeError("parser crashed")
+        return original_scan(html, backend=backend)
+
+    monkeypatch.setattr(heuristic_extractor, "scan_html", flaky_scan)
+    html = """
+    <html>
+        <h1>Fallback Parser Grant</h1>
+        <p>This grant page is parsed by BeautifulSoup after the fast scanner fails.</p>
+    </html>
+    """
+
+    data = ia_service_instance._heuristic_extract(html, "https://example.com", "Test")
+
+    assert backends == [ia_service_instance.heuristic_parser, "bs4"]
+    assert data.title == "Fallback Parser Grant"
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_gemini(ia_service_instance, monkeypatch):
+    """Test that Gemini is not called while its circuit breaker is open"""
+    from services import ia_service as ia_module
+    from services.circuit_breaker import CircuitBreakerRegistry, CircuitState
+
+    registry = CircuitBreakerRegistry()
+    monkeypatch.setattr(ia_module, "circuit_breakers", registry)
+    monkeypatch.setenv("CIRCUIT_BREAKER_GEMINI_MIN_CALLS", "2")
+
+    calls = 0
+
+    async def failing_gemini(html, url, source):
+        nonlocal calls
+        calls += 1
+        raise asyncio.TimeoutError()
+
+    ia_service_instance.model = object()
+    ia_service_instance.gemini_api_key = "test-key"
+    monkeypatch.setattr(ia_service_instance, "_extract_with_gemini", failing_gemini)
+    html = """
+    <html>
+        <h1>Circuit Breaker Grant</h1>
+        <p>This grant page is extracted while the Gemini provider keeps timing out.</p>
+    </html>
+    """
+
+    for _ in range(4):
+        success, data, method, error = await ia_service_instance.extract_grant(
+            html=html, url="https://example.com", source="Test"
+        )
+        assert success is True
+        assert method == ExtractionMethod.HEURISTIC
+
+    assert calls == 2
+    assert registry.get("gemini").state == CircuitState.OPEN
+
+
+def _gemini_grant(url: str, source: str) -> GrantData:
+    return GrantData(
+        title="Gemini Extracted Grant",
+        description="Description extracted by the Gemini model.",
+        url=url,
+        source=source,
+        extraction_method=ExtractionMethod.GEMINI,
+    )
+
+
+@pytest.fixture
+def hedged_service(ia_service_instance, monkeypatch):
+    """IAService with a fake Gemini model and an isolated circuit breaker"""
+    from services import ia_service as ia_module
+    from services.circuit_breaker import CircuitBreakerRegistry
+
+    monkeypatch.setattr(ia_module, "circuit_breakers", CircuitBreakerRegistry())
+    ia_service_instance.model = object()
+    ia_service_instance.gemini_api_key = "test-key"
+    return ia_service_instance
+
+
+def _fake_gemini(delay: float):
+    async def extract_with_gemini(html, url, source):
+        await asyncio.sleep(delay)
+        return _gemini_grant(url, source)
+
+    return extract_with_gemini
+
+
+HEDGED_HTML = """
+<html>
+    <h1>Hedged Heuristic Grant</h1>
+    <p>This grant page is extracted by the heuristic while Gemini is still thinking.</p>
+</html>
+"""
+
+
+@pytest.mark.asyncio
+async def test_hedged_mode_returns_heuristic_when_gemini_misses_budget(hedged_service, monkeypatch):
+    """Test that a slow Gemini call does not delay a hedged request"""
+    from models import ExtractionRequest, ExtractionMode
+
+    monkeypatch.setattr(hedged_service, "_extract_with_gemini", _fake_gemini(0.2))
+    request = ExtractionRequest(
+        html=HEDGED_HTML,
+        url="https://example.com/hedged",
+        source="Test",
+        mode=ExtractionMode.HEDGED,
+        latency_budget_ms=20,
+    )
+
+    started = asyncio.get_running_loop().time()
+    response = await hedged_service.extract(request)
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed < 0.15
+    assert response.method_used == ExtractionMethod.HEURISTIC
+    assert response.data.title == "Hedged Heuristic Grant"
+
+    # The late Gemini answer replaces the heuristic result in the cache
+    await asyncio.sleep(0.3)
+    cached = await hedged_service.extract(request)
+    assert cached.cached is True
+    assert cached.method_used == ExtractionMethod.GEMINI
+    assert cached.data.title == "Gemini Extracted Grant"
+
+
+@pytest.mark.asyncio
+async def test_hedged_mode_prefers_gemini_within_budget(hedged_service, monkeypatch):
+    """Test that Gemini wins when it answers within the budget"""
+    monkeypatch.setattr(hedged_service, "_extract_with_gemini", _fake_gemini(0.01))
+
+    success, data, method, error = await hedged_service.extract_grant(
+        html=HEDGED_HTML,
+        url="https://example.com",
+        source="Test",
+        mode="hedged",
+        latency_budget_ms=500,
+    )
+
+    assert success is True
+    assert method == ExtractionMethod.GEMINI
+    assert data.title == "Gemini Extracted Grant"
+
+
+@pytest.mark.asyncio
+async def test_hedged_mode_waits_for_gemini_when_heuristic_fails(hedged_service, monkeypatch):
+    """Test that Gemini is awaited past the budget if the heuristic has nothing"""
+    monkeypatch.setattr(hedged_service, "_extract_with_gemini", _fake_gemini(0.05))
+
+    success, data, method, error = await hedged_service.extract_grant(
+        html="<html><body></body></html>",
+        url="https://example.com",
+        source="Test",
+        mode="hedged",
+        latency_budget_ms=10,
+    )
+
+    assert success is True
+    assert method == ExtractionMethod.GEMINI
+
+
+@pytest.mark.asyncio
+async def test_hedged_mode_runs_heuristic_once_when_both_fail(hedged_service, monkeypatch):
+    """Test that a hedged request does not retry the heuristic after both methods failed"""
+    heuristic_runs = 0
+
+    async def failing_gemini(html, url, source):
+        raise asyncio.TimeoutError()
+
+    async def empty_heuristic(html, url, source):
+        nonlocal heuristic_runs
+        heuristic_runs += 1
+        return None
+
+    monkeypatch.setattr(hedged_service, "_extract_with_gemini", failing_gemini)
+    monkeypatch.setattr(hedged_service.heuristic_runner, "run", empty_heuristic)
+
+    success, data, method, error = await hedged_service.extract_grant(
+        html="<html><body></body></html>",
+        url="https://example.com",
+        source="Test",
+        mode="hedged",
+        latency_budget_ms=10,
+    )
+
+    assert success is False
+    assert data is None
+    assert "Both AI and heuristic extraction failed" in error
+    assert heuristic_runs == 1
+
+
+def test_gemini_prompt_uses_distilled_content(ia_service_instance):
+    """Test that the Gemini prompt carries the main content, not raw HTML"""
+    html = """
+    <html><head><script>var analytics = 'x';</script></head><body>
+        <nav><a href="/">Home</a><a href="/contact">Contact us</a></nav>
+        <h1>Distilled Grant</h1>
+        <p>Grants of up to 25.000 EUR for cultural associations.</p>
+    </body></html>
+    """
+
+    prompt = ia_service_instance._build_prompt(html)
+
+    assert "Page title: Distilled Grant" in prompt
+    assert "Grants of up to 25.000 EUR for cultural associations." in prompt
+    assert "analytics" not in prompt
+    assert "Contact us" not in prompt
+    assert "<h1>" not in prompt
+
+
+def test_gemini_prompt_falls_back_to_raw_html(ia_service_instance):
+    """Test that pages without text content are sent as raw HTML"""
+    html = "<html><body><img src='grant.png'></body></html>"
+
+    prompt = ia_service_instance._build_prompt(html)
+
+    assert "<img src='grant.png'>" in prompt
+
+
+@pytest.mark.asyncio
+async def test_gemini_prompt_built_off_event_loop(ia_service_instance, monkeypatch):
+    """Test that the page is distilled in a worker thread, not on the event loop"""
+    import threading
+
+    prompt_threads = []
+
+    def fake_build_prompt(html):
+        prompt_threads.append(threading.get_ident())
+        return "prompt"
+
+    async def fake_generate(prompt):
+        return '{"title": "Threaded Grant", "description": "Prompt distilled in a worker thread."}'
+
+    monkeypatch.setattr(ia_service_instance, "_build_prompt", fake_build_prompt)
+    monkeypatch.setattr(ia_service_instance, "_generate", fake_generate)
+
+    data = await ia_service_instance._extract_with_gemini("<html></html>", "https://example.com", "Test")
+
+    assert data.title == "Threaded Grant"
+    assert prompt_threads and prompt_threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_packed_mode_batches_gemini_calls(hedged_service, monkeypatch):
+    """Test that packed batch items share one Gemini call"""
+    from models import ExtractionRequest, ExtractionMode
+
+    prompts = []
+
+    async def fake_generate(prompt):
+        prompts.append(prompt)
+        return '[' + ','.join(
+            f'{{"id": "d{i}", "title": "Packed Gemini Grant", "description": "Extracted from a packed prompt."}}'
+            for i in range(3)
+        ) + ']'
+
+    monkeypatch.setattr(hedged_service.packer, "_generate", fake_generate)
+    requests = [
+        ExtractionRequest(
+            html=f"<html><h1>Page {i} title</h1><p>Grant page number {i} with enough text to distill for the packed prompt test case.</p></html>",
+            url=f"https://example.com/{i}",
+            source="Test",
+            mode=ExtractionMode.PACKED,
+        )
+        for i in range(3)
+    ]
+
+    results = await hedged_service.extract_batch(requests)
+
+    assert len(prompts) == 1
+    assert all(result.method_used == ExtractionMethod.GEMINI for result in results)
+    assert [result.data.url for result in results] == [f"https://example.com/{i}" for i in range(3)]
+
+
+@pytest.mark.asyncio
+async def test_packed_timeout_counts_once_in_circuit_breaker(hedged_service, monkeypatch):
+    """Test that a timed-out packed call is one breaker failure, not one per document"""
+    from models import ExtractionRequest, ExtractionMode
+    from services import ia_service as ia_module
+
+    async def timeout_generate(prompt):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(hedged_service.packer, "_generate", timeout_generate)
+    requests = [
+        ExtractionRequest(
+            html=f"<html><h1>Page {i} title</h1><p>Grant page number {i} with enough text for the heuristic fallback.</p></html>",
+            url=f"https://example.com/{i}",
+            source="Test",
+            mode=ExtractionMode.PACKED,
+        )
+        for i in range(3)
+    ]
+
+    results = await hedged_service.extract_batch(requests)
+
+    assert all(result.method_used == ExtractionMethod.HEURISTIC for result in results)
+    stats = ia_module.circuit_breakers.get("gemini").stats()
+    assert stats["window_timeouts"] == 1
+    assert stats["window_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_extract_stream_yields_in_completion_order(ia_service_instance, monkeypatch):
+    """Test that streamed results arrive as documents finish, tagged with their index"""
+    from models import ExtractionRequest, ExtractionResponse
+
+    delays = {"https://example.com/0": 0.05, "https://example.com/1": 0.0, "https://example.com/2": 0.02}
+
+    async def fake_extract(request):
+        await asyncio.sleep(delays[request.url])
+        return ExtractionResponse(success=True, method_used=ExtractionMethod.HEURISTIC)
+
+    monkeypatch.setattr(ia_service_instance, "extract", fake_extract)
+    requests = [
+        ExtractionRequest(html="<html>" + "x" * 100 + "</html>", url=url, source="Test")
+        for url in delays
+    ]
+
+    indexes = [index async for index, _ in ia_service_instance.extract_stream(requests, concurrency=3)]
+
+    assert indexes == [1, 2, 0]
+
+
+@pytest.mark.asyncio
+async def test_extract_stream_applies_back_pressure(ia_service_instance, monkeypatch):
+    """Test that a consumer that stops reading stops new extractions"""
+    from models import ExtractionRequest, ExtractionResponse
+
+    started = 0
+
+    async def fake_extract(request):
+        nonlocal started
+        started += 1
+        return ExtractionResponse(success=True, method_used=ExtractionMethod.HEURISTIC)
+
+    monkeypatch.setattr(ia_service_instance, "extract", fake_extract)
+    requests = [
+        ExtractionRequest(html="<html>" + "x" * 100 + "</html>", url=f"https://example.com/{i}", source="Test")
+        for i in range(50)
+    ]
+
+    stream = ia_service_instance.extract_stream(requests, concurrency=2)
+    await stream.__anext__()
+    await asyncio.sleep(0.05)
+
+    assert started <= 5
+    await stream.aclose()
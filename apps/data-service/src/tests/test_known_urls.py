@@ -0,0 +1,126 @@
+"""Tests for the known source URL filter."""
+
+import pytest
+
+from services import discovery_service as ds
+from services.known_urls import KnownUrlSet
+
+
+class TestKnownUrlSet:
+    """Test membership and persistence."""
+
+    def test_spellings_of_a_url_are_known_together(self):
+        """Test that membership uses the canonical identity of a URL."""
+        known = KnownUrlSet()
+
+        assert known.add('https://www.madrid.gob.es/ayudas/') is True
+        assert known.add('http://madrid.gob.es/ayudas/index.html') is False
+        assert 'https://MADRID.gob.es/ayudas?utm_source=ddg' in known
+        assert 'https://sevilla.gob.es/ayudas' not in known
+        assert 'not-a-url' not in known
+        assert len(known) == 1
+
+    def test_update_adds_many(self):
+        """Test bulk insertion and its count of new URLs."""
+        known = KnownUrlSet()
+        known.add('https://a.gob.es')
+
+        added = known.update(['https://a.gob.es/', 'https://b.gob.es', 'https://c.gob.es', 'invalid'])
+
+        assert added == 2
+        assert all(url in known for url in ('https://a.gob.es', 'https://b.gob.es', 'https://c.gob.es'))
+        assert known.stats()['bytes'] == 24
+
+    def test_saved_set_is_loaded_again(self, tmp_path):
+        """Test that the set survives a restart through its file."""
+        path = str(tmp_path / 'known-urls.bin')
+        known = KnownUrlSet(path=path)
+        known.update([f'https://sede{i}.gob.es/ayudas' for i in range(100)])
+        known.save()
+
+        reloaded = KnownUrlSet(path=path)
+
+        assert len(reloaded) == 100
+        assert 'https://sede42.gob.es/ayudas' in reloaded
+
+    def test_unrelated_file_is_ignored(self, tmp_path):
+        """Test that a file without the header does not become hashes."""
+        path = tmp_path / 'known-urls.bin'
+        path.write_bytes(b'something else entirely')
+
+        assert len(KnownUrlSet(path=str(path))) == 0
+
+
+class TestDiscovery:
+    """Test that discovery drops URLs the backend already has."""
+
+    @pytest.fixture
+    def known(self, monkeypatch):
+        known = KnownUrlSet()
+        monkeypatch.setattr(ds, 'known_urls', known)
+        results = [
+            ds.CandidateSource(title='Madrid', url='https://www.madrid.gob.es/ayudas', snippet=''),
+            ds.CandidateSource(title='Madrid (http)', url='http://madrid.gob.es/ayudas/', snippet=''),
+            ds.CandidateSource(title='Sevilla', url='https://sevilla.gob.es/ayudas', snippet=''),
+        ]
+        monkeypatch.setattr(ds, 'search_web', lambda query, max_results: results)
+        return known
+
+    async def _discover(self, **kwargs):
+        sources = await ds.discover_sources(
+            scope='europa',
+            provincias=[],
+            max_results=10,
+            validate_with_ia=False,
+            skip_domain_filter=True,
+            **kwargs,
+        )
+        return [source.name for source in sources]
+
+    @pytest.mark.asyncio
+    async def test_variants_are_one_source(self, known):
+        """Test that scheme and www. spellings of a URL are de-duplicated within a run."""
+        assert await self._discover() == ['Madrid', 'Sevilla']
+
+    @pytest.mark.asyncio
+    async def test_seeded_urls_are_dropped(self, known, monkeypatch):
+        """Test that sources loaded from the backend are not discovered again."""
+        async def fetch_source_urls():
+            return ['http://madrid.gob.es/ayudas']
+
+        monkeypatch.setattr(ds.backend_client.backend, 'fetch_source_urls', fetch_source_urls)
+
+        assert await ds.seed_known_urls() == 1
+        assert await self._discover() == ['Sevilla']
+        assert await self._discover(include_known=True) == ['Madrid', 'Sevilla']
+        assert known.stats()['skipped'] == 1
+
+    @pytest.mark.asyncio
+    async def test_unreachable_backend_leaves_filter_empty(self, known, monkeypatch):
+        """Test that a failed seed is tolerated."""
+        async def fetch_source_urls():
+            return None
+
+        monkeypatch.setattr(ds.backend_client.backend, 'fetch_source_urls', fetch_source_urls)
+
+        assert await ds.seed_known_urls() == 0
+        assert len(known) == 0
+
+    def test_auto_saved_sources_become_known(self, known, client, monkeypatch):
+        """Test that sources saved by /discover are skipped by the next run."""
+        import httpx
+
+        from routers import discovery_router
+        from services.backend_client import BackendClient
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(201 if b'Sevilla' in request.content else 500)
+
+        backend = BackendClient(service_token='token', transport=httpx.MockTransport(handler))
+        monkeypatch.setattr(discovery_router, 'backend', backend)
+
+        first = client.post('/discover', params={'validate_with_ia': False, 'auto_save': True}).json()
+        second = client.post('/discover', params={'validate_with_ia': False}).json()
+
+        assert first['saved_as_inactive'] == 1
+        assert [source['name'] for source in second['sources']] == ['Madrid']
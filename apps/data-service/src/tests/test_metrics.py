@@ -0,0 +1,117 @@
+"""Tests for the Prometheus metrics registry and /metrics endpoint."""
+
+import asyncio
+
+import pytest
+
+from models import ExtractionMethod
+from services.circuit_breaker import CircuitBreakerRegistry
+from services.ia_service import IAService
+from services.metrics import FALLBACKS, MetricsRegistry
+
+GRANT_HTML = """
+<html>
+    <h1>Metrics Grant</h1>
+    <p>Ayudas para proyectos de investigación con un importe máximo de 20.000 euros por proyecto.</p>
+</html>
+"""
+
+
+def test_render_uses_prometheus_text_format():
+    """Test HELP/TYPE headers, label escaping and preallocated children"""
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter", ("reason",), preallocate=[("a",), ("b",)])
+    counter.labels('say "hi"').inc(2)
+
+    text = registry.render()
+
+    assert "# HELP test_total Test counter\n# TYPE test_total counter\n" in text
+    assert 'test_total{reason="a"} 0\n' in text
+    assert 'test_total{reason="say \\"hi\\""} 2\n' in text
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that bucket series are cumulative and end with +Inf == count"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test histogram", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+
+    assert 'test_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{le="1"} 3' in lines
+    assert 'test_seconds_bucket{le="+Inf"} 4' in lines
+    assert "test_seconds_count 4" in lines
+    assert "test_seconds_sum 6.05" in lines
+
+
+def test_labels_reject_wrong_arity():
+    """Test that a label value count mismatch raises"""
+    registry = MetricsRegistry()
+    counter = registry.counter("test_total", "Test counter", ("a", "b"))
+
+    with pytest.raises(ValueError):
+        counter.labels("only-one")
+
+
+def test_collectors_report_at_scrape_time():
+    """Test that collector values are read when rendering"""
+    registry = MetricsRegistry()
+    state = {"value": 1}
+    registry.add_collector(lambda: [("test_gauge", "gauge", "Test gauge", [({"pool": "x"}, state["value"])])])
+    state["value"] = 7
+
+    assert 'test_gauge{pool="x"} 7\n' in registry.render()
+
+
+def test_metrics_endpoint_reports_requests_and_extractions(client):
+    """Test that /metrics exposes route-templated requests and extraction counters"""
+    response = client.post(
+        "/api/ia/extract",
+        json={"html": GRANT_HTML, "url": "https://example.com/metrics", "source": "Test"},
+    )
+    assert response.status_code == 200
+
+    metrics_response = client.get("/metrics")
+    text = metrics_response.text
+
+    assert metrics_response.status_code == 200
+    assert metrics_response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'granter_http_requests_total{route="/api/ia/extract",method="POST",status="200"}' in text
+    assert "granter_http_requests_in_flight" in text
+    assert 'granter_extraction_duration_seconds_bucket{method="heuristic",le="+Inf"}' in text
+    assert "granter_extraction_html_chars_count" in text
+    assert 'granter_cache_hit_ratio{cache="extraction"}' in text
+    assert "granter_gemini_executor_queue_depth" in text
+
+
+def test_unmatched_routes_share_one_label(client):
+    """Test that unknown paths do not create a label value per path"""
+    client.get("/does-not-exist/12345")
+
+    assert 'route="unmatched",method="GET",status="404"' in client.get("/metrics").text
+    assert "/does-not-exist/12345" not in client.get("/metrics").text
+
+
+@pytest.mark.asyncio
+async def test_gemini_timeout_counts_fallback(monkeypatch):
+    """Test that a Gemini timeout increments the timeout fallback counter"""
+    from services import ia_service as ia_module
+
+    monkeypatch.setattr(ia_module, "circuit_breakers", CircuitBreakerRegistry())
+    service = IAService()
+    service.model = object()
+    service.gemini_api_key = "test-key"
+
+    async def timing_out_gemini(html, url, source):
+        raise asyncio.TimeoutError()
+
+    monkeypatch.setattr(service, "_extract_with_gemini", timing_out_gemini)
+    before = FALLBACKS.labels("timeout").value
+
+    success, _, method, _ = await service.extract_grant(html=GRANT_HTML, url="https://example.com", source="Test")
+
+    assert success is True
+    assert method == ExtractionMethod.HEURISTIC
+    assert FALLBACKS.labels("timeout").value == before + 1
@@ -0,0 +1,128 @@
+"""Tests for on-demand request profiling."""
+
+import sys
+import uuid
+
+import pytest
+
+from services.profiling import Profiler, RequestProfile, profiler, span
+
+GRANT_HTML = """
+<html>
+    <h1>Profiled Grant</h1>
+    <p>Ayudas para la digitalización de pymes con un importe máximo de 15.000 EUR por solicitud.</p>
+</html>
+"""
+
+
+@pytest.fixture
+def profiling_enabled(monkeypatch):
+    """Enable the shared profiler with a known token"""
+    monkeypatch.setattr(profiler, "token", "secret")
+    monkeypatch.setattr(profiler, "sample_rate", 0.0)
+    return profiler
+
+
+def _extract(client, headers=None):
+    return client.post(
+        "/api/ia/extract",
+        # Unique URL: a cache hit would skip the extraction spans
+        json={"html": GRANT_HTML, "url": f"https://example.com/{uuid.uuid4().hex}", "source": "Test"},
+        headers=headers or {},
+    )
+
+
+def test_span_is_noop_outside_profiled_request():
+    """Test that spans record nothing when no profile is active"""
+    with span("soup") as active:
+        pass
+
+    assert not hasattr(active, "profile")
+
+
+def test_header_triggers_profile_with_spans(client, profiling_enabled):
+    """Test that a valid X-Profile-Token profiles the request and records pipeline spans"""
+    response = _extract(client, {"X-Profile-Token": "secret"})
+    profile_id = response.headers["X-Profile-Id"]
+
+    download = client.get(f"/debug/profiles/{profile_id}", headers={"X-Profile-Token": "secret"})
+    document = download.json()
+
+    assert download.status_code == 200
+    assert "attachment" in download.headers["content-disposition"]
+    assert document["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    frame_names = {frame["name"] for frame in document["shared"]["frames"]}
+    assert {"span:heuristic_extract", "span:soup", "span:amount_regex"} <= frame_names
+    evented = [profile for profile in document["profiles"] if profile["type"] == "evented"]
+    assert evented and all(len(profile["events"]) % 2 == 0 for profile in evented)
+
+
+def test_collapsed_format_and_listing(client, profiling_enabled):
+    """Test the collapsed stacks download and the profile listing"""
+    profile_id = _extract(client, {"X-Profile-Token": "secret"}).headers["X-Profile-Id"]
+
+    collapsed = client.get(
+        f"/debug/profiles/{profile_id}?format=collapsed", headers={"X-Profile-Token": "secret"}
+    )
+    listing = client.get("/debug/profiles", headers={"X-Profile-Token": "secret"}).json()
+
+    assert collapsed.status_code == 200
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in collapsed.text.splitlines())
+    assert listing["profiles"][0]["id"] == profile_id
+    assert {s["name"] for s in listing["profiles"][0]["spans"]} >= {"heuristic_extract", "soup"}
+
+
+def test_invalid_token_is_not_profiled_or_served(client, profiling_enabled):
+    """Test that a wrong token neither triggers profiling nor downloads profiles"""
+    response = _extract(client, {"X-Profile-Token": "wrong"})
+
+    assert "X-Profile-Id" not in response.headers
+    assert client.get("/debug/profiles", headers={"X-Profile-Token": "wrong"}).status_code == 403
+    assert client.get("/debug/profiles").status_code == 403
+
+
+def test_profiling_disabled_without_token(client, monkeypatch):
+    """Test that nothing is profiled or exposed when PROFILING_TOKEN is unset"""
+    monkeypatch.setattr(profiler, "token", "")
+
+    assert "X-Profile-Id" not in _extract(client, {"X-Profile-Token": ""}).headers
+    assert client.get("/debug/profiles").status_code == 404
+
+
+def test_sampled_fraction_profiles_without_header(client, profiling_enabled, monkeypatch):
+    """Test that sample_rate profiles requests that carry no header"""
+    monkeypatch.setattr(profiler, "sample_rate", 1.0)
+
+    profile_id = _extract(client).headers["X-Profile-Id"]
+
+    assert profiler.get(profile_id).reason == "sampled"
+
+
+def test_concurrent_profiles_are_capped():
+    """Test that requests beyond max_concurrent run unprofiled"""
+    capped = Profiler(token="secret", max_concurrent=1)
+    handle = capped.start("first", "header")
+
+    assert capped.start("second", "header") is None
+    capped.stop(handle)
+    assert capped.stats()["skipped"] == 1
+    assert capped.stats()["captured"] == 1
+
+
+def test_profile_renders_samples_and_overlapping_spans():
+    """Test sample rendering and that overlapping spans go to separate lanes"""
+    profile = RequestProfile("GET /test", "header")
+    profile.add_thread(1)
+    profile.add_sample(1, sys._getframe())
+    profile.add_sample(1, sys._getframe())
+    profile.spans = [("gemini", 0.0, 0.3, 1), ("heuristic_extract", 0.1, 0.2, 1), ("soup", 0.25, 0.4, 1)]
+    profile.finish()
+
+    document = profile.to_speedscope()
+    collapsed = profile.to_collapsed()
+
+    sampled = [p for p in document["profiles"] if p["type"] == "sampled"]
+    evented = [p for p in document["profiles"] if p["type"] == "evented"]
+    assert len(sampled[0]["samples"]) == len(sampled[0]["weights"]) == 2
+    assert len(evented) == 2
+    assert "test_profile_renders_samples_and_overlapping_spans" in collapsed
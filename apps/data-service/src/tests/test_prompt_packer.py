@@ -0,0 +1,145 @@
+"""Tests for multi-document prompt packing."""
+
+import asyncio
+import json
+
+import pytest
+
+from services.prompt_packer import PromptPacker, SharedPackFailure, build_packed_prompt, parse_packed_response
+from services.content_distiller import distill
+
+
+def _page(index: int) -> str:
+    return (
+        f"<html><body><h1>Packed Grant {index}</h1>"
+        f"<p>Support programme number {index} for local associations and cooperatives.</p>"
+        f"</body></html>"
+    )
+
+
+class FakeGemini:
+    """Answers packed prompts with one object per document id found in the prompt."""
+
+    def __init__(self, mode: str = "ok"):
+        self.mode = mode
+        self.prompts: list[str] = []
+
+    async def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        ids = [line.split()[2] for line in prompt.splitlines() if line.startswith("=== Document ")]
+        if self.mode == "malformed":
+            return "Sorry, here are the grants: ["
+        if self.mode == "timeout":
+            raise asyncio.TimeoutError()
+        if self.mode == "missing":
+            ids = ids[1:]
+        return json.dumps([{"id": doc_id, "title": f"Grant {doc_id}"} for doc_id in ids])
+
+
+def _parse(extracted: dict, url: str, source: str) -> dict:
+    return {"title": extracted["title"], "url": url}
+
+
+def _make_packer(gemini: FakeGemini, single_calls: list, **options) -> PromptPacker:
+    async def extract_single(html, url, source):
+        single_calls.append(url)
+        return {"title": "single", "url": url}
+
+    return PromptPacker(gemini.generate, _parse, extract_single, **options)
+
+
+def test_build_and_parse_packed_prompt():
+    """Test that documents are labelled by id and answers are keyed by id"""
+    prompt = build_packed_prompt([("d0", distill(_page(0))), ("d1", distill(_page(1)))])
+
+    assert "=== Document d0 ===" in prompt
+    assert "Page title: Packed Grant 1" in prompt
+    answers = parse_packed_response('[{"id": "d1", "title": "B"}, {"id": "d0", "title": "A"}, {"title": "x"}]')
+    assert answers == {"d1": {"id": "d1", "title": "B"}, "d0": {"id": "d0", "title": "A"}}
+
+
+def test_parse_packed_response_rejects_non_array():
+    """Test that malformed packed answers raise ValueError"""
+    with pytest.raises(ValueError):
+        parse_packed_response('{"title": "only one"}')
+    with pytest.raises(ValueError):
+        parse_packed_response("not json")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call():
+    """Test that requests arriving within the window are packed into one prompt"""
+    gemini = FakeGemini()
+    single_calls: list = []
+    packer = _make_packer(gemini, single_calls, window_ms=20, max_docs=8)
+
+    results = await asyncio.gather(*(
+        packer.extract(_page(i), f"https://example.com/{i}", "Test") for i in range(3)
+    ))
+
+    assert len(gemini.prompts) == 1
+    assert [result["url"] for result in results] == [f"https://example.com/{i}" for i in range(3)]
+    assert [result["title"] for result in results] == ["Grant d0", "Grant d1", "Grant d2"]
+    assert single_calls == []
+    assert packer.stats()["avg_documents_per_pack"] == 3
+
+
+@pytest.mark.asyncio
+async def test_pack_is_sent_when_full():
+    """Test that max_docs splits requests into several packs"""
+    gemini = FakeGemini()
+    packer = _make_packer(gemini, [], window_ms=1000, max_docs=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*(packer.extract(_page(i), f"https://example.com/{i}", "Test") for i in range(4))),
+        timeout=0.5,
+    )
+
+    assert len(gemini.prompts) == 2
+    assert len(results) == 4
+
+
+@pytest.mark.asyncio
+async def test_malformed_response_falls_back_per_document():
+    """Test that a malformed packed answer is retried one document at a time"""
+    gemini = FakeGemini(mode="malformed")
+    single_calls: list = []
+    packer = _make_packer(gemini, single_calls, window_ms=5)
+
+    results = await asyncio.gather(*(
+        packer.extract(_page(i), f"https://example.com/{i}", "Test") for i in range(2)
+    ))
+
+    assert [result["title"] for result in results] == ["single", "single"]
+    assert sorted(single_calls) == ["https://example.com/0", "https://example.com/1"]
+    assert packer.stats()["malformed_responses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_document_falls_back_alone():
+    """Test that only documents missing from the answer are retried"""
+    gemini = FakeGemini(mode="missing")
+    single_calls: list = []
+    packer = _make_packer(gemini, single_calls, window_ms=5)
+
+    results = await asyncio.gather(*(
+        packer.extract(_page(i), f"https://example.com/{i}", "Test") for i in range(3)
+    ))
+
+    assert single_calls == ["https://example.com/0"]
+    assert [result["title"] for result in results] == ["single", "Grant d1", "Grant d2"]
+
+
+@pytest.mark.asyncio
+async def test_provider_errors_reach_every_caller():
+    """Test that a packed call timeout is raised once, and as SharedPackFailure to the other requests"""
+    packer = _make_packer(FakeGemini(mode="timeout"), [], window_ms=5)
+
+    results = await asyncio.gather(
+        *(packer.extract(_page(i), f"https://example.com/{i}", "Test") for i in range(3)),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[0], asyncio.TimeoutError)
+    assert all(isinstance(result, SharedPackFailure) for result in results[1:])
+    assert all(isinstance(result.error, asyncio.TimeoutError) for result in results[1:])
@@ -0,0 +1,99 @@
+"""Tests for client-side rate limiting."""
+
+import time
+
+import pytest
+
+from services.rate_limiter import (
+    RateLimitExceeded,
+    RateLimiterRegistry,
+    TokenBucket,
+    load_config,
+)
+
+
+class TestTokenBucket:
+    """Test token bucket accounting."""
+
+    @pytest.mark.asyncio
+    async def test_burst_is_served_immediately(self):
+        """Test that up to `burst` requests do not wait."""
+        bucket = TokenBucket('test', rate_per_second=1, burst=3, max_wait_seconds=5)
+
+        waits = [await bucket.acquire() for _ in range(3)]
+
+        assert waits == [0.0, 0.0, 0.0]
+        assert bucket.stats()['throttled'] == 0
+
+    @pytest.mark.asyncio
+    async def test_requests_beyond_burst_wait_for_refill(self):
+        """Test that the request after the burst waits ~1/rate seconds."""
+        bucket = TokenBucket('test', rate_per_second=20, burst=1, max_wait_seconds=5)
+        await bucket.acquire()
+
+        started = time.monotonic()
+        wait = await bucket.acquire()
+        elapsed = time.monotonic() - started
+
+        assert 0.03 <= wait <= 0.05
+        assert elapsed >= 0.03
+        assert bucket.stats()['throttled'] == 1
+        assert bucket.stats()['throttled_seconds'] > 0
+
+    @pytest.mark.asyncio
+    async def test_waits_beyond_max_wait_are_rejected(self):
+        """Test the max-wait cutoff."""
+        bucket = TokenBucket('test', rate_per_second=1, burst=1, max_wait_seconds=0.1)
+        await bucket.acquire()
+
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire()
+
+        assert bucket.stats()['rejected'] == 1
+        # A rejected request does not consume tokens
+        assert await bucket.acquire(max_wait=2) <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_disabled_bucket_never_waits(self):
+        """Test that rate <= 0 disables limiting."""
+        bucket = TokenBucket('test', rate_per_second=0, burst=1, max_wait_seconds=0)
+
+        waits = [await bucket.acquire() for _ in range(10)]
+
+        assert waits == [0.0] * 10
+        assert bucket.enabled is False
+
+
+class TestRegistry:
+    """Test named bucket registry."""
+
+    def test_buckets_are_shared_per_provider_and_key(self):
+        """Test that the same provider and key return the same bucket."""
+        registry = RateLimiterRegistry()
+
+        assert registry.bucket('gemini', 'key-a') is registry.bucket('gemini', 'key-a')
+        assert registry.bucket('gemini', 'key-a') is not registry.bucket('gemini', 'key-b')
+        assert registry.bucket('ddgs') is not registry.bucket('gemini')
+
+    def test_stats_do_not_expose_api_keys(self):
+        """Test that bucket names use a key fingerprint."""
+        registry = RateLimiterRegistry()
+        registry.bucket('gemini', 'secret-api-key')
+
+        names = list(registry.stats())
+
+        assert len(names) == 1
+        assert names[0].startswith('gemini:')
+        assert 'secret-api-key' not in names[0]
+
+    def test_config_from_env(self, monkeypatch):
+        """Test per-provider configuration from environment variables."""
+        monkeypatch.setenv('RATE_LIMIT_GEMINI_PER_SECOND', '4')
+        monkeypatch.setenv('RATE_LIMIT_GEMINI_BURST', '10')
+        monkeypatch.setenv('RATE_LIMIT_GEMINI_MAX_WAIT_SECONDS', '2.5')
+
+        config = load_config('gemini')
+
+        assert config.rate_per_second == 4
+        assert config.burst == 10
+        assert config.max_wait_seconds == 2.5
@@ -0,0 +1,81 @@
+"""Tests for the two-tier Result Cache."""
+
+import time
+
+from services.result_cache import ResultCache, content_hash
+
+
+class TestMemoryTier:
+    """Test LRU, TTL and counters of the memory tier."""
+
+    def test_get_returns_stored_value(self):
+        """Test that a stored value is returned and counted as a hit."""
+        cache = ResultCache('test')
+        cache.set('a', {'title': 'Grant'})
+
+        assert cache.get('a') == {'title': 'Grant'}
+        assert cache.get('missing') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+        assert cache.stats()['hit_ratio'] == 0.5
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResultCache('test', max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')  # 'b' is now least recently used
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_expired_entries_are_misses(self):
+        """Test that entries older than the TTL are not returned."""
+        cache = ResultCache('test', ttl_seconds=0.01)
+        cache.set('a', 1)
+        time.sleep(0.02)
+
+        assert cache.get('a') is None
+        assert cache.stats()['expirations'] == 1
+
+
+class TestDiskTier:
+    """Test the SQLite persistent tier."""
+
+    def test_entries_survive_restart(self, tmp_path):
+        """Test that a new cache instance reads entries persisted by a previous one."""
+        db_path = str(tmp_path / 'cache.db')
+        first = ResultCache('test', db_path=db_path)
+        first.set('a', {'amount': 50000})
+        first.close()
+
+        second = ResultCache('test', db_path=db_path)
+
+        assert second.get('a') == {'amount': 50000}
+        assert second.stats()['disk_hits'] == 1
+        assert second.stats()['persistent'] is True
+
+    def test_namespaces_are_isolated(self, tmp_path):
+        """Test that caches sharing a database do not see each other's keys."""
+        db_path = str(tmp_path / 'cache.db')
+        ResultCache('one', db_path=db_path).set('a', 1)
+
+        assert ResultCache('two', db_path=db_path).get('a') is None
+
+    def test_expired_disk_entries_are_misses(self, tmp_path):
+        """Test that expired entries on disk are not returned."""
+        db_path = str(tmp_path / 'cache.db')
+        ResultCache('test', ttl_seconds=0.01, db_path=db_path).set('a', 1)
+        time.sleep(0.02)
+
+        assert ResultCache('test', db_path=db_path).get('a') is None
+
+
+def test_content_hash_is_order_sensitive():
+    """Test that keys depend on every part and on their order."""
+    assert content_hash('a', 'b') == content_hash('a', 'b')
+    assert content_hash('a', 'b') != content_hash('b', 'a')
+    assert content_hash('ab', '') != content_hash('a', 'b')
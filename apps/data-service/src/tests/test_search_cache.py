@@ -0,0 +1,172 @@
+"""Tests for the discovery Search Cache."""
+
+import asyncio
+import time
+from dataclasses import asdict
+
+import pytest
+
+from services import discovery_service as ds
+from services.search_cache import SearchCache
+
+RESULTS = [{'title': 'Ayudas', 'url': 'https://madrid.gob.es/ayudas', 'snippet': ''}]
+
+
+class TestSearchCache:
+    """Test freshness, persistence and background refresh."""
+
+    def test_fresh_entry_is_served(self):
+        """Test that results younger than the TTL are fresh hits."""
+        cache = SearchCache(ttl_seconds=60)
+        cache.set('subvenciones site:gov', 10, RESULTS)
+
+        assert cache.get('subvenciones site:gov', 10) == (RESULTS, False)
+        # max_results is part of the key
+        assert cache.get('subvenciones site:gov', 20) == (None, False)
+        assert cache.stats()['fresh_hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_stale_entry_is_served_until_the_stale_window_ends(self):
+        """Test that entries past the TTL are stale hits, then misses."""
+        cache = SearchCache(ttl_seconds=0.01, stale_seconds=0.05)
+        cache.set('q', 10, RESULTS)
+        time.sleep(0.02)
+
+        assert cache.get('q', 10) == (RESULTS, True)
+
+        time.sleep(0.05)
+        assert cache.get('q', 10) == (None, False)
+
+    def test_empty_results_are_not_stored(self):
+        """Test that failed or rate-limited searches are not cached."""
+        cache = SearchCache()
+        cache.set('q', 10, [])
+
+        assert cache.get('q', 10) == (None, False)
+
+    def test_entries_survive_restart(self, tmp_path):
+        """Test that results persisted in SQLite are served by a new instance."""
+        db_path = str(tmp_path / 'search.db')
+        SearchCache(db_path=db_path).set('q', 10, RESULTS)
+
+        assert SearchCache(db_path=db_path).get('q', 10) == (RESULTS, False)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_revalidations_run_one_search(self):
+        """Test that a stale key is refreshed once however often it is requested."""
+        cache = SearchCache(ttl_seconds=0)
+        searches = 0
+
+        async def search():
+            nonlocal searches
+            searches += 1
+            await asyncio.sleep(0.01)
+            return RESULTS
+
+        cache.revalidate('q', 10, search)
+        cache.revalidate('q', 10, search)
+        await asyncio.sleep(0.05)
+
+        assert searches == 1
+        assert cache.stats()['refreshes'] == 1
+        assert cache.stats()['refreshing'] == 0
+
+
+class TestDiscoveryIntegration:
+    """Test that discovery searches go through the cache."""
+
+    @pytest.fixture
+    def counted_search(self, monkeypatch):
+        monkeypatch.setattr(ds, 'search_cache', SearchCache(ttl_seconds=60))
+        calls = []
+
+        def search(query: str, max_results: int):
+            calls.append(query)
+            slug = query.replace(' ', '-').replace(':', '').replace('*', '')
+            return [ds.CandidateSource(title=f'Ayudas {query}', url=f'https://{slug}.gob.es', snippet='')]
+
+        monkeypatch.setattr(ds, 'search_web', search)
+        return calls
+
+    async def _discover(self, **kwargs):
+        return await ds.discover_sources(
+            scope='europa',
+            provincias=[],
+            max_results=100,
+            validate_with_ia=False,
+            skip_domain_filter=True,
+            **kwargs,
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeated_run_is_served_from_cache(self, counted_search):
+        """Test that a second identical run does not search again."""
+        first = await self._discover()
+        searched = len(counted_search)
+        second = await self._discover()
+
+        assert searched == len(ds.build_queries('europa', []))
+        assert len(counted_search) == searched
+        assert [source.baseUrl for source in second] == [source.baseUrl for source in first]
+
+    @pytest.mark.asyncio
+    async def test_refresh_forces_live_searches(self, counted_search):
+        """Test that refresh_searches bypasses cached results."""
+        await self._discover()
+        await self._discover(refresh_searches=True)
+
+        assert len(counted_search) == 2 * len(ds.build_queries('europa', []))
+
+    @pytest.mark.asyncio
+    async def test_partial_search_is_not_cached(self, monkeypatch):
+        """Test that a search failing part-way returns its results without caching them."""
+        monkeypatch.setattr(ds, 'search_cache', SearchCache(ttl_seconds=60))
+        found = ds.CandidateSource(title='Ayudas', url='https://madrid.gob.es/ayudas', snippet='')
+
+        class ThrottledDDGS:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def text(self, query, max_results):
+                yield {'title': found.title, 'href': found.url, 'body': ''}
+                raise RuntimeError('202 Ratelimit')
+
+        monkeypatch.setattr(ds, 'search_client', ThrottledDDGS)
+
+        assert await ds.search_live('q', 10) == [found]
+        assert ds.search_cache.get('q', 10) == (None, False)
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_stale_entry(self, monkeypatch):
+        """Test that a stale entry survives a refresh whose search failed."""
+        monkeypatch.setattr(ds, 'search_cache', SearchCache(ttl_seconds=0))
+        ds.search_cache.set('q', 10, RESULTS)
+
+        def failing_search(query: str, max_results: int):
+            raise ds.SearchFailed('202 Ratelimit')
+
+        monkeypatch.setattr(ds, 'search_web', failing_search)
+
+        assert [asdict(result) for result in ds.cached_search('q', 10)] == RESULTS
+        await asyncio.sleep(0.05)
+
+        assert ds.search_cache.get('q', 10) == (RESULTS, True)
+        assert ds.search_cache.stats()['refresh_failures'] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_results_are_served_and_refreshed(self, counted_search, monkeypatch):
+        """Test that stale entries answer at once and are refreshed in the background."""
+        monkeypatch.setattr(ds, 'search_cache', SearchCache(ttl_seconds=0))
+        first = await self._discover()
+        searched = len(counted_search)
+
+        second = await self._discover()
+        await asyncio.sleep(0.05)
+
+        assert len(second) == len(first)
+        # Every stale query was refreshed once, after the run answered
+        assert len(counted_search) == 2 * searched
+        assert ds.search_cache.stats()['stale_hits'] == searched
@@ -0,0 +1,70 @@
+"""Tests for the fast JSON serialization path."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from models import DiscoveredSource, DiscoveryResponse, ExtractionMethod, ExtractionResponse, GrantData
+from services import discovery_service as ds
+from services.serialization import FastJSONResponse, dump_json
+
+GRANT = GrantData(
+    title="Serialización Rápida",
+    description="Ayudas de 10.000 € para proyectos culturales.",
+    amount=10000,
+    deadline="2026-12-31",
+    url="https://example.com/grant",
+    source="Test",
+    extraction_method=ExtractionMethod.GEMINI,
+)
+
+
+def test_dump_json_matches_pydantic_output():
+    """Test that the fast encoder produces the same JSON as pydantic"""
+    response = ExtractionResponse(success=True, data=GRANT, method_used=ExtractionMethod.GEMINI)
+
+    assert json.loads(dump_json(response)) == json.loads(response.model_dump_json())
+
+
+def test_dump_json_handles_nested_models_in_dicts():
+    """Test that plain containers holding models are serialized"""
+    source = DiscoveredSource(name="Portal", baseUrl="https://example.gob.es")
+
+    payload = json.loads(dump_json({"sources": [source], "count": 1}))
+
+    assert payload == {"sources": [source.model_dump(mode="json")], "count": 1}
+
+
+def test_fast_response_renders_discovery_models():
+    """Test that discovery responses built from service objects render correctly"""
+    source = ds.format_source(
+        ds.CandidateSource(title=" Portal de Ayudas ", url="https://example.gob.es/", snippet="Ayudas"),
+        0.9,
+        {},
+    )
+    response = DiscoveryResponse(
+        message="Discovery completed", found=1, saved_as_inactive=0, auto_saved=False, sources=[source]
+    )
+
+    body = json.loads(FastJSONResponse(response).body)
+
+    assert body["sources"][0]["name"] == "Portal de Ayudas"
+    assert body["sources"][0]["type"] == "HTML"
+    assert body["sources"][0]["metadata"]["confidence"] == 0.9
+
+
+@pytest.mark.parametrize("fast", ["false", "true"])
+def test_discover_response_is_identical_on_both_paths(client: TestClient, monkeypatch, fast):
+    """Test that FAST_JSON_RESPONSES does not change the /discover payload"""
+    candidate = ds.CandidateSource(title="Subvenciones Madrid", url="https://example.com/ayudas", snippet="Ayudas")
+    monkeypatch.setattr(ds, "search_web", lambda query, max_results: [candidate])
+    monkeypatch.setenv("FAST_JSON_RESPONSES", fast)
+
+    response = client.post("/discover", params={"validate_with_ia": False, "max_results": 1})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["found"] == 1
+    assert data["sources"][0]["baseUrl"] == "https://example.com/ayudas"
+    assert data["sources"][0]["isActive"] is False
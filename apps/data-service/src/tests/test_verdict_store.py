@@ -0,0 +1,75 @@
+"""Tests for the discovery Validation Verdict Store."""
+
+import pytest
+
+from services import discovery_service as ds
+from services.fake_providers import FakeGeminiConfig, FakeGeminiModel
+from services.verdict_store import VerdictStore
+
+META = {'confidence': 0.9, 'description': 'Portal', 'organization': 'Gobierno', 'region': 'Madrid', 'extra': 1}
+
+
+class TestVerdictStore:
+    """Test lookups, versions and persistence."""
+
+    def test_stored_verdict_is_returned(self):
+        """Test that a stored verdict is returned with only the kept fields."""
+        store = VerdictStore(version='v1')
+        store.set('https://madrid.gob.es/ayudas', 0.9, META)
+
+        confidence, meta = store.get('https://madrid.gob.es/ayudas')
+
+        assert confidence == 0.9
+        assert meta == {'description': 'Portal', 'organization': 'Gobierno', 'region': 'Madrid'}
+        assert store.get('https://sevilla.gob.es') is None
+        assert store.stats()['hits'] == 1
+        assert store.stats()['misses'] == 1
+
+    def test_other_versions_are_misses(self, tmp_path):
+        """Test that verdicts of another model/prompt version are ignored."""
+        db_path = str(tmp_path / 'verdicts.db')
+        VerdictStore(version='v1', db_path=db_path).set('https://madrid.gob.es', 0.9, META)
+
+        assert VerdictStore(version='v1', db_path=db_path).get('https://madrid.gob.es')[0] == 0.9
+
+        upgraded = VerdictStore(version='v2', db_path=db_path)
+        assert upgraded.get('https://madrid.gob.es') is None
+        assert upgraded.stats()['outdated'] == 1
+
+
+class TestValidateCandidate:
+    """Test that validation consults the store before calling Gemini."""
+
+    @pytest.fixture
+    def model(self, monkeypatch):
+        model = FakeGeminiModel(FakeGeminiConfig(latency_ms=0, latency_sigma=0))
+        monkeypatch.setenv('RATE_LIMIT_GEMINI_PER_SECOND', '0')
+        monkeypatch.setattr(ds, 'rate_limiters', type(ds.rate_limiters)())
+        monkeypatch.setattr(ds, 'ensure_gemini_model', lambda: model)
+        monkeypatch.setattr(ds, 'verdict_store', VerdictStore(version='test'))
+        return model
+
+    @pytest.mark.asyncio
+    async def test_known_url_skips_gemini(self, model):
+        """Test that a URL validated once is not sent to Gemini again."""
+        candidate = ds.CandidateSource(title='Ayudas', url='https://madrid.gob.es/ayudas?utm=x', snippet='')
+        variant = ds.CandidateSource(title='Ayudas', url='https://madrid.gob.es/ayudas/', snippet='')
+
+        first = await ds.validate_candidate(candidate, 'espana')
+        second = await ds.validate_candidate(variant, 'espana')
+
+        assert model.calls == 1
+        assert second[0] == first[0] == 0.85
+        assert second[1]['organization'] == first[1]['organization']
+
+    @pytest.mark.asyncio
+    async def test_heuristic_fallbacks_are_not_stored(self, model, monkeypatch):
+        """Test that a failed Gemini answer leaves no verdict behind."""
+        monkeypatch.setattr(ds, 'parse_validation_response', lambda text: None)
+        candidate = ds.CandidateSource(title='Ayudas', url='https://sevilla.gob.es/ayudas', snippet='')
+
+        await ds.validate_candidate(candidate, 'espana')
+        await ds.validate_candidate(candidate, 'espana')
+
+        assert model.calls == 2
+        assert ds.verdict_store.get('https://sevilla.gob.es/ayudas') is None